@@ -2,6 +2,7 @@ import time
 import logging
 import json
 from hiveengine.api import Api
+from hiveengine.operation import filter_operations
 from beem.block import Block
 log = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO)
@@ -15,56 +16,29 @@ if __name__ == "__main__":
     print("Scanning all blocks from 0 to %d..." % latest_block['blockNumber'])
     steemp_payments = []
     
-    for block_num in range(14500, latest_block['blockNumber']):
-        block = api.get_block_info(block_num)
-        if block_num % 1000 == 0:
+    for block in api.stream_blocks(14500, latest_block['blockNumber'] - 1, workers=8):
+        if block["blockNumber"] % 1000 == 0:
             print("%.2f %%" % (block["blockNumber"]/latest_block['blockNumber'] * 100))
-        for trx in block["transactions"]:
-            
-            if trx["contract"] not in ['market']:
+        for op in filter_operations(block, contracts=['market'], actions=['buy', 'sell']):
+            logs = op.logs
+            payload = op.payload
+            action = op.action
+
+            if "events" not in logs:
                 continue
-            if trx["action"] not in ['buy', 'sell']:
+            elif len(logs["events"]) == 1:
                 continue
-
-            
-            logs = json.loads(trx["logs"])
-            sender = trx["sender"]
-            payload = json.loads(trx["payload"])
-            contract = trx["contract"]
-            action = trx["action"]            
-            
+            token_found = False
+            for transfer in logs["events"]:
+                if transfer["data"]["symbol"] in scan_token:
+                    token_found = True
+            if not token_found:
+                continue
+            steem_block = Block(op.ref_block_num)
+            print("%d (%s) - %s:" % (op.block_num, steem_block.json()["timestamp"], op.trx_id))
             if action == "sell":
-                if "events" not in logs:
-                    continue
-                elif len(logs["events"]) == 1:
-                    continue
-                else:
-                    token_found = False
-                    for transfer in logs["events"]:
-                        if transfer["data"]["symbol"] in scan_token:
-                            token_found = True
-                    if token_found:
-                        steem_block = Block(block["refSteemBlockNumber"])
-                        print("%d (%s) - %s:" % (block["blockNumber"], steem_block.json()["timestamp"], trx['transactionId']))
-                        print("%s sold %s %s for %s" % (trx["sender"], payload["quantity"], payload["symbol"], payload["price"]))
-                        for transfer in logs["events"]:
-                            print("    - %s transfers %s %s to %s" % (transfer["data"]["from"], transfer["data"]["quantity"], transfer["data"]["symbol"], transfer["data"]["to"]))                    
-                                
+                print("%s sold %s %s for %s" % (op.sender, payload["quantity"], payload["symbol"], payload["price"]))
             elif action == "buy":
-                if "events" not in logs:
-                    continue
-                elif len(logs["events"]) == 1:
-                    continue
-                else:
-                    token_found = False
-                    for transfer in logs["events"]:
-                        if transfer["data"]["symbol"] in scan_token:
-                            token_found = True
-                    if token_found:
-                        steem_block = Block(block["refSteemBlockNumber"])
-                        print("%d (%s) - %s" % (block["blockNumber"], steem_block.json()["timestamp"], trx['transactionId']))
-                        print("%s bought %s %s for %s" % (trx["sender"], payload["quantity"], payload["symbol"], payload["price"]))
-                        for transfer in logs["events"]:
-                            print("    - %s transfers %s %s to %s" % (transfer["data"]["from"], transfer["data"]["quantity"], transfer["data"]["symbol"], transfer["data"]["to"]))
-                
-        
\ No newline at end of file
+                print("%s bought %s %s for %s" % (op.sender, payload["quantity"], payload["symbol"], payload["price"]))
+            for transfer in logs["events"]:
+                print("    - %s transfers %s %s to %s" % (transfer["data"]["from"], transfer["data"]["quantity"], transfer["data"]["symbol"], transfer["data"]["to"]))
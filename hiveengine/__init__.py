@@ -2,16 +2,31 @@
 from .version import version as __version__
 
 __all__ = [
+    "actionbatch",
+    "amount",
     "api",
+    "asyncapi",
+    "asyncrpc",
+    "blockcache",
+    "cache",
     "cli",
     "collection",
     "exceptions",
+    "history",
+    "holders",
+    "jsoncodec",
     "market",
     "nftmarket",
     "nft",
     "nfts",
+    "node",
+    "operation",
+    "orderbook",
+    "ratelimit",
     "rpc",
+    "subscription",
     "tokenobject",
     "tokens",
+    "trades",
     "wallet"
 ]
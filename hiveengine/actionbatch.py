@@ -0,0 +1,228 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+import json
+import logging
+from beem.account import Account
+from hiveengine.tokenobject import Token
+log = logging.getLogger(__name__)
+
+# maximum length of the json of a custom_json operation
+MAX_CUSTOM_JSON_SIZE = 8192
+
+
+class ActionBatch(object):
+    """ Collects sidechain contract actions and broadcasts them with as few
+        custom_json operations as possible
+
+        The sidechain accepts a list of contract actions in one custom_json.
+        Actions are grouped by account and authority and split into lists
+        whose json does not exceed max_size. Each custom_json is broadcasted
+        in its own transaction.
+
+        When the batch is used as context manager of a Wallet, Market or
+        NftMarket (see :func:`hiveengine.wallet.Wallet.batch`), their actions
+        are collected instead of broadcasted and the batch is broadcasted when
+        the with block is left. When the with block is left with an exception,
+        the collected actions are only broadcasted when flush_on_error is True.
+        Otherwise they are logged as dropped and kept in dropped.
+
+        :param Hive blockchain_instance: Hive instance
+        :param str ssc_id: ssc id (default is ssc-mainnet-hive)
+        :param int max_size: maximum json length of one custom_json (default is 8192)
+        :param bool flush_on_error: broadcast the collected actions also when the
+            with block raises an exception (default is False)
+
+        .. code-block:: python
+
+            from hiveengine.wallet import Wallet
+            from beem import Hive
+            active_wif = "5xxxx"
+            hv = Hive(keys=[active_wif])
+            wallet = Wallet("test", blockchain_instance=hv)
+            with wallet.batch() as batch:
+                for account in ["test1", "test2", "test3"]:
+                    wallet.transfer(account, 1, "BEE", "airdrop")
+            for result in batch.results:
+                print(result["trx_id"], result["error"])
+
+    """
+    def __init__(self, blockchain_instance, ssc_id="ssc-mainnet-hive", max_size=MAX_CUSTOM_JSON_SIZE, owner=None,
+                 flush_on_error=False):
+        self.blockchain = blockchain_instance
+        self.ssc_id = ssc_id
+        self.max_size = max_size
+        self.owner = owner
+        self.flush_on_error = flush_on_error
+        self.actions = []
+        self.results = []
+        self.dropped = []
+        # Token objects and checked accounts, which are reused by all actions of the batch
+        self.tokens = {}
+        self.accounts = {}
+        # amounts per (symbol, balance column), which the collected actions spend
+        self.debits = {}
+
+    def __len__(self):
+        return len(self.actions)
+
+    def __enter__(self):
+        if self.owner is not None:
+            self.owner._batch = self
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if self.owner is not None:
+            self.owner._batch = None
+        if exc_type is None or self.flush_on_error:
+            self.broadcast()
+        elif len(self.actions) > 0:
+            log.warning("%d collected actions were not broadcasted: %s" % (len(self.actions), str(exc_value)))
+            self.dropped = [json_data for account, auth, json_data, size in self.actions]
+            self.actions = []
+
+    def append(self, account, json_data, auth="active"):
+        """Adds a contract action and returns its index
+
+            :param str account: account which signs the action
+            :param dict json_data: contract action with contractName,
+                contractAction and contractPayload
+            :param str auth: active or posting (default is active)
+        """
+        if auth not in ["active", "posting"]:
+            raise ValueError("auth must be active or posting")
+        data = json.dumps(json_data)
+        if len(data) + 2 > self.max_size:
+            raise ValueError("Contract action is larger than %d bytes" % self.max_size)
+        self.actions.append((account, auth, json_data, len(data)))
+        return len(self.actions) - 1
+
+    def get_chunks(self):
+        """Returns the (account, auth, indices) of all custom_json operations"""
+        groups = {}
+        order = []
+        for index, (account, auth, json_data, size) in enumerate(self.actions):
+            if (account, auth) not in groups:
+                groups[(account, auth)] = []
+                order.append((account, auth))
+            groups[(account, auth)].append(index)
+        chunks = []
+        for account, auth in order:
+            chunk = []
+            chunk_size = 2
+            for index in groups[(account, auth)]:
+                size = self.actions[index][3]
+                # list separator ", "
+                if len(chunk) > 0 and chunk_size + 2 + size > self.max_size:
+                    chunks.append((account, auth, chunk))
+                    chunk = []
+                    chunk_size = 2
+                if len(chunk) > 0:
+                    chunk_size += 2
+                chunk_size += size
+                chunk.append(index)
+            if len(chunk) > 0:
+                chunks.append((account, auth, chunk))
+        return chunks
+
+    def _broadcast_chunk(self, account, auth, indices):
+        json_data = [self.actions[index][2] for index in indices]
+        if len(json_data) == 1:
+            json_data = json_data[0]
+        if auth == "active":
+            return self.blockchain.custom_json(self.ssc_id, json_data, required_auths=[account])
+        return self.blockchain.custom_json(self.ssc_id, json_data, required_posting_auths=[account])
+
+    def broadcast(self):
+        """Broadcasts all collected actions and returns one result dict per
+            action (in the order of the actions) with the action, the
+            transaction, its trx_id and the error (None on success).
+            A failed broadcast does not stop the following ones.
+        """
+        assert self.blockchain.is_hive
+        results = [None] * len(self.actions)
+        for account, auth, indices in self.get_chunks():
+            tx = None
+            error = None
+            try:
+                tx = self._broadcast_chunk(account, auth, indices)
+            except Exception as e:
+                log.warning("Broadcast of %d actions from %s failed: %s" % (len(indices), account, str(e)))
+                error = e
+            trx_id = None
+            if isinstance(tx, dict):
+                trx_id = tx.get("trx_id")
+            for index in indices:
+                results[index] = {"action": self.actions[index][2], "account": account, "tx": tx,
+                                  "trx_id": trx_id, "error": error}
+        self.actions = []
+        self.results = results
+        return results
+
+
+class ActionBatchMixin(object):
+    """ Adds :func:`batch` to classes which broadcast contract actions
+        (Wallet, Market and NftMarket). They need blockchain, ssc_id and
+        _batch attributes.
+    """
+    def batch(self, max_size=MAX_CUSTOM_JSON_SIZE, flush_on_error=False):
+        """Returns a :class:`ActionBatch`. Inside its with block, all actions
+            are collected and broadcasted at the end with as few custom_json
+            operations as possible. The methods return the index of the action
+            in the batch instead of the transaction. Balances are checked
+            against the amounts of all collected actions of the same token.
+
+            :param int max_size: maximum json length of one custom_json (default is 8192)
+            :param bool flush_on_error: broadcast the collected actions also when
+                the with block raises an exception (default is False)
+        """
+        return ActionBatch(self.blockchain, ssc_id=self.ssc_id, max_size=max_size, owner=self,
+                           flush_on_error=flush_on_error)
+
+    def _broadcast(self, json_data, account=None):
+        """Broadcasts a contract action or adds it to the open batch
+
+            :param dict json_data: contract action
+            :param str account: signing account (default is the account attribute)
+        """
+        if account is None:
+            account = self.account
+        if self._batch is not None:
+            return self._batch.append(account, json_data)
+        assert self.blockchain.is_hive
+        tx = self.blockchain.custom_json(self.ssc_id, json_data, required_auths=[account])
+        return tx
+
+    def _get_token(self, symbol):
+        """Returns the Token of symbol, which is reused while a batch is open"""
+        if self._batch is None:
+            return Token(symbol, api=self.api)
+        symbol = symbol.upper()
+        if symbol not in self._batch.tokens:
+            self._batch.tokens[symbol] = Token(symbol, api=self.api)
+        return self._batch.tokens[symbol]
+
+    def _get_debit(self, symbol, column="balance"):
+        """Returns the amount of a balance column, which is already spent
+            by the actions of the open batch
+        """
+        if self._batch is None:
+            return 0
+        return self._batch.debits.get((symbol.upper(), column), 0)
+
+    def _add_debit(self, symbol, amount, column="balance"):
+        """Adds amount to the spent amount of a balance column while a batch is open"""
+        if self._batch is not None:
+            key = (symbol.upper(), column)
+            self._batch.debits[key] = amount + self._batch.debits.get(key, 0)
+
+    def _check_account(self, account):
+        """Returns the Account of account (raises when it does not exist),
+            which is only checked once while a batch is open
+        """
+        if self._batch is None:
+            return Account(account, blockchain_instance=self.blockchain)
+        if account not in self._batch.accounts:
+            self._batch.accounts[account] = Account(account, blockchain_instance=self.blockchain)
+        return self._batch.accounts[account]
@@ -0,0 +1,185 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+from builtins import object
+import decimal
+import math
+from fractions import Fraction
+from functools import total_ordering
+
+# 10 ** precision for all valid token precisions
+SCALES = [10 ** precision for precision in range(0, 19)]
+
+# precision of SWAP.HIVE, in which market prices are given
+HIVE_PRECISION = 8
+
+
+def parse_amount(value, precision):
+    """Converts a string, float, int or Decimal into an integer amount
+        scaled by 10 ** precision. Digits beyond precision are rounded down
+        (towards zero), as done by Token.quantize.
+    """
+    if isinstance(value, Amount):
+        return value.rescale(precision).units
+    if isinstance(value, bool):
+        raise ValueError("Invalid amount %s" % str(value))
+    if isinstance(value, int):
+        return value * SCALES[precision]
+    if isinstance(value, float):
+        value = repr(value)
+    elif not isinstance(value, str):
+        value = str(value)
+    value = value.strip()
+    if "e" in value or "E" in value:
+        value = "{:f}".format(decimal.Decimal(value))
+    negative = value.startswith("-")
+    if negative or value.startswith("+"):
+        value = value[1:]
+    integer, _, fraction = value.partition(".")
+    if not (integer or fraction) or not (integer + fraction).isdigit():
+        raise ValueError("Invalid amount %s" % value)
+    fraction = fraction[:precision]
+    units = int(integer or 0) * SCALES[precision]
+    if fraction:
+        units += int(fraction) * SCALES[precision - len(fraction)]
+    if negative:
+        return -units
+    return units
+
+
+def format_amount(units, precision):
+    """Returns the string of an integer amount scaled by 10 ** precision"""
+    if precision == 0:
+        return "%d" % units
+    sign = "-" if units < 0 else ""
+    integer, fraction = divmod(abs(units), SCALES[precision])
+    return "%s%d.%0*d" % (sign, integer, precision, fraction)
+
+
+@total_ordering
+class Amount(object):
+    """ Fixed point token amount, which is stored as integer scaled by
+        10 ** precision. It can be used instead of float and Decimal for
+        balances, quantities and prices.
+
+        :param value: amount as str, float, int, Decimal or Amount
+        :param int precision: token precision
+
+        .. code-block:: python
+
+            from hiveengine.amount import Amount
+            a = Amount("1.23456", 3)
+            print(a)  # 1.234
+            print(a + Amount(1, 3))  # 2.234
+            print(a.units)  # 1234
+
+    """
+    __slots__ = ["units", "precision"]
+
+    def __init__(self, value, precision):
+        self.precision = precision
+        self.units = parse_amount(value, precision)
+
+    @classmethod
+    def from_units(cls, units, precision):
+        """Creates an Amount from an integer amount scaled by 10 ** precision"""
+        amount = cls.__new__(cls)
+        amount.units = units
+        amount.precision = precision
+        return amount
+
+    @property
+    def scale(self):
+        return SCALES[self.precision]
+
+    def rescale(self, precision):
+        """Returns the amount with another precision (rounded down)"""
+        if precision == self.precision:
+            return self
+        if precision > self.precision:
+            return Amount.from_units(self.units * SCALES[precision - self.precision], precision)
+        scale = SCALES[self.precision - precision]
+        units = abs(self.units) // scale
+        return Amount.from_units(units if self.units >= 0 else -units, precision)
+
+    def value_at(self, price, precision=HIVE_PRECISION):
+        """Returns amount * price with the given precision (rounded down),
+            e.g. the SWAP.HIVE value of a token amount
+        """
+        if not isinstance(price, Amount):
+            price = Amount(price, precision)
+        units = self.units * price.units // self.scale
+        return Amount.from_units(units, price.precision).rescale(precision)
+
+    def _other_units(self, other):
+        if isinstance(other, Amount):
+            return other.rescale(self.precision).units if other.precision <= self.precision else None
+        return parse_amount(other, self.precision)
+
+    def __add__(self, other):
+        if isinstance(other, Amount) and other.precision > self.precision:
+            return self.rescale(other.precision) + other
+        return Amount.from_units(self.units + self._other_units(other), self.precision)
+
+    __radd__ = __add__
+
+    def __sub__(self, other):
+        if isinstance(other, Amount) and other.precision > self.precision:
+            return self.rescale(other.precision) - other
+        return Amount.from_units(self.units - self._other_units(other), self.precision)
+
+    def __rsub__(self, other):
+        return Amount(other, self.precision) - self
+
+    def __neg__(self):
+        return Amount.from_units(-self.units, self.precision)
+
+    def __abs__(self):
+        return Amount.from_units(abs(self.units), self.precision)
+
+    def _compare_units(self, other):
+        if isinstance(other, Amount):
+            precision = max(self.precision, other.precision)
+            return self.rescale(precision).units, other.rescale(precision).units
+        if isinstance(other, bool):
+            raise ValueError("Invalid amount %s" % str(other))
+        if isinstance(other, int):
+            return self.units, other * self.scale
+        if isinstance(other, float):
+            if math.isinf(other) or math.isnan(other):
+                return self.units, other
+            # compared exactly with the shortest repr, as parsed by parse_amount
+            return self.units, Fraction(decimal.Decimal(repr(other))) * self.scale
+        return decimal.Decimal(self.units).scaleb(-self.precision), decimal.Decimal(other)
+
+    def __eq__(self, other):
+        try:
+            units, other_units = self._compare_units(other)
+        except (ValueError, decimal.InvalidOperation):
+            return False
+        return units == other_units
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    def __lt__(self, other):
+        units, other_units = self._compare_units(other)
+        return units < other_units
+
+    def __hash__(self):
+        return hash(Fraction(self.units, self.scale))
+
+    def __bool__(self):
+        return self.units != 0
+
+    __nonzero__ = __bool__
+
+    def __float__(self):
+        return self.units / self.scale
+
+    def __str__(self):
+        return format_amount(self.units, self.precision)
+
+    def __repr__(self):
+        return "<Amount %s (precision %d)>" % (str(self), self.precision)
@@ -9,30 +9,85 @@ import json
 import requests
 from timeit import default_timer as timer
 import logging
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from .rpc import RPC
+from .ratelimit import PRIORITY_LOW
+from .exceptions import BlockNotAvailable
+from .operation import filter_operations
+from .blockcache import BlockCache
+from .cache import ResponseCache, shared_response_cache
+log = logging.getLogger(__name__)
 
 
 class Api(object):
     """ Access the hive-engine API
+
+        :param str rpcurl: RPC node url or a list of node urls
+        :param BlockCache block_cache: (optional) store for blocks and transactions,
+            which is used before the node is asked. Can also be the path of the
+            sqlite database.
+        :param ResponseCache cache: (optional) cache for find and find_one results,
+            when True, a ResponseCache with the default ttl values is used. By
+            default, the shared cache of the nodes is used, which stores
+            tokens/tokens and nft/nfts results for 60 seconds
+            (see :func:`hiveengine.cache.shared_response_cache`), when False,
+            no cache is used.
+        :param str history_url: (optional) url of the account history api
+        :param rate_limiter: (optional) :class:`hiveengine.ratelimit.RateLimiter`
+            of all requests, when True, a RateLimiter with the default rate is used.
+            Background scans (:func:`find_all`, :func:`stream_blocks`) are sent
+            with PRIORITY_LOW.
     """
-    def __init__(self, url=None, rpcurl=None, user=None, password=None, **kwargs):
+    def __init__(self, url=None, rpcurl=None, user=None, password=None, block_cache=None, cache=None,
+                 history_url=None, **kwargs):
         if url is None:
             self.url = 'https://api.hive-engine.com/'
         else:
             self.url = url
         if url is not None and rpcurl is None:
-            self.rpc = RPC(url=url)
+            self.rpc = RPC(url=url, user=user, password=password, **kwargs)
         else:
-            self.rpc = RPC(url=rpcurl)
+            self.rpc = RPC(url=rpcurl, user=user, password=password, **kwargs)
+        if block_cache is not None and not isinstance(block_cache, BlockCache):
+            block_cache = BlockCache(block_cache)
+        self.block_cache = block_cache
+        if cache is None:
+            cache = shared_response_cache(self.rpc.nodes.urls)
+        elif cache is True:
+            cache = ResponseCache()
+        elif cache is False:
+            cache = None
+        self.cache = cache
+        if history_url is None:
+            history_url = "https://accounts.hive-engine.com/accountHistory"
+        self.history_url = history_url
 
     def get_history(self, account, symbol, limit=1000, offset=0):
-        """"Get the transaction history for an account and a token"""
-        response = requests.get("https://accounts.hive-engine.com/accountHistory?account=%s&limit=%d&offset=%d&symbol=%s" % (account, limit, offset, symbol))
-        cnt2 = 0
-        while response.status_code != 200 and cnt2 < 10:
-            response = requests.get("https://accounts.hive-engine.com/accountHistory?account=%s&limit=%d&offset=%d&symbol=%s" % (account, limit, offset, symbol))
-            cnt2 += 1
-        return response.json()
+        """"Get the transaction history for an account and a token (newest entries first).
+            The request uses the shared session and is retried with exponential back off.
+            See :class:`hiveengine.history.AccountHistory` for reading all and only new entries.
+        """
+        params = {"account": account, "limit": limit, "offset": offset, "symbol": symbol}
+        nodes = self.rpc.nodes
+        cnt = 0
+        while True:
+            response = None
+            try:
+                response = self.rpc.session.get(self.history_url, params=params, timeout=self.rpc.timeout)
+                if response.status_code == 200:
+                    return response.json()
+                error = "HTTP error %d" % response.status_code
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                error = str(e)
+            cnt += 1
+            if nodes.num_retries_call >= 0 and cnt > nodes.num_retries_call:
+                if response is not None:
+                    response.raise_for_status()
+                raise requests.exceptions.ConnectionError(error)
+            sleeptime = min(nodes.backoff * 2 ** (cnt - 1), nodes.max_backoff)
+            log.warning("Error in get_history: %s, retry in %.1f s" % (error, sleeptime))
+            time.sleep(sleeptime)
 
     def get_latest_block_info(self):
         """get the latest block of the sidechain"""
@@ -52,19 +107,144 @@ class Api(object):
 
     def get_block_info(self, blocknumber):
         """get the block with the specified block number of the sidechain"""
+        if self.block_cache is not None:
+            block = self.block_cache.get_block(blocknumber)
+            if block is not None:
+                return block
         ret = self.rpc.getBlockInfo({"blockNumber": blocknumber}, endpoint="blockchain")
         if isinstance(ret, list) and len(ret) == 1:
-            return ret[0]
-        else:
-            return ret
+            ret = ret[0]
+        if self.block_cache is not None and isinstance(ret, dict):
+            self.block_cache.put_block(ret)
+        return ret
+
+    def get_block_range(self, start, stop, priority=None):
+        """get the blocks from start to stop (not included) of the sidechain with one batch request.
+            Blocks which do not exist yet are None.
+
+            :param int priority: (optional) priority of the request in the rate limiter
+        """
+        blocks = {}
+        if self.block_cache is not None:
+            blocks = self.block_cache.get_blocks(start, stop)
+        missing = [blocknumber for blocknumber in range(start, stop) if blocknumber not in blocks]
+        if len(missing) > 0:
+            with self.rpc.batch(max_batch_size=len(missing), priority=priority) as b:
+                results = [b.getBlockInfo({"blockNumber": blocknumber}, endpoint="blockchain")
+                           for blocknumber in missing]
+            new_blocks = [r.result() for r in results]
+            if self.block_cache is not None:
+                self.block_cache.put_blocks(new_blocks)
+            blocks.update(zip(missing, new_blocks))
+        return [blocks[blocknumber] for blocknumber in range(start, stop)]
+
+    def stream_blocks(self, start, stop=None, workers=4, batch_size=50, poll_interval=3, max_wait=60):
+        """Yields the blocks of the sidechain strictly in order. The blocks are
+            requested in batches of batch_size blocks by a pool of workers.
+
+            :param int start: first block
+            :param int stop: last block (included). When None, the stream
+                follows the head block of the sidechain
+            :param int workers: number of batches which are requested concurrently
+            :param int batch_size: number of blocks in one batch request
+            :param float poll_interval: seconds to wait for new blocks
+            :param float max_wait: seconds to wait for a missing block or, when
+                stop is beyond the head block, for the next block, before
+                BlockNotAvailable is raised
+
+            .. code-block:: python
+
+                from hiveengine.api import Api
+                api = Api()
+                for block in api.stream_blocks(1000, 2000, workers=8):
+                    print(block["blockNumber"])
+
+        """
+        head = self._get_stream_head(stop)
+        next_block = start
+        pending = deque()
+        wait_start = None
+        executor = ThreadPoolExecutor(max_workers=workers)
+        try:
+            while True:
+                if next_block > head and len(pending) < workers and (stop is None or next_block <= stop):
+                    head = self._get_stream_head(stop)
+                    if next_block > head and len(pending) == 0:
+                        if stop is not None:
+                            if wait_start is None:
+                                wait_start = time.time()
+                            elif time.time() - wait_start > max_wait:
+                                raise BlockNotAvailable("Block %d was not produced within %.0f s" % (next_block, max_wait))
+                        time.sleep(poll_interval)
+                        continue
+                    wait_start = None
+                while len(pending) < workers and next_block <= head:
+                    end = min(next_block + batch_size, head + 1)
+                    pending.append((next_block, executor.submit(self.get_block_range, next_block, end,
+                                                                   priority=PRIORITY_LOW)))
+                    next_block = end
+                if len(pending) == 0:
+                    break
+                first_block, future = pending.popleft()
+                for blocknumber, block in enumerate(future.result(), first_block):
+                    block_wait_start = time.time()
+                    while block is None:
+                        # the node has not stored the block yet
+                        if time.time() - block_wait_start > max_wait:
+                            raise BlockNotAvailable("Block %d was not returned within %.0f s" % (blocknumber, max_wait))
+                        time.sleep(poll_interval)
+                        block = self.get_block_info(blocknumber)
+                    yield block
+        finally:
+            # fetches which are not running yet are not needed anymore
+            for first_block, future in pending:
+                future.cancel()
+            executor.shutdown(wait=False)
+
+    def _get_stream_head(self, stop):
+        """Returns the head block, but not more than stop"""
+        head = self.get_latest_block_info()["blockNumber"]
+        if stop is not None:
+            head = min(head, stop)
+        return head
+
+    def stream_ops(self, start, stop=None, contracts=None, actions=None, symbols=None, workers=4, batch_size=50):
+        """Yields the operations of the sidechain blocks from start to stop
+            (see :func:`stream_blocks`) as :class:`hiveengine.operation.Operation`.
+            Contract and action are filtered before payload and logs are decoded.
+
+            :param list contracts: contract names, e.g. ["market"]
+            :param list actions: contract actions, e.g. ["buy", "sell"]
+            :param list symbols: only operations with these symbols in the payload
+
+            .. code-block:: python
+
+                from hiveengine.api import Api
+                api = Api()
+                for op in api.stream_ops(1000, 2000, contracts=["market"], actions=["buy", "sell"], symbols=["BEE"]):
+                    print(op.block_num, op.sender, op.payload["quantity"], op.events)
+
+        """
+        if contracts is not None:
+            contracts = set(contracts)
+        if actions is not None:
+            actions = set(actions)
+        for block in self.stream_blocks(start, stop=stop, workers=workers, batch_size=batch_size):
+            for op in filter_operations(block, contracts=contracts, actions=actions, symbols=symbols):
+                yield op
 
     def get_transaction_info(self, txid):
         """Retrieve the specified transaction info of the sidechain"""
+        if self.block_cache is not None:
+            trx = self.block_cache.get_transaction(txid)
+            if trx is not None:
+                return trx
         ret = self.rpc.getTransactionInfo({"txid": txid}, endpoint="blockchain")
         if isinstance(ret, list) and len(ret) == 1:
-            return ret[0]
-        else:
-            return ret
+            ret = ret[0]
+        if self.block_cache is not None and isinstance(ret, dict) and "blockNumber" in ret:
+            self.block_cache.put_transaction(ret)
+        return ret
 
     def get_contract(self, contract_name):
         """ Get the contract specified from the database"""
@@ -74,32 +254,145 @@ class Api(object):
         else:
             return ret
 
+    def get_balances(self, accounts, symbol=None, chunk_size=100):
+        """Returns the token balances of many accounts as dict (account name -> list of balances).
+            The balances of chunk_size accounts are requested together with an $in query.
+
+            :param list accounts: account names
+            :param str symbol: (optional) only balances of this token are returned
+            :param int chunk_size: number of accounts in one query
+        """
+        balances = dict([(account, []) for account in accounts])
+        accounts = list(balances)
+        for i in range(0, len(accounts), chunk_size):
+            query = {"account": {"$in": accounts[i:i + chunk_size]}}
+            if symbol is not None:
+                query["symbol"] = symbol.upper()
+            for balance in self.find_iter("tokens", "balances", query=query, keyset=True):
+                balances.setdefault(balance["account"], []).append(balance)
+        return balances
+
     def find_one(self, contract_name, table_name, query = {}):
         """Get the object that matches the query from the table of the specified contract"""
+        if self.cache is not None:
+            key = self.cache.get_key("findOne", contract_name, table_name, query)
+            found, ret = self.cache.get(key)
+            if found:
+                return ret
         ret = self.rpc.findOne({"contract": contract_name, "table": table_name, "query": query}, endpoint="contracts")
+        if self.cache is not None:
+            self.cache.set(key, ret)
         return ret
 
-    def find(self, contract_name, table_name, query = {}, limit=1000, offset=0, indexes=[]):
-        """Get an array of objects that match the query from the table of the specified contract"""
+    def find(self, contract_name, table_name, query = {}, limit=1000, offset=0, indexes=[], priority=None):
+        """Get an array of objects that match the query from the table of the specified contract
+
+            :param int priority: (optional) priority of the request in the rate limiter
+        """
+        if self.cache is not None:
+            key = self.cache.get_key("find", contract_name, table_name, query, limit, offset, indexes)
+            found, ret = self.cache.get(key)
+            if found:
+                return ret
         ret = self.rpc.find({"contract": contract_name, "table": table_name, "query": query,
-                             "limit": limit, "offset": offset, "indexes": indexes}, endpoint="contracts")
+                             "limit": limit, "offset": offset, "indexes": indexes}, endpoint="contracts",
+                            priority=priority)
         if isinstance(ret, list) and len(ret) == 1:
-            return ret[0]
-        else:
-            return ret
+            ret = ret[0]
+        if self.cache is not None:
+            self.cache.set(key, ret)
+        return ret
 
-    def find_all(self, contract_name, table_name, query = {}):
-        """Get an array of objects that match the query from the table of the specified contract"""
+    def find_all(self, contract_name, table_name, query = {}, parallel=1, keyset=False):
+        """Get an array of objects that match the query from the table of the specified contract
+
+            :param int parallel: number of pages which are requested at once
+                in one batch request. The pages are fetched speculatively
+                until a page is not full (default is 1)
+            :param bool keyset: when True, the pages are requested by ``_id``
+                instead of by offset (see :func:`find_iter`), parallel is not used
+        """
         limit = 1000
         offset = 0
         last_result = []
         cnt = 0
         result = []
-        while last_result is not None and len(last_result) == limit or cnt == 0:
-            cnt += 1            
-            last_result = self.find(contract_name, table_name, query, limit=limit, offset=offset)
-            if last_result is not None:
-                result += last_result
-                offset += limit
-        return result
+        if keyset:
+            return list(self.find_iter(contract_name, table_name, query, page_size=limit, keyset=True,
+                                       priority=PRIORITY_LOW))
+        if parallel > 1:
+            while last_result is not None and len(last_result) == limit or cnt == 0:
+                cnt += 1
+                with self.rpc.batch(max_batch_size=parallel, priority=PRIORITY_LOW) as b:
+                    pages = [b.find({"contract": contract_name, "table": table_name, "query": query,
+                                     "limit": limit, "offset": offset + i * limit, "indexes": []}, endpoint="contracts")
+                             for i in range(parallel)]
+                for page in pages:
+                    last_result = page.result()
+                    if last_result is None:
+                        break
+                    result += last_result
+                    offset += limit
+                    if len(last_result) < limit:
+                        break
+            return result
+        return list(self.find_iter(contract_name, table_name, query, page_size=limit, priority=PRIORITY_LOW))
+
+    def find_iter(self, contract_name, table_name, query = {}, page_size=1000, indexes=[], prefetch=False, keyset=False,
+                  priority=None):
+        """Yields the objects that match the query from the table of the specified contract
+            page by page, only the current page is kept in memory
+
+            :param int page_size: number of objects which are requested at once (max. 1000)
+            :param list indexes: sort order, e.g. [{"index": "_id", "descending": False}]
+            :param bool prefetch: when True, the next page is requested in a
+                background thread while the current page is processed
+            :param bool keyset: when True, the pages are requested by ``_id``
+                (``{"_id": {"$gt": last_id}}``) instead of by offset. Each page costs
+                the same and no rows are skipped or duplicated when the table changes.
+                The rows are sorted by ``_id`` and indexes is not used.
+            :param int priority: (optional) priority of the requests in the rate limiter
+        """
+        find_kwargs = {}
+        if priority is not None:
+            find_kwargs["priority"] = priority
+        if keyset:
+            indexes = [{"index": "_id", "descending": False}]
+        executor = None
+        if prefetch:
+            executor = ThreadPoolExecutor(max_workers=1)
+        page_query = query
+        offset = 0
+        next_page = None
+        try:
+            page = self.find(contract_name, table_name, page_query, limit=page_size, offset=offset, indexes=indexes,
+                             **find_kwargs)
+            while page is not None:
+                if keyset:
+                    if len(page) > 0:
+                        page_query = self._get_keyset_query(query, page[-1]["_id"])
+                else:
+                    offset += page_size
+                if len(page) == page_size and executor is not None:
+                    next_page = executor.submit(self.find, contract_name, table_name, page_query,
+                                                limit=page_size, offset=offset, indexes=indexes, **find_kwargs)
+                for row in page:
+                    yield row
+                if len(page) < page_size:
+                    break
+                if next_page is not None:
+                    page = next_page.result()
+                else:
+                    page = self.find(contract_name, table_name, page_query, limit=page_size, offset=offset,
+                                     indexes=indexes, **find_kwargs)
+        finally:
+            if executor is not None:
+                executor.shutdown(wait=False)
 
+    def _get_keyset_query(self, query, last_id):
+        """Returns the query for all objects with an _id above last_id"""
+        if "_id" in query:
+            return {"$and": [query, {"_id": {"$gt": last_id}}]}
+        keyset_query = dict(query)
+        keyset_query["_id"] = {"$gt": last_id}
+        return keyset_query
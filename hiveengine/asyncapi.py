@@ -0,0 +1,114 @@
+"""asyncio version of the hive-engine API."""
+from .asyncrpc import AsyncRPC
+
+
+class AsyncApi(object):
+    """ Access the hive-engine API with asyncio
+
+        :param str rpcurl: RPC node url or a list of node urls
+        :param int max_concurrency: maximum number of requests in flight per node
+
+        aiohttp is needed for this class.
+
+        .. code-block:: python
+
+            import asyncio
+            from hiveengine.asyncapi import AsyncApi
+
+            async def main():
+                async with AsyncApi() as api:
+                    tables = await asyncio.gather(api.find_all("tokens", "tokens"),
+                                                  api.find_all("nft", "nfts"))
+                    print([len(t) for t in tables])
+
+            asyncio.run(main())
+
+    """
+    def __init__(self, url=None, rpcurl=None, user=None, password=None, **kwargs):
+        if url is None:
+            self.url = 'https://api.hive-engine.com/'
+        else:
+            self.url = url
+        if url is not None and rpcurl is None:
+            self.rpc = AsyncRPC(url=url, user=user, password=password, **kwargs)
+        else:
+            self.rpc = AsyncRPC(url=rpcurl, user=user, password=password, **kwargs)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    async def close(self):
+        """Closes the http session"""
+        await self.rpc.close()
+
+    async def get_latest_block_info(self):
+        """get the latest block of the sidechain"""
+        ret = await self.rpc.getLatestBlockInfo(endpoint="blockchain")
+        if isinstance(ret, list) and len(ret) == 1:
+            return ret[0]
+        else:
+            return ret
+
+    async def get_status(self):
+        """gets the status of the sidechain"""
+        ret = await self.rpc.getStatus(endpoint="blockchain")
+        if isinstance(ret, list) and len(ret) == 1:
+            return ret[0]
+        else:
+            return ret
+
+    async def get_block_info(self, blocknumber):
+        """get the block with the specified block number of the sidechain"""
+        ret = await self.rpc.getBlockInfo({"blockNumber": blocknumber}, endpoint="blockchain")
+        if isinstance(ret, list) and len(ret) == 1:
+            return ret[0]
+        else:
+            return ret
+
+    async def get_transaction_info(self, txid):
+        """Retrieve the specified transaction info of the sidechain"""
+        ret = await self.rpc.getTransactionInfo({"txid": txid}, endpoint="blockchain")
+        if isinstance(ret, list) and len(ret) == 1:
+            return ret[0]
+        else:
+            return ret
+
+    async def get_contract(self, contract_name):
+        """ Get the contract specified from the database"""
+        ret = await self.rpc.getContract({"name": contract_name}, endpoint="contracts")
+        if isinstance(ret, list) and len(ret) == 1:
+            return ret[0]
+        else:
+            return ret
+
+    async def find_one(self, contract_name, table_name, query={}):
+        """Get the object that matches the query from the table of the specified contract"""
+        ret = await self.rpc.findOne({"contract": contract_name, "table": table_name, "query": query}, endpoint="contracts")
+        return ret
+
+    async def find(self, contract_name, table_name, query={}, limit=1000, offset=0, indexes=[]):
+        """Get an array of objects that match the query from the table of the specified contract"""
+        ret = await self.rpc.find({"contract": contract_name, "table": table_name, "query": query,
+                                   "limit": limit, "offset": offset, "indexes": indexes}, endpoint="contracts")
+        if isinstance(ret, list) and len(ret) == 1:
+            return ret[0]
+        else:
+            return ret
+
+    async def find_all(self, contract_name, table_name, query={}):
+        """Get an array of objects that match the query from the table of the specified contract"""
+        limit = 1000
+        offset = 0
+        last_result = []
+        cnt = 0
+        result = []
+        while last_result is not None and len(last_result) == limit or cnt == 0:
+            cnt += 1
+            last_result = await self.find(contract_name, table_name, query, limit=limit, offset=offset)
+            if last_result is not None:
+                result += last_result
+                offset += limit
+        return result
@@ -0,0 +1,237 @@
+"""asyncio based RPC client."""
+import asyncio
+import logging
+from timeit import default_timer as timer
+
+from .rpc import RPC, RPCBatch, RPCErrorDoRetry, RateLimitError, UnauthorizedError, get_endpoint_name
+from .ratelimit import parse_retry_after
+
+try:
+    import aiohttp
+    AIOHTTP_AVAILABLE = True
+except ImportError:
+    AIOHTTP_AVAILABLE = False
+
+log = logging.getLogger(__name__)
+
+
+class AsyncRPC(RPC):
+    """
+    This class allows to call API methods with asyncio. Calls to the same
+    node are limited to max_concurrency requests in flight.
+
+    aiohttp is needed for this class. A rate_limiter
+    (:class:`hiveengine.ratelimit.RateLimiter`) is awaited with
+    :func:`hiveengine.ratelimit.RateLimiter.acquire_async`, so that the event
+    loop is not blocked, calls accept the priority keyword as in :class:`RPC`.
+
+    Usage:
+
+        .. code-block:: python
+
+            import asyncio
+            from hiveengine.asyncrpc import AsyncRPC
+
+            async def main():
+                async with AsyncRPC(max_concurrency=16) as rpc:
+                    blocks = await asyncio.gather(*[rpc.getBlockInfo({"blockNumber": n}, endpoint="blockchain")
+                                                    for n in range(1, 101)])
+                    print(len(blocks))
+
+            asyncio.run(main())
+
+    """
+
+    def __init__(self, url=None, user=None, password=None, **kwargs):
+        """Init."""
+        if not AIOHTTP_AVAILABLE:
+            raise ImportError("aiohttp is needed for AsyncRPC")
+        super(AsyncRPC, self).__init__(url=url, user=user, password=password, **kwargs)
+        self.max_concurrency = kwargs.get("max_concurrency", 8)
+        self.session = None
+        self._semaphores = {}
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    async def get_session(self):
+        """Returns the aiohttp session, which is created on first use"""
+        if self.session is None or self.session.closed:
+            self.session = aiohttp.ClientSession(headers=self.headers,
+                                                 timeout=aiohttp.ClientTimeout(total=self.timeout))
+        return self.session
+
+    async def close(self):
+        """Closes the aiohttp session"""
+        if self.session is not None and not self.session.closed:
+            await self.session.close()
+        self.session = None
+
+    def _get_semaphore(self, url):
+        if url not in self._semaphores:
+            self._semaphores[url] = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphores[url]
+
+    async def request_send(self, endpoint, payload, url=None):
+        if url is None:
+            url = self.url
+        session = await self.get_session()
+        auth = None
+        if self.user is not None and self.password is not None:
+            auth = aiohttp.BasicAuth(self.user, self.password)
+        async with self._get_semaphore(url):
+            async with session.post(url + endpoint, data=payload, auth=auth) as response:
+                if response.status == 401:
+                    raise UnauthorizedError
+                elif response.status == 429:
+                    raise RateLimitError("Too Many Requests", parse_retry_after(response.headers.get("Retry-After")))
+                elif response.status == 503:
+                    raise RateLimitError("Service Temporarily Unavailable",
+                                         parse_retry_after(response.headers.get("Retry-After")))
+                return await response.read()
+
+    async def _send_payload(self, endpoint, payload, priority=None):
+        """Sends the payload to the healthiest node and returns the decoded reply.
+            Requests which fail with RPCErrorDoRetry or a connection error are
+            retried on the next node. A RateLimitError slows down the rate limiter.
+        """
+        data = self.codec.dumps(payload)
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug(data)
+
+        cnt = 0
+        tried = []
+        while True:
+            node = self.nodes.get_node(exclude=tried)
+            tried.append(node)
+            if self.rate_limiter is not None:
+                await self.rate_limiter.acquire_async(priority)
+            start = timer()
+            try:
+                reply = await self.request_send(endpoint, data, url=node.url)
+                ret = self._decode_reply(reply)
+            except (RPCErrorDoRetry, aiohttp.ClientError, asyncio.TimeoutError) as e:
+                self.nodes.increase_error_cnt(node, retry_after=getattr(e, "retry_after", None))
+                if isinstance(e, RateLimitError) and self.rate_limiter is not None:
+                    # pause all requests only when no other node can be used
+                    self.rate_limiter.throttle(self.nodes.get_blocked_time() or None)
+                cnt += 1
+                sleeptime = self.nodes.get_retry_sleeptime(cnt)
+                if sleeptime is None:
+                    raise
+                log.warning("Retry %d of %d: %s: %s" % (cnt, self.nodes.num_retries_call, node.url, str(e)))
+                await asyncio.sleep(sleeptime)
+                if len(tried) >= len(self.nodes):
+                    tried = []
+                continue
+            self.nodes.success(node, timer() - start)
+            if self.rate_limiter is not None:
+                self.rate_limiter.success()
+            self.url = node.url
+            break
+
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug(reply)
+        self._update_head_block(node, payload, ret)
+        return ret
+
+    async def update_nodes(self):
+        """Requests the latest block from all nodes to measure their
+            latency and head block lag
+        """
+        async def update_node(node):
+            query = [{"method": "getLatestBlockInfo", "jsonrpc": "2.0", "params": [],
+                      "id": self.get_request_id()}]
+            start = timer()
+            try:
+                ret = self.codec.loads(await self.request_send("blockchain", self.codec.dumps(query), url=node.url))
+            except (RPCErrorDoRetry, ValueError, aiohttp.ClientError, asyncio.TimeoutError) as e:
+                log.warning("%s: %s" % (node.url, str(e)))
+                self.nodes.increase_error_cnt(node)
+                return
+            self.nodes.success(node, timer() - start)
+            self._update_head_block(node, query, ret)
+        await asyncio.gather(*[update_node(node) for node in self.nodes])
+
+    async def rpcexec(self, endpoint, payload, priority=None):
+        """
+        Execute a call by sending the payload.
+
+        :param json payload: Payload data
+        :param int priority: (optional) priority of the request in the rate limiter
+        :raises ValueError: if the server does not respond in proper JSON format
+        :raises RPCError: if the server returns an error
+        """
+        ret = await self._send_payload(endpoint, payload, priority=priority)
+        return self._process_reply(ret)
+
+    async def rpcexec_batch(self, endpoint, calls, priority=None):
+        """
+        Execute several queued calls with a single request.
+
+        :param list calls: list of (query, RPCBatchResult) tuples
+        :param int priority: (optional) priority of the request in the rate limiter
+        :raises RPCError: if the server rejects the whole batch
+        """
+        ret = await self._send_payload(endpoint, [query for query, result in calls], priority=priority)
+        self._process_batch_reply(calls, ret)
+
+    def batch(self, max_batch_size=None, priority=None):
+        """Returns a :class:`AsyncRPCBatch` which collects calls and sends them
+            as JSON-RPC batches.
+        """
+        return AsyncRPCBatch(self, max_batch_size=max_batch_size, priority=priority)
+
+    def __getattr__(self, name):
+        """Map all methods to RPC calls and pass through the arguments."""
+        if name.startswith("__"):
+            raise AttributeError(name)
+
+        async def method(*args, **kwargs):
+            endpoint = get_endpoint_name(*args, **kwargs)
+            query = self._build_query(name, args)
+            return await self.rpcexec(endpoint, [query], priority=kwargs.get("priority"))
+        return method
+
+
+class AsyncRPCBatch(RPCBatch):
+    """
+    Collects RPC calls of an :class:`AsyncRPC` and sends all chunks concurrently.
+
+    Usage:
+
+        .. code-block:: python
+
+            async with rpc.batch() as b:
+                block = b.getBlockInfo({"blockNumber": 1910}, endpoint="blockchain")
+            print(block.result())
+
+    """
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            await self.execute()
+
+    async def execute(self):
+        """Sends all queued calls and returns their RPCBatchResult in id order"""
+        queue = self.queue
+        self.queue = []
+        chunks = []
+        calls = {}
+        for endpoint, query, result in queue:
+            calls.setdefault(endpoint, []).append((query, result))
+        for endpoint in calls:
+            endpoint_calls = calls[endpoint]
+            for i in range(0, len(endpoint_calls), self.max_batch_size):
+                chunks.append(self.rpc.rpcexec_batch(endpoint, endpoint_calls[i:i + self.max_batch_size],
+                                                     priority=self.priority))
+        await asyncio.gather(*chunks)
+        results = sorted([result for endpoint, query, result in queue], key=lambda r: r.request_id)
+        self.results += results
+        return results
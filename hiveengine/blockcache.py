@@ -0,0 +1,107 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+import json
+import sqlite3
+import threading
+
+
+class BlockCache(object):
+    """ Persistent store for sidechain blocks and transactions (sqlite3)
+
+        Blocks are immutable once they are produced, so they are stored by
+        block number and never refreshed. The transaction ids of each block
+        are indexed, so that transactions can be read from stored blocks.
+
+        :param str path: database file (default is ":memory:")
+
+        .. code-block:: python
+
+            from hiveengine.api import Api
+            from hiveengine.blockcache import BlockCache
+            api = Api(block_cache=BlockCache("blocks.sqlite"))
+            block = api.get_block_info(1910)
+
+    """
+    def __init__(self, path=":memory:"):
+        self.path = path
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        with self.lock, self.db:
+            self.db.execute("CREATE TABLE IF NOT EXISTS blocks (block_num INTEGER PRIMARY KEY, data TEXT NOT NULL)")
+            self.db.execute("CREATE TABLE IF NOT EXISTS transactions (txid TEXT PRIMARY KEY, block_num INTEGER NOT NULL, data TEXT)")
+
+    def close(self):
+        with self.lock:
+            self.db.close()
+
+    def __len__(self):
+        with self.lock:
+            return self.db.execute("SELECT COUNT(*) FROM blocks").fetchone()[0]
+
+    def get_block(self, block_num):
+        """Returns the stored block or None"""
+        with self.lock:
+            row = self.db.execute("SELECT data FROM blocks WHERE block_num = ?", (block_num, )).fetchone()
+        if row is None:
+            return None
+        return json.loads(row[0])
+
+    def get_blocks(self, start, stop):
+        """Returns a dict with all stored blocks from start to stop (not included)"""
+        with self.lock:
+            rows = self.db.execute("SELECT block_num, data FROM blocks WHERE block_num >= ? AND block_num < ?",
+                                   (start, stop)).fetchall()
+        return dict([(block_num, json.loads(data)) for block_num, data in rows])
+
+    def put_blocks(self, blocks):
+        """Stores the blocks and indexes their transactions"""
+        block_rows = []
+        trx_rows = []
+        for block in blocks:
+            if block is None:
+                continue
+            block_rows.append((block["blockNumber"], json.dumps(block)))
+            for trx in block.get("transactions", []):
+                trx_rows.append((trx["transactionId"], block["blockNumber"]))
+        with self.lock, self.db:
+            self.db.executemany("INSERT OR REPLACE INTO blocks (block_num, data) VALUES (?, ?)", block_rows)
+            self.db.executemany("INSERT OR IGNORE INTO transactions (txid, block_num) VALUES (?, ?)", trx_rows)
+
+    def put_block(self, block):
+        """Stores the block and indexes its transactions"""
+        self.put_blocks([block])
+
+    def get_block_num(self, txid):
+        """Returns the block number of a transaction or None"""
+        with self.lock:
+            row = self.db.execute("SELECT block_num FROM transactions WHERE txid = ?", (txid, )).fetchone()
+        if row is None:
+            return None
+        return row[0]
+
+    def get_transaction(self, txid):
+        """Returns the stored transaction or None"""
+        with self.lock:
+            row = self.db.execute("SELECT block_num, data FROM transactions WHERE txid = ?", (txid, )).fetchone()
+        if row is None:
+            return None
+        block_num, data = row
+        if data is not None:
+            return json.loads(data)
+        block = self.get_block(block_num)
+        if block is None:
+            return None
+        for trx in block["transactions"]:
+            if trx["transactionId"] == txid:
+                trx = dict(trx)
+                trx["blockNumber"] = block_num
+                return trx
+        return None
+
+    def put_transaction(self, trx):
+        """Stores a transaction (as returned by getTransactionInfo)"""
+        with self.lock, self.db:
+            self.db.execute("INSERT OR REPLACE INTO transactions (txid, block_num, data) VALUES (?, ?, ?)",
+                            (trx["transactionId"], trx["blockNumber"], json.dumps(trx)))
@@ -0,0 +1,173 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+import json
+import threading
+import time
+from collections import OrderedDict
+from fnmatch import fnmatchcase
+
+
+def copy_result(result):
+    """Returns a copy of the rows of a result (nested dicts and lists are
+        copied too), so that callers can change them without changing the cache
+    """
+    if isinstance(result, dict):
+        return dict([(key, copy_result(value)) for key, value in result.items()])
+    if isinstance(result, list):
+        return [copy_result(value) for value in result]
+    return result
+
+
+# tables which are cached by the shared cache of all Api objects without an
+# own cache, the ttl is short as the supply of tokens and nfts changes
+SHARED_TTL = {
+    "tokens/tokens": 60,
+    "tokens/params": 60,
+    "nft/nfts": 60,
+    "nft/params": 60,
+}
+
+
+class ResponseCacheInstance(object):
+    """Singelton for the shared ResponseCache instances"""
+    instances = {}
+
+
+def shared_response_cache(nodes=None):
+    """Returns the shared ResponseCache of the given node urls, which is
+        used by Api objects without an own cache (e.g. by Token, Tokens,
+        Wallet, Market and Nfts). Only the SHARED_TTL tables are cached.
+    """
+    key = tuple(nodes or [])
+    if key not in ResponseCacheInstance.instances:
+        ttl = dict([(table, 0) for table in ResponseCache.DEFAULT_TTL])
+        ttl.update(SHARED_TTL)
+        ResponseCacheInstance.instances[key] = ResponseCache(ttl=ttl)
+    return ResponseCacheInstance.instances[key]
+
+
+def clear_shared_response_caches():
+    """Removes all shared ResponseCache instances"""
+    ResponseCacheInstance.instances = {}
+
+
+class ResponseCache(object):
+    """ TTL and LRU cache for the results of contract table queries
+
+        The time to live is set per table by "contract/table" patterns. Tables
+        without a ttl are not cached. When more than max_rows rows are stored,
+        the least recently used results are removed.
+
+        :param dict ttl: time to live in seconds for table patterns, which
+            extend and overwrite DEFAULT_TTL, e.g. {"market/metrics": 60}
+        :param float default_ttl: time to live for all other tables (default is 0)
+        :param int max_rows: maximum number of cached rows (default is 100000)
+
+        .. code-block:: python
+
+            from hiveengine.api import Api
+            from hiveengine.cache import ResponseCache
+            api = Api(cache=ResponseCache(ttl={"market/metrics": 60}))
+
+    """
+    DEFAULT_TTL = {
+        "tokens/tokens": 3600,
+        "tokens/params": 3600,
+        "nft/nfts": 3600,
+        "nft/params": 3600,
+        "market/metrics": 10,
+        "market/buyBook": 2,
+        "market/sellBook": 2,
+        "market/tradesHistory": 5,
+        "nftmarket/*sellBook": 2,
+        "nftmarket/*openInterest": 5,
+    }
+
+    def __init__(self, ttl=None, default_ttl=0, max_rows=100000):
+        self.ttl = dict(self.DEFAULT_TTL)
+        if ttl is not None:
+            self.ttl.update(ttl)
+        self.default_ttl = default_ttl
+        self.max_rows = max_rows
+        self.rows = 0
+        self.hits = 0
+        self.misses = 0
+        self._table_ttl = {}
+        self._entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get_ttl(self, contract_name, table_name):
+        """Returns the time to live for a table"""
+        table = "%s/%s" % (contract_name, table_name)
+        if table not in self._table_ttl:
+            ttl = self.default_ttl
+            if table in self.ttl:
+                ttl = self.ttl[table]
+            else:
+                for pattern in self.ttl:
+                    if fnmatchcase(table, pattern):
+                        ttl = self.ttl[pattern]
+                        break
+            self._table_ttl[table] = ttl
+        return self._table_ttl[table]
+
+    def get_key(self, method, contract_name, table_name, query, limit=None, offset=None, indexes=None):
+        """Returns the cache key of a query"""
+        return (method, contract_name, table_name, json.dumps(query, sort_keys=True),
+                limit, offset, json.dumps(indexes, sort_keys=True))
+
+    def get(self, key):
+        """Returns (True, result) for a valid cached result and (False, None) otherwise"""
+        with self.lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return False, None
+            expires, result, rows = entry
+            if expires < time.time():
+                self._remove(key)
+                self.misses += 1
+                return False, None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return True, copy_result(result)
+
+    def set(self, key, result):
+        """Stores the result of the query when its table has a ttl"""
+        ttl = self.get_ttl(key[1], key[2])
+        if ttl <= 0:
+            return
+        rows = len(result) if isinstance(result, list) else 1
+        if rows > self.max_rows:
+            return
+        result = copy_result(result)
+        with self.lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (time.time() + ttl, result, rows)
+            self.rows += rows
+            while self.rows > self.max_rows:
+                self._remove(next(iter(self._entries)))
+
+    def _remove(self, key):
+        expires, result, rows = self._entries.pop(key)
+        self.rows -= rows
+
+    def invalidate(self, contract_name=None, table_name=None):
+        """Removes all cached results of a contract or a table"""
+        with self.lock:
+            for key in list(self._entries):
+                if contract_name is not None and key[1] != contract_name:
+                    continue
+                if table_name is not None and key[2] != table_name:
+                    continue
+                self._remove(key)
+
+    def clear(self):
+        """Removes all cached results"""
+        self.invalidate()
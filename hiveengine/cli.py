@@ -11,14 +11,17 @@ from beem.utils import formatTimeString, addTzInfo
 from beem.blockchain import Blockchain
 from beem.exceptions import WrongMasterPasswordException
 from hiveengine.api import Api
+from hiveengine.amount import Amount, HIVE_PRECISION
 from hiveengine.tokens import Tokens
 from hiveengine.tokenobject import Token
+from hiveengine.holders import Holders
 from hiveengine.market import Market
 from hiveengine.nftmarket import NftMarket
 from hiveengine.wallet import Wallet
-from hiveengine.nfts import Nfts
+from hiveengine.nfts import shared_nfts_instance
 from hiveengine.nft import Nft
 from hiveengine.collection import Collection
+from hiveengine.trades import TradeStore
 from prettytable import PrettyTable
 import time
 import json
@@ -92,6 +95,25 @@ def unlock_wallet(stm, password=None, allow_wif=True):
         return True
 
 
+def print_batch_results(batch):
+    """Prints each broadcasted transaction of an ActionBatch once"""
+    printed = []
+    for result in batch.results:
+        if result["error"] is not None:
+            print("%s failed: %s" % (json.dumps(result["action"]), str(result["error"])))
+        elif result["tx"] not in printed:
+            printed.append(result["tx"])
+            print(json.dumps(result["tx"], indent=4))
+
+
+def get_sell_price(market_info):
+    """Returns the highest bid or, when there is no bid, the last price as Amount"""
+    price = Amount(market_info["highestBid"], HIVE_PRECISION)
+    if price == 0:
+        price = Amount(market_info["lastPrice"], HIVE_PRECISION)
+    return price
+
+
 @shell(prompt='hiveengine> ', intro='Starting hiveengine... (use help to list all commands)', chain=True)
 # click.group(chain=True)
 @click.option(
@@ -133,7 +155,7 @@ def info(objects):
     if not objects:
         latest_block = api.get_latest_block_info()
         tokens = Tokens()
-        nfts = Nfts()
+        nfts = shared_nfts_instance()
         status = api.get_status()
         t = PrettyTable(["Key", "Value"])
         t.align = "l"
@@ -169,7 +191,7 @@ def info(objects):
         elif re.match("^[A-Z0-9\-\._]{1,16}$", obj):
             
             tokens = Tokens()
-            nfts = Nfts()
+            nfts = shared_nfts_instance()
             token = tokens.get_token(obj)
             nft = nfts.get_nft(obj)
             if token is None and nft is None:
@@ -282,7 +304,7 @@ def nftlist():
     """ Show list of all NFTs
 
     """
-    nfts = Nfts()
+    nfts = shared_nfts_instance()
     t = PrettyTable(["id", "Symbol", "Name"])
     t.align = "l"
     for nft in nfts:
@@ -295,7 +317,7 @@ def nftparams():
     """ Show params of all NFTs
 
     """
-    nfts = Nfts()
+    nfts = shared_nfts_instance()
     t = PrettyTable(["key", "value"])
     t.align = "l"
     params = nfts.get_nft_params()
@@ -310,14 +332,14 @@ def nftparams():
 @click.option('--sort-by-id', '-s', is_flag=True, default=False, help="Sort NFTs by their ID")
 def collection(account, symbol, sort_by_id):
     """Return NFT collection for an account"""
+    nfts = shared_nfts_instance()
     if len(symbol) == 0:
-        nfts = Nfts()
         symbol = nfts.get_symbol_list()
-    collection = Collection(account)
+    collection = Collection(account, api=nfts.api, symbols=list(symbol))
     for s in symbol:
         if s not in collection:
             continue
-        nft = Nft(s)
+        nft = nfts.get_nft(s)
         groupBy = nft["groupBy"]
         
         print("NFT: %s" % s)
@@ -371,11 +393,14 @@ def collection(account, symbol, sort_by_id):
 @click.argument('symbol', nargs=-1)
 def nftinfo(symbol):
     """Returns information about an NFT symbol"""
+    nfts = shared_nfts_instance()
     if len(symbol) == 0:
-        nfts = Nfts()
         symbol = nfts.get_symbol_list()
     for s in symbol:
-        nft = Nft(s)
+        nft = nfts.get_nft(s)
+        if nft is None:
+            print("Could not found symbol %s" % s)
+            continue
         print("NFT: %s" % s)
         t = PrettyTable(["key", "value"])
         t._max_width = {"value": 60}
@@ -403,33 +428,20 @@ def nft(symbol, nftid):
     """Returns information about an NFT ID"""
     nft = Nft(symbol)
     if len(nftid) == 0:
-        groupBy = nft["groupBy"]
-        max_id = nft["supply"]
-        nft_count = {}
-        
-        for _id in range(max_id):
-            nft_obj = nft.get_id(int(_id) + 1)
-            ident = ""
-            for g in groupBy:
-                if g in nft_obj["properties"] and nft_obj["properties"][g] is not None:
-                    ident += nft_obj["properties"][g].lower() + " - "
-            if ident[:-3] in nft_count:
-                nft_count[ident[:-3]] += 1
-            else:
-                nft_count[ident[:-3]] = 1
+        nft_count = nft.census()
+        total = sum(nft_count.values())
         t = PrettyTable(["type", "N", "percentage"])
         t.align = "l"
-        for key in nft_count:
-            t.add_row([key, nft_count[key], round(nft_count[key]/max_id*100, 2)])
+        for key, count in nft_count.most_common():
+            t.add_row([" - ".join([str(k) for k in key if k is not None]), count, round(count / total * 100, 2)])
         print(t)
             
     else:
         t = PrettyTable(["_id", "account", "ownedBy", "lockedTokens", "properties"])
         t._max_width = {"properties": 60}
         t.align = "l"    
-        for _id in nftid:
-            nft_obj = nft.get_id(int(_id))
-            t.add_row([_id, nft_obj["account"], nft_obj["ownedBy"], nft_obj["lockedTokens"], nft_obj["properties"]])
+        for nft_obj in nft.get_ids(nftid):
+            t.add_row([nft_obj["_id"], nft_obj["account"], nft_obj["ownedBy"], nft_obj["lockedTokens"], nft_obj["properties"]])
         print(t)
 
 
@@ -441,15 +453,14 @@ def richlist(symbol, top):
 
     """
     token = Token(symbol)
-    holder = token.get_holder()
-    market_info = token.get_market_info()
-    last_price = float(market_info["lastPrice"])
-    sorted_holder = sorted(holder, key=lambda account: float(account["balance"]), reverse=True)
+    holders = Holders(token.symbol, api=token.api, precision=token["precision"])
+    last_price = holders.get_last_price()
     t = PrettyTable(["Balance", "Account", "Value [HIVE]"])
     t.align = "l"
-    for balance in sorted_holder[:int(top)]:
-        t.add_row([balance["balance"], balance["account"], "%.3f" % (float(balance["balance"]) * last_price)])
+    for account, balance in holders.top(int(top), "balance"):
+        t.add_row([str(balance), account, "%.3f" % float(balance.value_at(last_price))])
     print(t.get_string())
+    print("%d holders, top %d hold %.2f %% of the balance, Gini: %.3f" % (len(holders), int(top), holders.concentration(int(top), "balance") * 100, holders.gini("balance")))
 
 
 @cli.command()
@@ -482,50 +493,44 @@ def transfer(to, amount, token, memo, memos, account):
         amount = 0
         tokens = Tokens()
         
-        for t in wallet:
-            token = t["symbol"]
-            amount = float(t["balance"])
-            if amount == 0:
-                continue
-            token_obj = tokens.get_token(token)
-            market_info = token_obj.get_market_info()
-            if market_info is None:
-                print("transfer  %.8f %s to %s?" % (amount, token, to))
-            else:
-                last_price = float(market_info["lastPrice"])
-                highest_bid = float(market_info["highestBid"])
-                if highest_bid == 0:
-                    price = last_price
-                else:
-                    price = highest_bid
-                hive_amount = price*amount
-                print("transfer %.8f %s (value %.3f HIVE) to %s?" % (amount, token, hive_amount, to))
-            ret = input("continue [y/n]?")
-            if ret not in ["y", "yes"]:
-                continue
-            tx = wallet.transfer(to, amount, token, memos)
-            tx = json.dumps(tx, indent=4)
-            print(tx)
+        # confirmed actions are broadcasted also when a later token fails
+        batch = wallet.batch(flush_on_error=True)
+        try:
+            with batch:
+                for t in wallet:
+                    token = t["symbol"]
+                    amount = Amount(t["balance"], HIVE_PRECISION)
+                    if amount == 0:
+                        continue
+                    token_obj = tokens.get_token(token)
+                    market_info = token_obj.get_market_info()
+                    if market_info is None:
+                        print("transfer  %.8f %s to %s?" % (amount, token, to))
+                    else:
+                        price = get_sell_price(market_info)
+                        hive_amount = amount.value_at(price)
+                        print("transfer %.8f %s (value %.3f HIVE) to %s?" % (amount, token, hive_amount, to))
+                    ret = input("continue [y/n]?")
+                    if ret not in ["y", "yes"]:
+                        continue
+                    wallet.transfer(to, amount, token, memos)
+        finally:
+            print_batch_results(batch)
         return
     elif token is None:
         token = amount
         amount = 0
         for t in wallet:
             if t["symbol"] == token:
-                amount = float(t["balance"])
+                amount = Amount(t["balance"], HIVE_PRECISION)
         if amount == 0:
             print("Amount of %s is 0" % token)
             return
         tokens = Tokens()
         token_obj = tokens.get_token(token)   
         market_info = token_obj.get_market_info()
-        last_price = float(market_info["lastPrice"])
-        highest_bid = float(market_info["highestBid"])
-        if highest_bid == 0:
-            price = last_price
-        else:
-            price = highest_bid
-        hive_amount = price*amount
+        price = get_sell_price(market_info)
+        hive_amount = amount.value_at(price)
         print("transfer %.8f %s (value %.3f HIVE) to %s?" % (amount, token, hive_amount, to))
         ret = input("continue [y/n]?")
         if ret not in ["y", "yes"]:
@@ -586,7 +591,7 @@ def stake(amount, token, account, receiver):
         
         for t in wallet:
             token = t["symbol"]
-            amount = float(t["balance"])
+            amount = Amount(t["balance"], HIVE_PRECISION)
             if amount == 0:
                 continue
             token_obj = tokens.get_token(token)
@@ -596,13 +601,8 @@ def stake(amount, token, account, receiver):
             if market_info is None:
                 print("stake %.8f %s?" % (amount, token))
             else:
-                last_price = float(market_info["lastPrice"])
-                highest_bid = float(market_info["highestBid"])
-                if highest_bid == 0:
-                    price = last_price
-                else:
-                    price = highest_bid
-                hive_amount = price*amount
+                price = get_sell_price(market_info)
+                hive_amount = amount.value_at(price)
                 print("stake %.8f %s (value %.3f HIVE)?" % (amount, token, hive_amount))
             ret = input("continue [y/n]?")
             if ret not in ["y", "yes"]:
@@ -616,7 +616,7 @@ def stake(amount, token, account, receiver):
         amount = 0
         for t in wallet:
             if t["symbol"] == token:
-                amount = float(t["balance"])
+                amount = Amount(t["balance"], HIVE_PRECISION)
         if amount == 0:
             print("Amount of %s is 0" % token)
             return
@@ -626,13 +626,8 @@ def stake(amount, token, account, receiver):
             print("%s is not stakable" % token)
             return        
         market_info = token_obj.get_market_info()
-        last_price = float(market_info["lastPrice"])
-        highest_bid = float(market_info["highestBid"])
-        if highest_bid == 0:
-            price = last_price
-        else:
-            price = highest_bid
-        hive_amount = price*amount
+        price = get_sell_price(market_info)
+        hive_amount = amount.value_at(price)
         print("stake %.8f %s (value %.3f HIVE)?" % (amount, token, hive_amount))
         ret = input("continue [y/n]?")
         if ret not in ["y", "yes"]:
@@ -667,8 +662,8 @@ def unstake(amount, token, account):
         
         for t in wallet:
             token = t["symbol"]
-            amount = float(t["balance"])
-            stake = float(t["stake"])
+            amount = Amount(t["balance"], HIVE_PRECISION)
+            stake = Amount(t["stake"], HIVE_PRECISION)
             if stake == 0:
                 continue
             token_obj = tokens.get_token(token)
@@ -678,13 +673,8 @@ def unstake(amount, token, account):
             if market_info is None:
                 print("unstake %.8f %s?" % (stake, token))
             else:
-                last_price = float(market_info["lastPrice"])
-                highest_bid = float(market_info["highestBid"])
-                if highest_bid == 0:
-                    price = last_price
-                else:
-                    price = highest_bid
-                hive_amount = price*stake
+                price = get_sell_price(market_info)
+                hive_amount = stake.value_at(price)
                 print("unstake %.8f %s (value %.3f HIVE)?" % (stake, token, hive_amount))
             ret = input("continue [y/n]?")
             if ret not in ["y", "yes"]:
@@ -698,7 +688,7 @@ def unstake(amount, token, account):
         amount = 0
         for t in wallet:
             if t["symbol"] == token:
-                amount = float(t["stake"])
+                amount = Amount(t["stake"], HIVE_PRECISION)
         if amount == 0:
             print("Staked Amount of %s is 0" % token)
             return
@@ -708,13 +698,8 @@ def unstake(amount, token, account):
             print("%s is not stakable" % token)
             return        
         market_info = token_obj.get_market_info()
-        last_price = float(market_info["lastPrice"])
-        highest_bid = float(market_info["highestBid"])
-        if highest_bid == 0:
-            price = last_price
-        else:
-            price = highest_bid
-        hive_amount = price*amount
+        price = get_sell_price(market_info)
+        hive_amount = amount.value_at(price)
         print("unstake %.8f %s (value %.3f HIVE)?" % (amount, token, hive_amount))
         ret = input("continue [y/n]?")
         if ret not in ["y", "yes"]:
@@ -813,6 +798,19 @@ def buy(amount, token, price, account):
     print(tx)
 
 
+def print_sell_quote(market, token, amount, price):
+    """Prints how much of amount is filled by the buy book at price"""
+    quote = market.quote(token, "sell", amount, price=price)
+    if quote["filled"] == 0:
+        print("No buy order at this price, the sell order is added to the order book")
+        return
+    print("%s %s are filled by %d buy order levels for %s HIVE (average price %s, %.2f %% slippage)" %
+          (str(quote["filled"]), token, quote["levels"], str(quote["cost"]), str(quote["avg_price"]),
+           quote["slippage"] * 100))
+    if quote["remaining"] > 0:
+        print("%s %s are added to the sell book" % (str(quote["remaining"]), token))
+
+
 @cli.command()
 @click.argument('amount', nargs=1, required=False)
 @click.argument('token', nargs=1, required=False)
@@ -830,40 +828,41 @@ def sell(amount, token, price, account):
         return
     if account is None:
         account = stm.config["default_account"]
+    # the market (and its token list) is used for the quotes and the sell orders
+    market = Market(blockchain_instance=stm)
 
     if amount is None and price is None and token is None:
         if not unlock_wallet(stm):
             return
         token = amount
         amount = 0
-        tokens = Tokens()
+        tokens = market.tokens
         wallet = Wallet(account, blockchain_instance=stm)
-        market = Market(blockchain_instance=stm)
-        for t in wallet:
-            token = t["symbol"]
-            amount = float(t["balance"])
-            if amount == 0:
-                continue
-            token_obj = tokens.get_token(token)
-            market_info = token_obj.get_market_info()
-            if market_info is None:
-                continue
-            last_price = float(market_info["lastPrice"])
-            highest_bid = float(market_info["highestBid"])
-            if highest_bid == 0:
-                price = last_price
-            else:
-                price = highest_bid
-            hive_amount = price*amount
-            if hive_amount < 0.001:
-                continue
-            print("%s: using %.8f as price to sell %.8f %s for %.8f HIVE" % (token, price, amount, token, hive_amount))
-            ret = input("continue [y/n]?")
-            if ret not in ["y", "yes"]:
-                continue
-            tx = market.sell(account, amount, token, price)
-            tx = json.dumps(tx, indent=4)
-            print(tx)
+        # confirmed actions are broadcasted also when a later token fails
+        batch = market.batch(flush_on_error=True)
+        try:
+            with batch:
+                for t in wallet:
+                    token = t["symbol"]
+                    amount = Amount(t["balance"], HIVE_PRECISION)
+                    if amount == 0:
+                        continue
+                    token_obj = tokens.get_token(token)
+                    market_info = token_obj.get_market_info()
+                    if market_info is None:
+                        continue
+                    price = get_sell_price(market_info)
+                    hive_amount = amount.value_at(price)
+                    if hive_amount < 0.001:
+                        continue
+                    print("%s: using %.8f as price to sell %.8f %s for %.8f HIVE" % (token, price, amount, token, hive_amount))
+                    print_sell_quote(market, token, amount, price)
+                    ret = input("continue [y/n]?")
+                    if ret not in ["y", "yes"]:
+                        continue
+                    market.sell(account, amount, token, price)
+        finally:
+            print_batch_results(batch)
         return
 
     elif price is None and token is None:
@@ -872,28 +871,22 @@ def sell(amount, token, price, account):
         wallet = Wallet(account, blockchain_instance=stm)
         for t in wallet:
             if t["symbol"] == token:
-                amount = float(t["balance"])
+                amount = Amount(t["balance"], HIVE_PRECISION)
         if amount == 0:
             print("Amount of %s is 0" % token)
             return
-        tokens = Tokens()
-        token_obj = tokens.get_token(token)
+        token_obj = market.tokens.get_token(token)
         market_info = token_obj.get_market_info()
-        last_price = float(market_info["lastPrice"])
-        highest_bid = float(market_info["highestBid"])
-        if highest_bid == 0:
-            price = last_price
-        else:
-            price = highest_bid
-        hive_amount = price*amount
+        price = get_sell_price(market_info)
+        hive_amount = amount.value_at(price)
         print("using %.8f as price to sell %.8f %s for %.8f HIVE" % (price, amount, token, hive_amount))
+        print_sell_quote(market, token, amount, price)
         ret = input("continue [y/n]?")
         if ret not in ["y", "yes"]:
             return
 
 
 
-    market = Market(blockchain_instance=stm)
     if not unlock_wallet(stm):
         return
     tx = market.sell(account, amount, token, price)
@@ -921,32 +914,27 @@ def balance(account):
     wallet = Wallet(account, blockchain_instance=stm)
     table = PrettyTable(["symbol", "balance", "stake", "liquid HIVE", "staked HIVE"])
     table.align = "l"    
-    sum_amount = 0
-    sum_staked = 0
+    sum_amount = Amount(0, HIVE_PRECISION)
+    sum_staked = Amount(0, HIVE_PRECISION)
     for t in wallet:
         token = t["symbol"]
-        amount = float(t["balance"])
-        stake = float(t["stake"])
         token_obj = tokens.get_token(token)
+        amount = token_obj.amount(t["balance"])
+        stake = token_obj.amount(t["stake"])
         market_info = token_obj.get_market_info()
         if market_info is None:
             continue
-        last_price = float(market_info["lastPrice"])
-        highest_bid = float(market_info["highestBid"])
-        if highest_bid == 0:
-            price = last_price
-        else:
-            price = highest_bid
-        balance_hive = price*amount
-        stake_hive = price*stake
+        price = get_sell_price(market_info)
+        balance_hive = amount.value_at(price)
+        stake_hive = stake.value_at(price)
         sum_amount += balance_hive
         sum_staked += stake_hive
         if token_obj["stakingEnabled"]:
-            table.add_row([token, amount, stake, "%.3f" % balance_hive, "%.3f" % stake_hive])
+            table.add_row([token, str(amount), str(stake), str(balance_hive.rescale(3)), str(stake_hive.rescale(3))])
         else:
-            table.add_row([token, amount, stake, "%.3f" % balance_hive, "-"])
+            table.add_row([token, str(amount), str(stake), str(balance_hive.rescale(3)), "-"])
     table.add_row(["-", "-", "-", "-", "-"])
-    table.add_row(["SUM", "", "", "%.3f" % sum_amount, "%.3f" % sum_staked])
+    table.add_row(["SUM", "", "", str(sum_amount.rescale(3)), str(sum_staked.rescale(3))])
     print(table)
 
 
@@ -1228,7 +1216,8 @@ def nftopen(symbol, grouping, value, price_symbol):
 @cli.command()
 @click.argument('symbol', nargs=1, required=False)
 @click.option('--account', '-a', help='Buy with this account (defaults to "default_account")')
-def nfttrades(symbol, account):
+@click.option('--trade-db', '-d', help='Stores the trades in this sqlite file and only fetches new trades')
+def nfttrades(symbol, account, trade_db):
     """Returns the trades history
     """
     stm = shared_blockchain_instance()
@@ -1238,10 +1227,21 @@ def nfttrades(symbol, account):
         print("Please set a Hive node")
         return
     market = NftMarket(blockchain_instance=stm)
+    store = None
+    if trade_db is not None:
+        store = TradeStore(trade_db, api=market.api)
+
+    def get_trades_history(s):
+        if store is None:
+            return market.get_trades_history(s, account)
+        store.sync(s, nft=True)
+        trades_history = store.get_trades(s, nft=True, start=time.time() - 24 * 60 * 60)
+        return [t for t in trades_history if account is None or t["account"] == account]
+
     if symbol is not None:
         
         nft = Nft(symbol)
-        trades_history = market.get_trades_history(symbol, account)
+        trades_history = get_trades_history(symbol)
         new_trades_history = []
         market_info = {}
         for order in trades_history:
@@ -1274,14 +1274,13 @@ def nfttrades(symbol, account):
         print(t.get_string())
         print("%d Nfts were sold for %.3f HIVE in the last 24 h" % (row_sum[3], row_sum[6]))
     else:
-        nfts = Nfts()
+        nfts = shared_nfts_instance()
         symbol = nfts.get_symbol_list()
         market_info = {}
         t = PrettyTable(["Symbol", "Sold NFTs", "est. HIVE sum"])
         t.align = "l"        
         for s in symbol:
-            nft = Nft(s)
-            trades_history = market.get_trades_history(s, account)
+            trades_history = get_trades_history(s)
             new_trades_history = []
             hive_sum = 0
             nft_sum = 0
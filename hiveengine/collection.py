@@ -11,12 +11,14 @@ import requests
 from timeit import default_timer as timer
 import logging
 import decimal
+from concurrent.futures import ThreadPoolExecutor
 from hiveengine.api import Api
 from hiveengine.nft import Nft
-from hiveengine.nfts import Nfts
+from hiveengine.nfts import shared_nfts_instance
 from hiveengine.exceptions import (TokenDoesNotExists, TokenNotInWallet, InsufficientTokenAmount, TokenIssueNotPermitted, MaxSupplyReached, InvalidTokenAmount)
 from beem.instance import shared_blockchain_instance
 from beem.account import Account
+log = logging.getLogger(__name__)
 
 
 class Collection(dict):
@@ -25,6 +27,7 @@ class Collection(dict):
         :param str account: Name of the account
         :param Hive blockchain_instance: Hive
                instance
+        :param list symbols: (optional) only NFTs of these symbols are loaded
                
         Wallet example:
 
@@ -35,16 +38,18 @@ class Collection(dict):
                 print(collection)
 
     """
-    def __init__(self, account, api=None, blockchain_instance=None, steem_instance=None):
+    def __init__(self, account, api=None, blockchain_instance=None, steem_instance=None, symbols=None):
+        # the api of the shared Nfts instance is reused, so that the nft table is only loaded once
+        self.nfts = shared_nfts_instance(api=api)
         if api is None:
-            self.api = Api()
+            self.api = self.nfts.api
         else:
             self.api = api
         self.ssc_id = "ssc-mainnet-hive"
         self.blockchain = blockchain_instance or steem_instance or shared_blockchain_instance()
         check_account = Account(account, blockchain_instance=self.blockchain)
         self.account = check_account["name"]
-        self.nfts = Nfts()
+        self.symbols = symbols
         self.refresh()
 
     def refresh(self):
@@ -54,14 +59,53 @@ class Collection(dict):
         """Sets the ssc id (default is ssc-mainnet-hive)"""
         self.ssc_id = ssc_id
 
-    def get_collection(self):
-        """Returns all token within the wallet as list"""
+    def get_collection(self, symbols=None, batch_size=50, workers=4):
+        """Returns all token within the wallet as list
+
+            The instance tables of batch_size symbols are requested with one
+            batch request and workers batch requests are sent concurrently.
+
+            :param list symbols: only NFTs of these symbols are loaded
+                (default are the symbols of the collection or all symbols)
+            :param int batch_size: number of symbols in one batch request
+            :param int workers: number of concurrent batch requests
+        """
+        if symbols is None:
+            symbols = self.symbols
+        if symbols is None:
+            symbols = self.nfts.get_symbol_list()
+        chunks = [symbols[i:i + batch_size] for i in range(0, len(symbols), batch_size)]
+        collection = {}
+        if len(chunks) == 0:
+            return collection
+        executor = ThreadPoolExecutor(max_workers=min(workers, len(chunks)))
+        try:
+            for chunk_collection in executor.map(self._get_collection_chunk, chunks):
+                collection.update(chunk_collection)
+        finally:
+            executor.shutdown(wait=False)
+        return collection
+
+    def _get_collection_chunk(self, symbols):
+        """Returns the collection for some symbols with one batch request"""
+        limit = 1000
+        with self.api.rpc.batch(max_batch_size=len(symbols)) as b:
+            pages = [b.find({"contract": "nft", "table": "%sinstances" % symbol, "query": {"account": self.account},
+                             "limit": limit, "offset": 0, "indexes": []}, endpoint="contracts")
+                     for symbol in symbols]
         collection = {}
-        for symbol in self.nfts.get_symbol_list():
-            nft = Nft(symbol)
-            tokenlist = nft.get_collection(self.account)
-            if len(tokenlist) > 0:
-                collection[symbol] = tokenlist
+        for symbol, page in zip(symbols, pages):
+            if page.exception() is not None:
+                # no reply for this symbol within the batch, request it again on its own
+                log.warning("%s: %s" % (symbol, str(page.exception())))
+                tokenlist = self.api.find_all("nft", "%sinstances" % symbol, query={"account": self.account}, keyset=True)
+            else:
+                tokenlist = page.result()
+            if tokenlist is None or len(tokenlist) == 0:
+                continue
+            if len(tokenlist) == limit:
+                tokenlist = self.api.find_all("nft", "%sinstances" % symbol, query={"account": self.account}, keyset=True)
+            collection[symbol] = tokenlist
         return collection
 
     def change_account(self, account):
@@ -45,3 +45,9 @@ class MaxSupplyReached(Exception):
     """ Only the token issuer is allowed to permit new tokens
     """
     pass
+
+
+class BlockNotAvailable(Exception):
+    """ Block was not returned by the node within the wait time
+    """
+    pass
@@ -0,0 +1,142 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from hiveengine.api import Api
+
+
+class HistoryCursors(object):
+    """ Persistent cursors of the account history (sqlite3)
+
+        For each (account, symbol) the _id and timestamp of the newest
+        processed history entry are stored.
+
+        :param str path: database file (default is ":memory:")
+    """
+    def __init__(self, path=":memory:"):
+        self.path = path
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        with self.lock, self.db:
+            self.db.execute("CREATE TABLE IF NOT EXISTS cursors (account TEXT NOT NULL, symbol TEXT NOT NULL, "
+                            "id TEXT NOT NULL, timestamp INTEGER, PRIMARY KEY (account, symbol))")
+
+    def close(self):
+        with self.lock:
+            self.db.close()
+
+    def get(self, account, symbol):
+        """Returns (_id, timestamp) of the newest processed entry or None"""
+        with self.lock:
+            return self.db.execute("SELECT id, timestamp FROM cursors WHERE account = ? AND symbol = ?",
+                                   (account, symbol)).fetchone()
+
+    def set(self, account, symbol, entry):
+        """Stores a history entry as newest processed entry"""
+        with self.lock, self.db:
+            self.db.execute("INSERT OR REPLACE INTO cursors (account, symbol, id, timestamp) VALUES (?, ?, ?, ?)",
+                            (account, symbol, entry["_id"], entry.get("timestamp")))
+
+    def delete(self, account, symbol):
+        """Removes a cursor, the complete history is read again"""
+        with self.lock, self.db:
+            self.db.execute("DELETE FROM cursors WHERE account = ? AND symbol = ?", (account, symbol))
+
+
+class AccountHistory(object):
+    """ Reads the token history of accounts (see :func:`hiveengine.api.Api.get_history`)
+
+        The history api returns the newest entries first. All pages are read
+        until the entry of the stored cursor is reached, so that every poll
+        only returns new entries. New entries are returned oldest first and
+        the cursor is moved forward after each processed entry. Several
+        (account, symbol) pairs are requested concurrently.
+
+        :param Api api: (optional) Api instance
+        :param cursors: (optional) :class:`HistoryCursors` or path of its
+            database, default is a cursor store in memory
+        :param int page_size: entries per request (default is 1000)
+        :param int workers: number of concurrent requests (default is 4)
+
+        .. code-block:: python
+
+            from hiveengine.history import AccountHistory
+            history = AccountHistory(cursors="history.sqlite")
+            for account, symbol, entry in history.poll([("beembot", "BEE"), ("holger80", "BEE")]):
+                print(account, symbol, entry["operation"], entry.get("quantity"))
+
+    """
+    def __init__(self, api=None, cursors=None, page_size=1000, workers=4):
+        if api is None:
+            self.api = Api()
+        else:
+            self.api = api
+        if cursors is None:
+            cursors = HistoryCursors()
+        elif not isinstance(cursors, HistoryCursors):
+            cursors = HistoryCursors(cursors)
+        self.cursors = cursors
+        self.page_size = page_size
+        self.workers = workers
+
+    def iter_all(self, account, symbol, cursor=None):
+        """Yields the history entries page by page, newest first, until the
+            entry with the _id of cursor is reached
+
+            :param tuple cursor: (optional) (_id, timestamp) of the last known entry
+        """
+        offset = 0
+        seen = set()
+        while True:
+            page = self.api.get_history(account, symbol, limit=self.page_size, offset=offset)
+            if not isinstance(page, list):
+                return
+            for entry in page:
+                if cursor is not None:
+                    if entry.get("_id") == cursor[0]:
+                        return
+                    if cursor[1] is not None and entry.get("timestamp") is not None and entry["timestamp"] < cursor[1]:
+                        return
+                # new entries move the offset, skip entries of the previous page
+                if entry.get("_id") in seen:
+                    continue
+                seen.add(entry.get("_id"))
+                yield entry
+            if len(page) < self.page_size:
+                return
+            offset += self.page_size
+
+    def get_new(self, account, symbol):
+        """Returns all entries after the stored cursor, oldest first. The cursor is not changed."""
+        entries = list(self.iter_all(account, symbol, cursor=self.cursors.get(account, symbol)))
+        entries.reverse()
+        return entries
+
+    def commit(self, account, symbol, entry):
+        """Stores entry as newest processed entry of (account, symbol)"""
+        self.cursors.set(account, symbol, entry)
+
+    def iter_new(self, account, symbol):
+        """Yields all new entries of one account and symbol, oldest first,
+            and moves the cursor after each entry
+        """
+        for entry in self.get_new(account, symbol):
+            yield entry
+            self.commit(account, symbol, entry)
+
+    def poll(self, pairs):
+        """Requests the new entries of all (account, symbol) pairs concurrently and yields
+            (account, symbol, entry). The cursor is moved after each entry.
+
+            :param list pairs: list of (account, symbol)
+        """
+        pairs = list(pairs)
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            futures = [executor.submit(self.get_new, account, symbol) for account, symbol in pairs]
+            for (account, symbol), future in zip(pairs, futures):
+                for entry in future.result():
+                    yield account, symbol, entry
+                    self.commit(account, symbol, entry)
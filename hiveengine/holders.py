@@ -0,0 +1,191 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+from array import array
+import heapq
+from hiveengine.api import Api
+from hiveengine.amount import Amount, SCALES, parse_amount
+from hiveengine.tokenobject import Token
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+class Holders(object):
+    """ Holder analytics of a token
+
+        All holders are streamed from tokens/balances and stored in columnar
+        arrays (one int64 array per column), the account names are stored in
+        a list with the same order. Amounts are stored as integer units scaled
+        by 10 ** precision, so that totals are exact; they are converted to
+        float only for the Gini coefficient, percentiles and shares. When numpy
+        is installed, the columns are used as numpy arrays without copying and
+        all statistics are vectorized.
+
+        :param str symbol: token symbol
+        :param Api api: (optional) Api instance
+        :param int precision: (optional) token precision, is read from
+            the tokens table when not set
+
+        .. code-block:: python
+
+            from hiveengine.holders import Holders
+            holders = Holders("BEE")
+            print(holders.top(10))
+            print(holders.gini())
+
+    """
+    columns = ["balance", "stake", "pendingUnstake", "delegationsIn", "delegationsOut"]
+
+    def __init__(self, symbol, api=None, precision=None):
+        if api is None:
+            self.api = Api()
+        else:
+            self.api = api
+        self.symbol = symbol.upper()
+        if precision is None:
+            precision = Token(self.symbol, api=self.api)["precision"]
+        self.precision = precision
+        self.refresh()
+
+    def refresh(self):
+        """Loads all holders of the token"""
+        self.accounts = []
+        self.data = dict([(column, array("q")) for column in self.columns])
+        query = {"symbol": self.symbol}
+        for row in self.api.find_iter("tokens", "balances", query=query, keyset=True, prefetch=True):
+            self.accounts.append(row["account"])
+            for column in self.columns:
+                self.data[column].append(parse_amount(row.get(column) or 0, self.precision))
+
+    def __len__(self):
+        return len(self.accounts)
+
+    def __getitem__(self, column):
+        return self.data[column]
+
+    def holdings(self):
+        """Returns balance + stake + delegationsOut of each holder in units"""
+        balance = self._get_column("balance")
+        stake = self._get_column("stake")
+        delegations_out = self._get_column("delegationsOut")
+        if np is not None:
+            return balance + stake + delegations_out
+        return array("q", [b + s + d for b, s, d in zip(balance, stake, delegations_out)])
+
+    def _get_column(self, column):
+        """Returns a column as numpy array without copying, or as array when numpy is missing"""
+        if np is not None:
+            return np.frombuffer(self.data[column], dtype=np.int64)
+        return self.data[column]
+
+    def _get_values(self, column):
+        if column is None:
+            return self.holdings()
+        return self._get_column(column)
+
+    def _sum(self, values):
+        """Returns the exact sum of integer units as int"""
+        if np is not None:
+            # summed in two 32 bit halves, int64 would overflow for large supplies
+            return (int((values >> 32).sum()) << 32) + int((values & 0xffffffff).sum())
+        return sum(values)
+
+    def _to_float(self, units):
+        return units / SCALES[self.precision]
+
+    def _sorted(self, values):
+        if np is not None:
+            return np.sort(values)
+        return sorted(values)
+
+    def _top_index(self, values, n):
+        """Returns the indices of the n largest values, largest first"""
+        n = min(n, len(values))
+        if n <= 0:
+            return []
+        if np is not None:
+            index = np.argpartition(-values, n - 1)[:n]
+            # ties are ordered by position, as in the pure python path
+            return index[np.lexsort((index, -values[index]))]
+        return heapq.nlargest(n, range(len(values)), key=values.__getitem__)
+
+    def total(self, column=None):
+        """Returns the sum of a column (default are the holdings) as Amount"""
+        return Amount.from_units(self._sum(self._get_values(column)), self.precision)
+
+    def top(self, n=50, column=None):
+        """Returns the n largest holders as list of (account, Amount)
+
+            :param int n: number of holders
+            :param str column: balance, stake, pendingUnstake, delegationsIn,
+                delegationsOut or None for the holdings
+        """
+        values = self._get_values(column)
+        return [(self.accounts[i], Amount.from_units(int(values[i]), self.precision)) for i in self._top_index(values, n)]
+
+    def percentiles(self, q=(50, 90, 99), column=None):
+        """Returns a dict with the percentiles (linear interpolation) of a column as float"""
+        values = self._sorted(self._get_values(column))
+        ret = {}
+        if len(values) == 0:
+            return ret
+        for p in q:
+            pos = (len(values) - 1) * p / 100.
+            lower = int(pos)
+            upper = min(lower + 1, len(values) - 1)
+            lower_value = self._to_float(int(values[lower]))
+            upper_value = self._to_float(int(values[upper]))
+            ret[p] = lower_value + (upper_value - lower_value) * (pos - lower)
+        return ret
+
+    def gini(self, column=None):
+        """Returns the Gini coefficient of a column (0 equal, 1 concentrated)"""
+        values = self._sorted(self._get_values(column))
+        n = len(values)
+        if n == 0:
+            return 0.
+        total = self._sum(values)
+        if total == 0:
+            return 0.
+        if np is not None:
+            weighted = float((np.arange(1, n + 1) * values.astype(np.float64)).sum())
+        else:
+            weighted = float(sum([i * v for i, v in enumerate(values, 1)]))
+        return 2. * weighted / (n * float(total)) - (n + 1.) / n
+
+    def concentration(self, n=10, column=None):
+        """Returns the share of the n largest holders"""
+        values = self._get_values(column)
+        total = self._sum(values)
+        if np is not None:
+            n = min(n, len(values))
+            top = self._sum(np.partition(values, len(values) - n)[len(values) - n:]) if n > 0 else 0
+        else:
+            top = sum([values[i] for i in self._top_index(values, n)])
+        if total == 0:
+            return 0.
+        return top / total
+
+    def hive_value(self, column=None, last_price=None):
+        """Returns the value of a column in HIVE as Amount
+
+            :param float last_price: (optional) token price, default is the
+                lastPrice of the market
+        """
+        if last_price is None:
+            last_price = self.get_last_price()
+        return self.total(column).value_at(last_price)
+
+    def get_last_price(self):
+        """Returns the last market price of the token"""
+        if self.symbol == "SWAP.HIVE":
+            return 1.
+        metrics = self.api.find_one("market", "metrics", query={"symbol": self.symbol})
+        if isinstance(metrics, list):
+            metrics = metrics[0] if len(metrics) > 0 else None
+        if metrics is None:
+            return 0.
+        return float(metrics["lastPrice"])
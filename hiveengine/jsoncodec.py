@@ -0,0 +1,88 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+import json
+try:
+    import orjson
+except ImportError:
+    orjson = None
+try:
+    import ujson
+except ImportError:
+    ujson = None
+
+
+class JsonCodec(object):
+    """ JSON codec of the standard library
+
+        dumps returns utf8 encoded bytes, loads accepts bytes and str.
+    """
+    name = "json"
+
+    def dumps(self, obj):
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf8")
+
+    def loads(self, data):
+        if isinstance(data, bytes):
+            data = data.decode("utf8")
+        return json.loads(data, strict=False)
+
+
+class OrjsonCodec(JsonCodec):
+    """ JSON codec which uses orjson
+
+        Replies with control characters in strings, which are rejected
+        by orjson, are decoded by the standard library.
+    """
+    name = "orjson"
+
+    def dumps(self, obj):
+        return orjson.dumps(obj)
+
+    def loads(self, data):
+        try:
+            return orjson.loads(data)
+        except ValueError:
+            return super(OrjsonCodec, self).loads(data)
+
+
+class UjsonCodec(JsonCodec):
+    """ JSON codec which uses ujson"""
+    name = "ujson"
+
+    def dumps(self, obj):
+        return ujson.dumps(obj, ensure_ascii=False).encode("utf8")
+
+    def loads(self, data):
+        try:
+            return ujson.loads(data)
+        except ValueError:
+            return super(UjsonCodec, self).loads(data)
+
+
+def get_codec(name=None):
+    """Returns a JSON codec. When name is not set, orjson or ujson is used
+        when installed and the standard library otherwise.
+
+        :param str name: json, orjson or ujson (optional)
+    """
+    if isinstance(name, JsonCodec):
+        return name
+    if name is None:
+        if orjson is not None:
+            return OrjsonCodec()
+        if ujson is not None:
+            return UjsonCodec()
+        return JsonCodec()
+    if name == "orjson":
+        if orjson is None:
+            raise ImportError("orjson is not installed")
+        return OrjsonCodec()
+    if name == "ujson":
+        if ujson is None:
+            raise ImportError("ujson is not installed")
+        return UjsonCodec()
+    if name == "json":
+        return JsonCodec()
+    raise ValueError("Unknown json codec %s" % name)
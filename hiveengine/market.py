@@ -8,17 +8,19 @@ import time
 import json
 from timeit import default_timer as timer
 import logging
-import decimal
 from hiveengine.api import Api
+from hiveengine.actionbatch import ActionBatchMixin
+from hiveengine.amount import Amount, HIVE_PRECISION
 from hiveengine.tokens import Tokens
 from hiveengine.tokenobject import Token
+from hiveengine.orderbook import OrderBook
 from hiveengine.wallet import Wallet
 from hiveengine.exceptions import (TokenDoesNotExists, TokenNotInWallet, InsufficientTokenAmount, InvalidTokenAmount)
 from beem.instance import shared_blockchain_instance
 from beem.account import Account
 
 
-class Market(list):
+class Market(ActionBatchMixin, list):
     """ Access the hive-engine market
 
         :param Hive blockchain_instance: Hive
@@ -32,6 +34,8 @@ class Market(list):
         self.blockchain = blockchain_instance or steem_instance or shared_blockchain_instance()
         self.tokens = Tokens(api=self.api)
         self.ssc_id = "ssc-mainnet-hive"
+        self._batch = None
+        self._order_books = {}
         self.refresh()
 
     def refresh(self):
@@ -70,6 +74,47 @@ class Market(list):
             sell_book = self.api.find("market", "sellBook", query={"symbol": symbol.upper(), "account": account}, limit=limit, offset=offset)
         return sell_book
 
+    def get_order_book(self, symbol, max_age=0):
+        """Returns the complete buy and sell book of a symbol as
+            :class:`hiveengine.orderbook.OrderBook`, which can be kept up to date
+            with :func:`hiveengine.orderbook.OrderBook.stream`.
+
+            :param float max_age: a book which was loaded less than max_age
+                seconds ago is reused (default is 0)
+        """
+        symbol = symbol.upper()
+        if symbol in self._order_books:
+            loaded, book = self._order_books[symbol]
+            if time.time() - loaded < max_age:
+                return book
+        token = self.tokens.get_token(symbol)
+        if token is None:
+            raise TokenDoesNotExists("%s does not exists" % symbol)
+        book = OrderBook(symbol, api=self.api, precision=token["precision"])
+        self._order_books[symbol] = (time.time(), book)
+        return book
+
+    def quote(self, symbol, side, quantity, price=None, max_age=5):
+        """Computes the fill of a buy or sell order against the complete order
+            book (see :func:`hiveengine.orderbook.OrderBook.quote`)
+
+            :param str symbol: symbol
+            :param str side: buy or sell
+            :param float quantity: token quantity
+            :param float price: (optional) limit price
+            :param float max_age: the order book is reused for max_age seconds (default is 5)
+
+            .. code-block:: python
+
+                from hiveengine.market import Market
+                market = Market()
+                quote = market.quote("BEE", "sell", 1000)
+                print(quote["filled"], quote["avg_price"], quote["slippage"], quote["levels"])
+
+        """
+        book = self.get_order_book(symbol, max_age=max_age)
+        return book.quote(side, quantity, price=price)
+
     def get_trades_history(self, symbol, account=None, limit=30, offset=0):
         """Returns the trade history for a given symbol. When account is set,
             the trade history from the given account is shown.
@@ -103,18 +148,17 @@ class Market(list):
         token_in_wallet = wallet.get_token("SWAP.HIVE")
         if token_in_wallet is None:
             raise TokenNotInWallet("%s is not in wallet." % "SWAP.HIVE")
-        if float(token_in_wallet["balance"]) < float(amount):
-            raise InsufficientTokenAmount("Only %.3f in wallet" % float(token_in_wallet["balance"]))
-        token = Token("SWAP.HIVE", api=self.api)
-        quant_amount = token.quantize(amount)
-        if quant_amount <= decimal.Decimal("0"):
+        token = self._get_token("SWAP.HIVE")
+        quant_amount = token.amount(amount)
+        balance = token.amount(token_in_wallet["balance"])
+        if balance < quant_amount:
+            raise InsufficientTokenAmount("Only %s in wallet" % str(balance))
+        if quant_amount <= 0:
             raise InvalidTokenAmount("Amount to transfer is below token precision of %d" % token["precision"])        
         contract_payload = {"quantity":str(quant_amount)}
         json_data = {"contractName":"hivepegged","contractAction":"withdraw",
                      "contractPayload":contract_payload}
-        assert self.blockchain.is_hive
-        tx = self.blockchain.custom_json(self.ssc_id, json_data, required_auths=[account])
-        return tx
+        return self._broadcast(json_data, account)
 
     def deposit(self, account, amount):
         """Deposit HIVE to market in exchange for SWAP.HIVE.
@@ -135,8 +179,10 @@ class Market(list):
         """
         acc = Account(account, blockchain_instance=self.blockchain)
         steem_balance = acc.get_balance("available", "HIVE")
-        if float(steem_balance) < float(amount):
-            raise InsufficientTokenAmount("Only %.3f in wallet" % float(steem_balance))
+        # HIVE has a precision of 3
+        balance = Amount(steem_balance.amount, 3)
+        if balance < Amount(amount, 3):
+            raise InsufficientTokenAmount("Only %s in wallet" % str(balance))
         json_data = '{"id":"' + self.ssc_id + '","json":{"contractName":"hivepegged","contractAction":"buy","contractPayload":{}}}'
         tx = acc.transfer("honey-swap", amount, "HIVE", memo=json_data)
         return tx
@@ -164,19 +210,18 @@ class Market(list):
         token_in_wallet = wallet.get_token("SWAP.HIVE")
         if token_in_wallet is None:
             raise TokenNotInWallet("%s is not in wallet." % "SWAP.HIVE")
-        if float(token_in_wallet["balance"]) < float(amount) * float(price):
-            raise InsufficientTokenAmount("Only %.3f in wallet" % float(token_in_wallet["balance"]))
-
-        token = Token(symbol, api=self.api)
-        quant_amount = token.quantize(amount)
-        if quant_amount <= decimal.Decimal("0"):
+        token = self._get_token(symbol)
+        quant_amount = token.amount(amount)
+        quant_price = Amount(price, HIVE_PRECISION)
+        balance = Amount(token_in_wallet["balance"], HIVE_PRECISION)
+        if balance < quant_amount.value_at(quant_price):
+            raise InsufficientTokenAmount("Only %s in wallet" % str(balance))
+        if quant_amount <= 0:
             raise InvalidTokenAmount("Amount to transfer is below token precision of %d" % token["precision"])           
-        contract_payload = {"symbol": symbol.upper(), "quantity":str(quant_amount), "price": str(price)}
+        contract_payload = {"symbol": symbol.upper(), "quantity":str(quant_amount), "price": str(quant_price)}
         json_data = {"contractName":"market","contractAction":"buy",
                      "contractPayload":contract_payload}
-        assert self.blockchain.is_hive
-        tx = self.blockchain.custom_json(self.ssc_id, json_data, required_auths=[account])
-        return tx
+        return self._broadcast(json_data, account)
 
     def sell(self, account, amount, symbol, price):
         """Sell token for given price.
@@ -201,19 +246,18 @@ class Market(list):
         token_in_wallet = wallet.get_token(symbol)
         if token_in_wallet is None:
             raise TokenNotInWallet("%s is not in wallet." % symbol)
-        if float(token_in_wallet["balance"]) < float(amount):
-            raise InsufficientTokenAmount("Only %.3f in wallet" % float(token_in_wallet["balance"]))
-        
-        token = Token(symbol, api=self.api)
-        quant_amount = token.quantize(amount)
-        if quant_amount <= decimal.Decimal("0"):
+        token = self._get_token(symbol)
+        quant_amount = token.amount(amount)
+        balance = token.amount(token_in_wallet["balance"])
+        if balance < quant_amount:
+            raise InsufficientTokenAmount("Only %s in wallet" % str(balance))
+        if quant_amount <= 0:
             raise InvalidTokenAmount("Amount to transfer is below token precision of %d" % token["precision"])        
-        contract_payload = {"symbol": symbol.upper(), "quantity":str(quant_amount), "price": str(price)}
+        quant_price = Amount(price, HIVE_PRECISION)
+        contract_payload = {"symbol": symbol.upper(), "quantity":str(quant_amount), "price": str(quant_price)}
         json_data = {"contractName":"market","contractAction":"sell",
                      "contractPayload":contract_payload}
-        assert self.blockchain.is_hive
-        tx = self.blockchain.custom_json(self.ssc_id, json_data, required_auths=[account])
-        return tx
+        return self._broadcast(json_data, account)
 
     def cancel(self, account, order_type, order_id):
         """Cancel buy/sell order.
@@ -237,6 +281,4 @@ class Market(list):
         contract_payload = {"type": order_type, "id": order_id}
         json_data = {"contractName":"market","contractAction":"cancel",
                      "contractPayload":contract_payload}
-        assert self.blockchain.is_hive
-        tx = self.blockchain.custom_json(self.ssc_id, json_data, required_auths=[account])
-        return tx
+        return self._broadcast(json_data, account)
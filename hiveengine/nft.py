@@ -2,6 +2,8 @@ from __future__ import absolute_import
 from __future__ import division
 from __future__ import print_function
 from __future__ import unicode_literals
+from collections import Counter
+from six import string_types
 from hiveengine.api import Api
 from hiveengine.tokenobject import Token
 from beem.instance import shared_blockchain_instance
@@ -49,13 +51,21 @@ class Nft(dict):
 
     def get_property(self, property_name):
         """Returns all token properties"""
-        return self.api.find_all("nft", "%sinstances" % self.symbol, query={"properties.name": property_name})
+        return list(self.iter_property(property_name))
+
+    def iter_property(self, property_name):
+        """Yields all token properties page by page"""
+        return self.api.find_iter("nft", "%sinstances" % self.symbol, query={"properties.name": property_name}, prefetch=True)
 
     def get_collection(self, account):
         """ Get NFT collection"""
-        tokens = self.api.find_all("nft", "%sinstances" % self.symbol, query={"account": account})
+        tokens = list(self.iter_collection(account))
         return tokens
 
+    def iter_collection(self, account):
+        """ Yields the NFT collection of an account page by page"""
+        return self.api.find_iter("nft", "%sinstances" % self.symbol, query={"account": account}, prefetch=True)
+
     def get_id(self, _id):
         """ Get info about a token"""
         tokens = self.api.find_one("nft", "%sinstances" % self.symbol, query={"_id": _id})
@@ -63,6 +73,63 @@ class Nft(dict):
             return tokens[0]
         return tokens
 
+    def get_ids(self, ids, chunk_size=1000):
+        """ Get info about many tokens. The ids are requested with $in queries
+            of chunk_size ids, which are sent together as batch request.
+            Returns the found tokens in the order of ids.
+
+            :param list ids: token ids
+            :param int chunk_size: number of ids in one query (max. 1000)
+        """
+        ids = [int(_id) for _id in ids]
+        chunks = [ids[i:i + chunk_size] for i in range(0, len(ids), chunk_size)]
+        with self.api.rpc.batch() as b:
+            pages = [b.find({"contract": "nft", "table": "%sinstances" % self.symbol, "query": {"_id": {"$in": chunk}},
+                             "limit": len(chunk), "offset": 0, "indexes": []}, endpoint="contracts")
+                     for chunk in chunks]
+        tokens = {}
+        for page in pages:
+            for token in page.result() or []:
+                tokens[token["_id"]] = token
+        return [tokens[_id] for _id in ids if _id in tokens]
+
+    def iter_instances(self, query={}):
+        """ Yields all tokens (which match the query) page by page"""
+        return self.api.find_iter("nft", "%sinstances" % self.symbol, query=query, keyset=True, prefetch=True)
+
+    def census(self, group_by=None, include_burned=False):
+        """ Counts all tokens per group and returns a Counter with tuples
+            of the (lower case) property values as keys. The tokens are
+            streamed page by page.
+
+            :param list group_by: property names, default is the groupBy of the NFT
+            :param bool include_burned: when True, burned tokens (owned by null) are counted
+
+            .. code-block:: python
+
+                from hiveengine.nft import Nft
+                nft = Nft("STAR")
+                for key, count in nft.census().most_common(10):
+                    print(key, count)
+
+        """
+        if group_by is None:
+            group_by = self["groupBy"]
+        query = {}
+        if not include_burned:
+            query = {"account": {"$ne": "null"}}
+        census = Counter()
+        for token in self.iter_instances(query=query):
+            properties = token.get("properties") or {}
+            key = []
+            for name in group_by:
+                value = properties.get(name)
+                if isinstance(value, string_types):
+                    value = value.lower()
+                key.append(value)
+            census[tuple(key)] += 1
+        return census
+
     def get_trade_history(self, query={}, limit=-1, offset=0):
         """Returns market information
            :param dict query: can be priceSymbol, timestamp
@@ -10,7 +10,8 @@ from timeit import default_timer as timer
 import logging
 import decimal
 from hiveengine.api import Api
-from hiveengine.nfts import Nfts
+from hiveengine.actionbatch import ActionBatchMixin
+from hiveengine.nfts import shared_nfts_instance
 from hiveengine.nft import Nft
 from hiveengine.wallet import Wallet
 from hiveengine.collection import Collection
@@ -19,30 +20,39 @@ from beem.instance import shared_blockchain_instance
 from beem.account import Account
 
 
-class NftMarket(list):
+class NftMarket(ActionBatchMixin, list):
     """ Access the hive-engine NFT market
 
         :param Hive blockchain_instance: Hive
                instance
     """
     def __init__(self, api=None, blockchain_instance=None, steem_instance=None):
+        # the api of the shared Nfts instance is reused, so that the nft table is only loaded once
+        self.nfts = shared_nfts_instance(api=api)
         if api is None:
-            self.api = Api()
+            self.api = self.nfts.api
         else:
-            self.api = api        
+            self.api = api
         self.blockchain = blockchain_instance or steem_instance or shared_blockchain_instance()
-        self.nfts = Nfts(api=self.api)
         self.ssc_id = "ssc-mainnet-hive"
+        self._batch = None
 
     def set_id(self, ssc_id):
         """Sets the ssc id (default is ssc-mainnet-hive)"""
         self.ssc_id = ssc_id
 
+    def get_nft(self, symbol):
+        """Returns the Nft object of a symbol from the shared Nfts registry"""
+        nft = self.nfts.get_nft(symbol)
+        if nft is None:
+            raise NftDoesNotExists("Nft %s does not exists!" % symbol)
+        return nft
+
     def get_sell_book(self, symbol, account=None, grouping_name=None, grouping_value=None, priceSymbol=None, nftId=None, limit=None):
         """Returns the sell book for a given symbol. When account is set,
             the order book from the given account is shown.
         """        
-        nft = Nft(symbol, api=self.api)
+        nft = self.get_nft(symbol)
         query = {}
         if account is not None:
             query["account"] = account
@@ -61,7 +71,7 @@ class NftMarket(list):
         """Returns the sell book for a given symbol. When account is set,
             the order book from the given account is shown.
         """        
-        nft = Nft(symbol, api=self.api)
+        nft = self.get_nft(symbol)
         query = {}
         query["side"] = side
         if grouping_name is not None and grouping_value is not None:
@@ -77,7 +87,7 @@ class NftMarket(list):
         """Returns the trade history for a given symbol. When account is set,
             the trade history from the given account is shown.
         """        
-        nft = Nft(symbol, api=self.api)
+        nft = self.get_nft(symbol)
         query = {}
         if account is not None:
             query["account"] = account
@@ -129,9 +139,7 @@ class NftMarket(list):
         contract_payload = {"symbol": symbol.upper(), "nfts": nft_list, "marketAccount": market_account}
         json_data = {"contractName":"nftmarket","contractAction":"buy",
                      "contractPayload":contract_payload}
-        assert self.blockchain.is_hive
-        tx = self.blockchain.custom_json(self.ssc_id, json_data, required_auths=[account])
-        return tx
+        return self._broadcast(json_data, account)
 
     def sell(self, symbol, account, nft_ids, price, price_symbol, fee):
         """Sell token for given price.
@@ -165,9 +173,7 @@ class NftMarket(list):
                             "priceSymbol": price_symbol.upper(), "fee": int(fee)}
         json_data = {"contractName":"nftmarket","contractAction":"sell",
                      "contractPayload":contract_payload}
-        assert self.blockchain.is_hive
-        tx = self.blockchain.custom_json(self.ssc_id, json_data, required_auths=[account])
-        return tx
+        return self._broadcast(json_data, account)
 
     def change_price(self, symbol, account, nft_ids, price):
         """Change a price for a listed nft id
@@ -199,9 +205,7 @@ class NftMarket(list):
         contract_payload = {"symbol": symbol.upper(), "nfts": nft_list, "price": str(price)}
         json_data = {"contractName":"nftmarket","contractAction":"changePrice",
                      "contractPayload":contract_payload}
-        assert self.blockchain.is_hive
-        tx = self.blockchain.custom_json(self.ssc_id, json_data, required_auths=[account])
-        return tx
+        return self._broadcast(json_data, account)
 
     def cancel(self, symbol, account, nft_ids):
         """Cancel sell order.
@@ -231,6 +235,4 @@ class NftMarket(list):
         contract_payload = {"symbol": symbol.upper(), "nfts": nft_list}
         json_data = {"contractName":"nftmarket","contractAction":"cancel",
                      "contractPayload":contract_payload}
-        assert self.blockchain.is_hive
-        tx = self.blockchain.custom_json(self.ssc_id, json_data, required_auths=[account])
-        return tx
+        return self._broadcast(json_data, account)
@@ -6,6 +6,33 @@ from hiveengine.api import Api
 from hiveengine.nft import Nft
 
 
+class NftsInstance(object):
+    """Singelton for the shared Nfts instance"""
+    instance = None
+
+
+def set_shared_nfts_instance(instance):
+    """Set the shared Nfts instance"""
+    NftsInstance.instance = instance
+
+
+def get_api_key(api):
+    """Returns the node urls of an Api, which identify the shared Nfts instance"""
+    return tuple(api.rpc.nodes.urls)
+
+
+def shared_nfts_instance(api=None):
+    """Returns the shared Nfts instance, which is reused by Collection,
+        NftMarket and the cli. A new instance is created, when api
+        uses other nodes than the api of the shared instance.
+    """
+    instance = NftsInstance.instance
+    if instance is None or (api is not None and api is not instance.api and
+                            get_api_key(api) != get_api_key(instance.api)):
+        NftsInstance.instance = Nfts(api=api)
+    return NftsInstance.instance
+
+
 class Nfts(list):
     """ Access the Hive-engine Nfts
     """
@@ -13,15 +40,21 @@ class Nfts(list):
         if api is None:
             self.api = Api()
         else:
-            self.api = api        
+            self.api = api
+        self._index = {}
+        self._nft_objects = {}
         self.refresh()
 
     def refresh(self):
         super(Nfts, self).__init__(self.get_nft_list())
+        self._index = {}
+        self._nft_objects = {}
+        for t in self:
+            self._index[t["symbol"].upper()] = t
 
     def get_nft_list(self):
         """Returns all available nft as list"""
-        tokens = self.api.find_all("nft", "nfts", query={})
+        tokens = list(self.api.find_iter("nft", "nfts", query={}, prefetch=True))
         return tokens
 
     def get_nft_params(self):
@@ -32,17 +65,18 @@ class Nfts(list):
         return tokens
 
     def get_symbol_list(self):
-        symbols = []
-        for nft in self:
-            symbols.append(nft["symbol"])
-        return symbols
+        return [nft["symbol"] for nft in self]
 
     def get_nft(self, nft):
         """Returns Token from given nft symbol. Is None
-            when nft does not exists.
+            when nft does not exists. The Nft object is created on
+            first access and reused afterwards.
         """
-        for t in self:
-            if t["symbol"].lower() == nft.lower():
-                return Nft(t, api=self.api)
-        return None
+        symbol = nft.upper()
+        if symbol not in self._nft_objects:
+            t = self._index.get(symbol)
+            if t is None:
+                return None
+            self._nft_objects[symbol] = Nft(t, api=self.api)
+        return self._nft_objects[symbol]
 
@@ -0,0 +1,172 @@
+"""Node pool with health scoring for the RPC."""
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+from builtins import object
+import threading
+import time
+import logging
+
+log = logging.getLogger(__name__)
+
+
+class Node(object):
+    """ Stores the health of a single RPC node
+
+        :param str url: node url
+    """
+    def __init__(self, url):
+        if not url.endswith("/"):
+            url += "/"
+        self.url = url
+        self.error_cnt = 0
+        self.total_error_cnt = 0
+        self.request_cnt = 0
+        self.latency = None
+        self.head_block = None
+        self.block_lag = 0
+        self.blocked_until = 0
+
+    def update_latency(self, latency, alpha=0.3):
+        """Updates the exponential moving average of the latency (in seconds)"""
+        if self.latency is None:
+            self.latency = latency
+        else:
+            self.latency = alpha * latency + (1 - alpha) * self.latency
+
+    def is_blocked(self, now=None):
+        """Returns True, when the node is in its back off time after an error"""
+        if now is None:
+            now = time.time()
+        return self.blocked_until > now
+
+    def score(self, lag_penalty=0.5, error_penalty=2.0, now=None):
+        """Returns the health score of the node, lower is better.
+            Untested nodes have a latency of 0 so that they are tried once.
+        """
+        score = self.latency or 0.
+        score += self.error_cnt * error_penalty
+        score += self.block_lag * lag_penalty
+        if self.is_blocked(now=now):
+            score += 1e6
+        return score
+
+    def __repr__(self):
+        return "<Node %s latency=%s errors=%d lag=%d>" % (self.url, str(self.latency), self.error_cnt, self.block_lag)
+
+
+class Nodes(list):
+    """ Stores the RPC nodes, their latency, error counts and head block lag.
+        Each request is routed to the healthiest node.
+
+        :param list urls: node urls
+        :param int num_retries_call: number of retries of a single call
+        :param float backoff: back off time in seconds after a failed request
+            which is doubled with each further error (default is 1)
+        :param float max_backoff: maximum back off time in seconds (default is 4)
+
+        .. code-block:: python
+
+            from hiveengine.node import Nodes
+            nodes = Nodes(["https://api.hive-engine.com/rpc/", "https://engine.rishipanthee.com/"])
+            print(nodes.get_node().url)
+
+    """
+    def __init__(self, urls, num_retries_call=5, backoff=1, max_backoff=4):
+        if isinstance(urls, Nodes):
+            urls = [node.url for node in urls]
+        elif not isinstance(urls, (list, tuple, set)):
+            urls = [urls]
+        super(Nodes, self).__init__([Node(url) for url in urls])
+        if len(self) == 0:
+            raise ValueError("At least one node url is needed")
+        self.num_retries_call = num_retries_call
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.lock = threading.Lock()
+
+    @property
+    def urls(self):
+        return [node.url for node in self]
+
+    def get_node(self, exclude=None):
+        """Returns the healthiest node. Nodes in exclude are only returned
+            when all other nodes are excluded too.
+        """
+        now = time.time()
+        with self.lock:
+            candidates = [node for node in self if exclude is None or node not in exclude]
+            if len(candidates) == 0:
+                candidates = list(self)
+            return min(candidates, key=lambda node: node.score(now=now))
+
+    def success(self, node, latency):
+        """Stores a successful request"""
+        with self.lock:
+            node.request_cnt += 1
+            node.update_latency(latency)
+            node.error_cnt = 0
+            node.blocked_until = 0
+
+    def increase_error_cnt(self, node, retry_after=None):
+        """Stores a failed request, the node is not used during its back off time"""
+        with self.lock:
+            node.request_cnt += 1
+            node.error_cnt += 1
+            node.total_error_cnt += 1
+            if retry_after is None:
+                retry_after = min(self.backoff * 2 ** (node.error_cnt - 1), self.max_backoff)
+            node.blocked_until = time.time() + retry_after
+
+    def get_blocked_time(self, now=None):
+        """Returns the seconds until the first node can be used again, 0 when a node is not blocked"""
+        if now is None:
+            now = time.time()
+        with self.lock:
+            return max(0, min([node.blocked_until for node in self]) - now)
+
+    def set_head_block(self, node, block_number):
+        """Stores the head block of a node and updates the block lag of all nodes"""
+        with self.lock:
+            node.head_block = block_number
+            head_block = max([n.head_block for n in self if n.head_block is not None])
+            for n in self:
+                if n.head_block is not None:
+                    n.block_lag = head_block - n.head_block
+
+    def get_retry_sleeptime(self, cnt):
+        """Returns the back off time before the next retry of a call or None,
+            when num_retries_call is reached and the call should fail.
+
+            :param int cnt: number of failed tries of the call
+        """
+        if self.num_retries_call >= 0 and cnt > self.num_retries_call:
+            return None
+        if cnt < len(self):
+            # try the next node without waiting
+            return 0
+        # all nodes have failed, back off before the next round
+        return min(self.backoff * 2 ** (cnt - len(self)), self.max_backoff)
+
+    def sleep_and_check_retries(self, error_msg, cnt):
+        """Sleeps before the next retry of a call. Returns False, when
+            num_retries_call is reached and the call should fail.
+
+            :param str error_msg: error of the last try
+            :param int cnt: number of failed tries of the call
+        """
+        sleeptime = self.get_retry_sleeptime(cnt)
+        if sleeptime is None:
+            return False
+        log.warning("Retry %d of %d: %s" % (cnt, self.num_retries_call, error_msg))
+        if sleeptime > 0:
+            time.sleep(sleeptime)
+        return True
+
+    def reset_error_cnt(self):
+        """Resets the error counts of all nodes"""
+        with self.lock:
+            for node in self:
+                node.error_cnt = 0
+                node.blocked_until = 0
@@ -0,0 +1,124 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+import json
+
+
+class Operation(dict):
+    """ hive-engine sidechain operation (contract action) of a block
+
+        The dict contains the transaction as stored in the block, payload and
+        logs are only decoded when they are accessed.
+
+        :param dict trx: transaction of a block
+        :param dict block: block which contains the transaction
+    """
+    def __init__(self, trx, block=None):
+        super(Operation, self).__init__(trx)
+        self.block_num = None
+        self.timestamp = None
+        self.ref_block_num = None
+        if block is not None:
+            self.block_num = block["blockNumber"]
+            self.timestamp = block.get("timestamp")
+            # number of the Hive block which contains the transaction
+            self.ref_block_num = block.get("refHiveBlockNumber", block.get("refSteemBlockNumber"))
+        self._payload = None
+        self._logs = None
+
+    @property
+    def trx_id(self):
+        return self["transactionId"]
+
+    @property
+    def sender(self):
+        return self["sender"]
+
+    @property
+    def contract(self):
+        return self["contract"]
+
+    @property
+    def action(self):
+        return self["action"]
+
+    @property
+    def payload(self):
+        """Returns the decoded payload"""
+        if self._payload is None:
+            self._payload = self._decode(self.get("payload"))
+        return self._payload
+
+    @property
+    def logs(self):
+        """Returns the decoded logs"""
+        if self._logs is None:
+            self._logs = self._decode(self.get("logs"))
+        return self._logs
+
+    @property
+    def events(self):
+        """Returns the events of the logs"""
+        return self.logs.get("events", [])
+
+    @property
+    def errors(self):
+        """Returns the errors of the logs"""
+        return self.logs.get("errors", [])
+
+    @property
+    def symbols(self):
+        """Returns all symbols of the payload"""
+        symbols = set()
+        if "symbol" in self.payload:
+            symbols.add(self.payload["symbol"])
+        for nft in self.payload.get("nfts", []):
+            if isinstance(nft, dict) and "symbol" in nft:
+                symbols.add(nft["symbol"])
+        return symbols
+
+    def _decode(self, data):
+        if isinstance(data, dict):
+            return data
+        if data is None or len(data) == 0:
+            return {}
+        try:
+            ret = json.loads(data)
+        except ValueError:
+            return {}
+        if not isinstance(ret, dict):
+            return {}
+        return ret
+
+    def __repr__(self):
+        return "<Operation %s/%s %s in block %s>" % (self.contract, self.action, self.trx_id, str(self.block_num))
+
+
+def filter_operations(block, contracts=None, actions=None, symbols=None):
+    """Yields the operations of a block which match the filter. Contract and
+        action are checked before the payload is decoded.
+
+        :param dict block: sidechain block
+        :param set contracts: contract names, e.g. ["market"]
+        :param set actions: contract actions, e.g. ["buy", "sell"]
+        :param set symbols: only operations with these symbols in the payload
+    """
+    if symbols is not None:
+        symbols = set([symbol.upper() for symbol in symbols])
+        quoted_symbols = ['"%s"' % symbol for symbol in symbols]
+    for trx in block["transactions"]:
+        if contracts is not None and trx["contract"] not in contracts:
+            continue
+        if actions is not None and trx["action"] not in actions:
+            continue
+        if symbols is not None:
+            payload = trx.get("payload")
+            if isinstance(payload, str) and not any(s in payload for s in quoted_symbols):
+                continue
+            op = Operation(trx, block)
+            if len(op.symbols & symbols) == 0:
+                continue
+        else:
+            op = Operation(trx, block)
+        yield op
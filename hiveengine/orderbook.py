@@ -0,0 +1,356 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+from bisect import bisect_left, insort
+from collections import OrderedDict
+from hiveengine.api import Api
+from hiveengine.amount import Amount, HIVE_PRECISION, SCALES
+from hiveengine.operation import filter_operations
+from hiveengine.tokenobject import Token
+
+
+class OrderBook(object):
+    """ In-memory order book of a token
+
+        The book is loaded from the complete buyBook and sellBook tables and
+        can then be kept up to date with the market operations of new blocks.
+        Orders are sorted into price levels, each level keeps its orders in
+        the order of arrival. Quantity and price of the stored orders are
+        :class:`hiveengine.amount.Amount` objects.
+
+        New buy and sell orders are matched locally against the book, canceled
+        orders are removed by their txId and orderClosed/orderExpired events
+        of the logs remove the orders which were closed by the contract.
+        Operations with errors are skipped.
+
+        :param str symbol: token symbol
+        :param Api api: (optional) Api instance
+        :param int precision: (optional) token precision, is read from
+            the tokens table when not set
+        :param bool refresh: load the book from the api (default is True)
+
+        .. code-block:: python
+
+            from hiveengine.orderbook import OrderBook
+            book = OrderBook("BEE")
+            print(book.best_bid(), book.best_ask())
+            for op in book.stream():
+                print(op.block_num, book.bids(3), book.asks(3))
+
+    """
+    tables = {"buy": "buyBook", "sell": "sellBook"}
+
+    def __init__(self, symbol, api=None, precision=None, refresh=True):
+        if api is None:
+            self.api = Api()
+        else:
+            self.api = api
+        self.symbol = symbol.upper()
+        if precision is None:
+            precision = Token(self.symbol, api=self.api)["precision"]
+        self.precision = precision
+        self.block_num = None
+        self.clear()
+        if refresh:
+            self.refresh()
+
+    def clear(self):
+        """Removes all orders"""
+        self._prices = {"buy": [], "sell": []}
+        self._levels = {"buy": {}, "sell": {}}
+        self._orders = {}
+
+    def _get_head_block(self):
+        info = self.api.get_latest_block_info()
+        if isinstance(info, dict):
+            return info["blockNumber"]
+        return None
+
+    def refresh(self, max_tries=3):
+        """Loads all orders of the buy and sell book
+
+            The books are read with several requests. When a new block was
+            produced while they were loaded, the book is loaded again (up to
+            max_tries times), so that block_num matches the loaded orders.
+            After max_tries, block_num is the head block after loading and
+            orders of blocks produced during the last load can be missing
+            or be applied twice by :func:`stream`.
+        """
+        for i in range(max_tries):
+            self.clear()
+            head_block = self._get_head_block()
+            for side in ["buy", "sell"]:
+                for order in self.api.find_iter("market", self.tables[side], query={"symbol": self.symbol},
+                                                keyset=True, prefetch=True):
+                    self.add_order(side, order)
+            self.block_num = self._get_head_block()
+            if self.block_num == head_block:
+                break
+
+    def __len__(self):
+        return len(self._orders)
+
+    def __contains__(self, txid):
+        return txid in self._orders
+
+    def add_order(self, side, order):
+        """Adds an order (a row of the buyBook or sellBook table)
+
+            :param str side: buy or sell
+            :param dict order: order with txId, quantity and price
+        """
+        order = dict(order)
+        order["price"] = Amount(order["price"], HIVE_PRECISION)
+        order["quantity"] = Amount(order["quantity"], self.precision)
+        if order["txId"] in self._orders:
+            self.remove_order(order["txId"])
+        if order["quantity"] <= 0:
+            return
+        price = order["price"].units
+        levels = self._levels[side]
+        if price not in levels:
+            levels[price] = OrderedDict()
+            insort(self._prices[side], price)
+        levels[price][order["txId"]] = order
+        self._orders[order["txId"]] = (side, price)
+
+    def remove_order(self, txid):
+        """Removes an order and returns it (None when it is not in the book)"""
+        if txid not in self._orders:
+            return None
+        side, price = self._orders.pop(txid)
+        level = self._levels[side][price]
+        order = level.pop(txid)
+        if len(level) == 0:
+            del self._levels[side][price]
+            prices = self._prices[side]
+            del prices[bisect_left(prices, price)]
+        return order
+
+    def get_order(self, txid):
+        """Returns an order by its txId or None"""
+        if txid not in self._orders:
+            return None
+        side, price = self._orders[txid]
+        return self._levels[side][price][txid]
+
+    def _best_price(self, side):
+        prices = self._prices[side]
+        if len(prices) == 0:
+            return None
+        if side == "buy":
+            return prices[-1]
+        return prices[0]
+
+    def _iter_prices(self, side):
+        if side == "buy":
+            return reversed(self._prices[side])
+        return iter(self._prices[side])
+
+    def get_orders(self, side):
+        """Yields the orders of one side, best price first"""
+        for price in list(self._iter_prices(side)):
+            for order in list(self._levels[side][price].values()):
+                yield order
+
+    def _iter_levels(self, side):
+        for price in self._iter_prices(side):
+            quantity = Amount.from_units(0, self.precision)
+            for order in self._levels[side][price].values():
+                quantity += order["quantity"]
+            yield Amount.from_units(price, HIVE_PRECISION), quantity
+
+    def _get_levels(self, side, n=None):
+        ret = []
+        for level in self._iter_levels(side):
+            if n is not None and len(ret) >= n:
+                break
+            ret.append(level)
+        return ret
+
+    def bids(self, n=None):
+        """Returns the (price, quantity) levels of the buy book, highest price first"""
+        return self._get_levels("buy", n)
+
+    def asks(self, n=None):
+        """Returns the (price, quantity) levels of the sell book, lowest price first"""
+        return self._get_levels("sell", n)
+
+    def best_bid(self):
+        """Returns the highest buy price or None"""
+        price = self._best_price("buy")
+        if price is None:
+            return None
+        return Amount.from_units(price, HIVE_PRECISION)
+
+    def best_ask(self):
+        """Returns the lowest sell price or None"""
+        price = self._best_price("sell")
+        if price is None:
+            return None
+        return Amount.from_units(price, HIVE_PRECISION)
+
+    def spread(self):
+        """Returns best ask - best bid or None"""
+        bid = self.best_bid()
+        ask = self.best_ask()
+        if bid is None or ask is None:
+            return None
+        return ask - bid
+
+    def quote(self, side, quantity, price=None):
+        """Walks the book for a market order without changing it and returns
+            a dict with the filled quantity, the SWAP.HIVE cost, the average
+            and worst price, the slippage against the best price and the
+            number of consumed price levels
+
+            :param str side: buy (walks the sell book) or sell (walks the buy book)
+            :param quantity: token quantity
+            :param price: (optional) limit price, levels beyond it are not used
+        """
+        if side not in ["buy", "sell"]:
+            raise ValueError("side must be buy or sell")
+        book_side = "sell" if side == "buy" else "buy"
+        quantity = Amount(quantity, self.precision)
+        if price is not None:
+            price = Amount(price, HIVE_PRECISION)
+        remaining = quantity
+        cost = Amount.from_units(0, HIVE_PRECISION)
+        best_price = None
+        worst_price = None
+        levels = 0
+        for level_price, level_quantity in self._iter_levels(book_side):
+            if remaining <= 0:
+                break
+            if price is not None and ((side == "buy" and level_price > price) or
+                                      (side == "sell" and level_price < price)):
+                break
+            fill = min(remaining, level_quantity)
+            cost += fill.value_at(level_price)
+            remaining -= fill
+            if best_price is None:
+                best_price = level_price
+            worst_price = level_price
+            levels += 1
+        filled = quantity - remaining
+        avg_price = None
+        slippage = 0.
+        if filled > 0:
+            avg_price = Amount.from_units(cost.units * SCALES[self.precision] // filled.units, HIVE_PRECISION)
+            slippage = abs(float(avg_price) - float(best_price)) / float(best_price)
+        return {"symbol": self.symbol, "side": side, "quantity": quantity, "filled": filled,
+                "remaining": remaining, "cost": cost, "avg_price": avg_price, "best_price": best_price,
+                "worst_price": worst_price, "slippage": slippage, "levels": levels}
+
+    def _fill(self, order, quantity):
+        order["quantity"] -= quantity
+        if order["quantity"] <= 0:
+            self.remove_order(order["txId"])
+
+    def _match(self, side, quantity, price=None):
+        """Matches a limit order or a market sell order (price is None)
+            against the book side and returns the unfilled quantity
+        """
+        while quantity > 0:
+            best = self._best_price(side)
+            if best is None:
+                break
+            if price is not None and ((side == "sell" and best > price.units) or
+                                      (side == "buy" and best < price.units)):
+                break
+            order = next(iter(self._levels[side][best].values()))
+            fill = min(quantity, order["quantity"])
+            self._fill(order, fill)
+            quantity -= fill
+        return quantity
+
+    def _match_market_buy(self, hive_quantity):
+        """Spends a SWAP.HIVE quantity on the sell book and returns True
+            when an order was filled
+        """
+        filled = False
+        while hive_quantity > 0:
+            best = self._best_price("sell")
+            if best is None:
+                break
+            order = next(iter(self._levels["sell"][best].values()))
+            cost = order["quantity"].value_at(order["price"])
+            if cost <= hive_quantity:
+                self._fill(order, order["quantity"])
+                hive_quantity -= cost
+                filled = True
+                continue
+            fill = Amount.from_units(hive_quantity.units * SCALES[self.precision] // best, self.precision)
+            if fill > 0:
+                self._fill(order, fill)
+                filled = True
+            break
+        return filled
+
+    def _apply_order(self, op):
+        """Matches an order operation against the book, adds the unfilled
+            quantity of a limit order and returns True when the book was changed
+        """
+        payload = op.payload
+        if op.action == "buy" or op.action == "sell":
+            quantity = Amount(payload["quantity"], self.precision)
+            price = Amount(payload["price"], HIVE_PRECISION)
+            opposite = "sell" if op.action == "buy" else "buy"
+            remaining = self._match(opposite, quantity, price)
+            if remaining > 0:
+                self.add_order(op.action, {"txId": op.trx_id, "account": op.sender, "symbol": self.symbol,
+                                           "timestamp": op.timestamp, "quantity": remaining, "price": price})
+                return True
+            return remaining < quantity
+        elif op.action == "marketSell":
+            quantity = Amount(payload["quantity"], self.precision)
+            return self._match("buy", quantity) < quantity
+        elif op.action == "marketBuy":
+            return self._match_market_buy(Amount(payload["quantity"], HIVE_PRECISION))
+        return False
+
+    def apply_operation(self, op):
+        """Applies a market operation to the book and returns True
+            when the book was changed
+
+            :param Operation op: :class:`hiveengine.operation.Operation` of a block
+        """
+        if op.contract != "market" or len(op.errors) > 0:
+            return False
+        size = len(self._orders)
+        changed = False
+        events = [e for e in op.events if e.get("contract") == "market"]
+        for event in events:
+            if event.get("event") == "orderExpired":
+                changed |= self.remove_order(event.get("data", {}).get("txId")) is not None
+        if op.action == "cancel":
+            changed |= self.remove_order(op.payload.get("id")) is not None
+        elif op.action in ["buy", "sell", "marketBuy", "marketSell"]:
+            if op.payload.get("symbol") == self.symbol:
+                changed |= self._apply_order(op)
+        for event in events:
+            if event.get("event") == "orderClosed":
+                changed |= self.remove_order(event.get("data", {}).get("txId")) is not None
+        return changed or size != len(self._orders)
+
+    def apply_block(self, block):
+        """Applies all market operations of a block and returns the changed operations"""
+        ret = [op for op in filter_operations(block, contracts=["market"]) if self.apply_operation(op)]
+        self.block_num = block["blockNumber"]
+        return ret
+
+    def stream(self, start=None, stop=None, workers=4, batch_size=50):
+        """Follows the sidechain blocks and yields every market operation
+            which changed the book
+
+            :param int start: first block (default is the block after the last applied block)
+            :param int stop: (optional) last block, follows the head block when not set
+        """
+        if start is None:
+            if self.block_num is None:
+                raise ValueError("start is needed, when the order book was not loaded")
+            start = self.block_num + 1
+        for block in self.api.stream_blocks(start, stop=stop, workers=workers, batch_size=batch_size):
+            for op in self.apply_block(block):
+                yield op
@@ -0,0 +1,185 @@
+"""Client-side rate limiting of RPC requests with priorities."""
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+import asyncio
+import heapq
+import itertools
+import threading
+import time
+from email.utils import parsedate_tz, mktime_tz
+
+# request priorities, lower values are sent first
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 1
+PRIORITY_LOW = 2
+
+
+def parse_retry_after(value):
+    """Returns the seconds of a Retry-After header (seconds or HTTP date) or None"""
+    if value is None:
+        return None
+    try:
+        return max(0., float(value))
+    except ValueError:
+        pass
+    date = parsedate_tz(value)
+    if date is None:
+        return None
+    return max(0., mktime_tz(date) - time.time())
+
+
+class RateLimiter(object):
+    """ Token bucket rate limiter with AIMD adaptation and request priorities
+
+        Each request takes one token from the bucket, which is refilled with
+        rate tokens per second. Every successful request increases the rate
+        by increase (up to max_rate), a Too Many Requests or Service
+        Unavailable response multiplies it by decrease (down to min_rate)
+        and pauses all requests for the Retry-After time.
+
+        Waiting requests are served by priority (PRIORITY_HIGH before
+        PRIORITY_NORMAL before PRIORITY_LOW) and in arrival order within a
+        priority, so that interactive calls are not starved by background scans.
+        One RateLimiter can be shared by several RPC instances, threads and
+        AsyncRPC instances (see :func:`acquire_async`).
+
+        :param float rate: requests per second (default is 10)
+        :param float burst: bucket size (default is rate)
+        :param float min_rate: lower limit of the rate (default is 0.5)
+        :param float max_rate: upper limit of the rate (default is rate)
+        :param float increase: additive rate increase per successful request (default is 0.1)
+        :param float decrease: multiplicative rate decrease on a rate limit response (default is 0.5)
+
+        .. code-block:: python
+
+            from hiveengine.api import Api
+            from hiveengine.ratelimit import RateLimiter, PRIORITY_HIGH
+            limiter = RateLimiter(rate=5)
+            api = Api(rate_limiter=limiter)
+            api.rpc.getLatestBlockInfo(endpoint="blockchain", priority=PRIORITY_HIGH)
+
+    """
+    def __init__(self, rate=10, burst=None, min_rate=0.5, max_rate=None, increase=0.1, decrease=0.5):
+        self.rate = float(rate)
+        self.burst = float(burst if burst is not None else max(1., rate))
+        self.min_rate = min_rate
+        self.max_rate = max_rate if max_rate is not None else self.rate
+        self.increase = increase
+        self.decrease = decrease
+        self.tokens = self.burst
+        self.blocked_until = 0
+        self.last_refill = time.time()
+        self._waiters = []
+        self._counter = itertools.count()
+        self._cond = threading.Condition()
+
+    def __len__(self):
+        """Returns the number of waiting requests"""
+        with self._cond:
+            return len(self._waiters)
+
+    def _refill(self, now):
+        self.tokens = min(self.burst, self.tokens + (now - self.last_refill) * self.rate)
+        self.last_refill = now
+
+    def _try_acquire(self, entry):
+        """Takes a token for the waiting entry. Returns (True, None) on
+            success, otherwise (False, seconds until the entry could be served
+            or None when it is not the first waiter). Needs the lock.
+        """
+        now = time.time()
+        self._refill(now)
+        if self._waiters[0] != entry:
+            return False, None
+        if now >= self.blocked_until and self.tokens >= 1:
+            self.tokens -= 1
+            heapq.heappop(self._waiters)
+            self._cond.notify_all()
+            return True, None
+        return False, max(self.blocked_until - now, (1 - self.tokens) / self.rate)
+
+    def _remove(self, entry):
+        """Removes a waiting entry. Needs the lock."""
+        if entry in self._waiters:
+            self._waiters.remove(entry)
+            heapq.heapify(self._waiters)
+            self._cond.notify_all()
+
+    def _push(self, priority):
+        if priority is None:
+            priority = PRIORITY_NORMAL
+        entry = (priority, next(self._counter))
+        heapq.heappush(self._waiters, entry)
+        return entry
+
+    def acquire(self, priority=PRIORITY_NORMAL, timeout=None):
+        """Waits until the request may be sent. Returns False when timeout
+            (seconds) has passed before.
+
+            :param int priority: PRIORITY_HIGH, PRIORITY_NORMAL or PRIORITY_LOW
+        """
+        deadline = None
+        if timeout is not None:
+            deadline = time.time() + timeout
+        with self._cond:
+            entry = self._push(priority)
+            try:
+                while True:
+                    acquired, wait = self._try_acquire(entry)
+                    if acquired:
+                        return True
+                    if deadline is not None:
+                        now = time.time()
+                        if now >= deadline:
+                            self._remove(entry)
+                            return False
+                        wait = deadline - now if wait is None else min(wait, deadline - now)
+                    self._cond.wait(wait)
+            except BaseException:
+                self._remove(entry)
+                raise
+
+    async def acquire_async(self, priority=PRIORITY_NORMAL):
+        """Waits with asyncio until the request may be sent, used by
+            :class:`hiveengine.asyncrpc.AsyncRPC`. The event loop is not
+            blocked, waiters of threads and coroutines share the same queue.
+
+            :param int priority: PRIORITY_HIGH, PRIORITY_NORMAL or PRIORITY_LOW
+        """
+        with self._cond:
+            entry = self._push(priority)
+        try:
+            while True:
+                with self._cond:
+                    acquired, wait = self._try_acquire(entry)
+                    if wait is None:
+                        # not the first waiter, check again after the next token
+                        wait = 1. / self.rate
+                if acquired:
+                    return True
+                await asyncio.sleep(wait)
+        except BaseException:
+            with self._cond:
+                self._remove(entry)
+            raise
+
+    def success(self):
+        """Additive increase of the rate after a successful request"""
+        with self._cond:
+            self.rate = min(self.max_rate, self.rate + self.increase)
+
+    def throttle(self, retry_after=None):
+        """Multiplicative decrease of the rate after a rate limit response.
+
+            :param float retry_after: (optional) seconds in which no request is sent
+        """
+        with self._cond:
+            now = time.time()
+            self._refill(now)
+            self.rate = max(self.min_rate, self.rate * self.decrease)
+            self.tokens = min(self.tokens, 0)
+            if retry_after is not None:
+                self.blocked_until = max(self.blocked_until, now + retry_after)
+            self._cond.notify_all()
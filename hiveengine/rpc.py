@@ -7,11 +7,16 @@ from builtins import next
 from builtins import str
 from builtins import object
 import sys
-import json
 import logging
 import re
+import threading
+from timeit import default_timer as timer
 
 from .version import version as hiveengine_version
+from .node import Nodes
+from .jsoncodec import get_codec
+from .ratelimit import RateLimiter, parse_retry_after
+from .cache import copy_result
 if sys.version_info[0] < 3:
     from thread import interrupt_main
 else:
@@ -23,7 +28,7 @@ if not REQUEST_MODULE:
         import requests
         from requests.adapters import HTTPAdapter
         from requests.packages.urllib3.util.retry import Retry
-        from requests.exceptions import ConnectionError
+        from requests.exceptions import ConnectionError, Timeout
         REQUEST_MODULE = "requests"
     except ImportError:
         REQUEST_MODULE = None
@@ -44,6 +49,16 @@ class RPCErrorDoRetry(Exception):
     pass
 
 
+class RateLimitError(RPCErrorDoRetry):
+    """Too Many Requests or Service Unavailable, retry_after contains the
+        seconds of the Retry-After header or None
+    """
+
+    def __init__(self, message, retry_after=None):
+        super(RateLimitError, self).__init__(message)
+        self.retry_after = retry_after
+
+
 class UnauthorizedError(Exception):
     """UnauthorizedError Exception."""
 
@@ -81,7 +96,9 @@ class RPC(object):
     """
     This class allows to call API methods synchronously, without callbacks.
 
-    It logs warnings and errors.
+    It logs warnings and errors. When a list of node urls is given, each
+    request is sent to the healthiest node and failed requests are retried
+    on the next node.
 
     Usage:
 
@@ -91,11 +108,34 @@ class RPC(object):
             rpc = RPC()
             print(rpc.getLatestBlockInfo(endpoint="blockchain"))
 
+            rpc = RPC(["https://api.hive-engine.com/rpc/", "https://engine.rishipanthee.com/"])
+            rpc.update_nodes()
+            print(rpc.nodes)
+
+    A failed call is retried num_retries_call times (default is 5). The
+    other nodes are tried without waiting, when all nodes have failed, the
+    call backs off for backoff seconds (default is 1), which is doubled with
+    each further retry up to max_backoff (default is 4). With a single
+    unreachable node, a call therefore fails after about 15 s of back off
+    plus the request timeouts (timeout, default is 60 s).
+
+    All requests pass a :class:`hiveengine.ratelimit.RateLimiter` when
+    rate_limiter is set (True creates one with the default rate). Calls with
+    the priority keyword are sent before waiting calls with a lower priority.
+
+        .. code-block:: python
+
+            from hiveengine.rpc import RPC
+            from hiveengine.ratelimit import PRIORITY_HIGH
+            rpc = RPC(rate_limiter=True)
+            print(rpc.getLatestBlockInfo(endpoint="blockchain", priority=PRIORITY_HIGH))
+
     """
 
     def __init__(self, url=None, user=None, password=None, **kwargs):
         """Init."""
         self._request_id = 0
+        self._request_id_lock = threading.Lock()
         self.timeout = kwargs.get('timeout', 60)
         num_retries = kwargs.get("num_retries", -1)
         num_retries_call = kwargs.get("num_retries_call", 5)
@@ -103,34 +143,51 @@ class RPC(object):
         self.user = user
         self.password = password
         if url is None:
-            self.url = 'https://api.hive-engine.com/rpc/'
-        else:
-            self.url = url
+            url = 'https://api.hive-engine.com/rpc/'
+        self.nodes = Nodes(url, num_retries_call=num_retries_call,
+                           backoff=kwargs.get("backoff", 1),
+                           max_backoff=kwargs.get("max_backoff", 4))
+        self.url = self.nodes[0].url
         self.session = shared_session_instance()
         self.headers = {'User-Agent': 'hiveengine v%s' % (hiveengine_version),
-                        'content-type': 'application/json'}        
+                        'content-type': 'application/json'}
+        self.max_batch_size = kwargs.get("max_batch_size", 50)
+        self.codec = get_codec(kwargs.get("json_codec"))
+        self.rate_limiter = kwargs.get("rate_limiter")
+        if self.rate_limiter is True:
+            self.rate_limiter = RateLimiter()
+        elif self.rate_limiter is False:
+            self.rate_limiter = None
         self.rpc_queue = []
 
     def get_request_id(self):
         """Get request id."""
-        self._request_id += 1
-        return self._request_id
+        with self._request_id_lock:
+            self._request_id += 1
+            return self._request_id
 
-    def request_send(self, endpoint, payload):
+    def request_send(self, endpoint, payload, url=None):
+        if url is None:
+            url = self.url
         if self.user is not None and self.password is not None:
-            response = self.session.post(self.url + endpoint,
+            response = self.session.post(url + endpoint,
                                          data=payload,
                                          headers=self.headers,
                                          timeout=self.timeout,
                                          auth=(self.user, self.password))
         else:
-            response = self.session.post(self.url + endpoint,
+            response = self.session.post(url + endpoint,
                                          data=payload,
                                          headers=self.headers,
                                          timeout=self.timeout)
         if response.status_code == 401:
             raise UnauthorizedError
-        return response.text
+        elif response.status_code == 429:
+            raise RateLimitError("Too Many Requests", parse_retry_after(response.headers.get("Retry-After")))
+        elif response.status_code == 503:
+            raise RateLimitError("Service Temporarily Unavailable",
+                                 parse_retry_after(response.headers.get("Retry-After")))
+        return response.content
 
     def version_string_to_int(self, network_version):
         version_list = network_version.split('.')
@@ -145,9 +202,9 @@ class RPC(object):
         elif re.search("Bad Gateway", reply) or re.search("502", reply):
             raise RPCErrorDoRetry("Bad Gateway")
         elif re.search("Too Many Requests", reply) or re.search("429", reply):
-            raise RPCErrorDoRetry("Too Many Requests")
+            raise RateLimitError("Too Many Requests")
         elif re.search("Service Temporarily Unavailable", reply) or re.search("Service Unavailable", reply) or re.search("503", reply):
-            raise RPCErrorDoRetry("Service Temporarily Unavailable")
+            raise RateLimitError("Service Temporarily Unavailable")
         elif re.search("Gateway Time-out", reply) or re.search("Gateway Timeout", reply) or re.search("504", reply):
             raise RPCErrorDoRetry("Gateway Time-out")
         elif re.search("HTTP Version not supported", reply) or re.search("505", reply):
@@ -167,47 +224,130 @@ class RPC(object):
         else:
             raise RPCError("Client returned invalid format. Expected JSON!")
 
-    def rpcexec(self, endpoint, payload):
+    def _get_error_message(self, error):
+        """Returns the message of an error reply"""
+        if 'detail' in error:
+            return error['detail']
+        return error['message']
+
+    def _decode_reply(self, reply):
+        """Decodes the JSON reply, raises an error when it is a server error message"""
+        ret = {}
+        try:
+            ret = self.codec.loads(reply)
+        except ValueError:
+            if isinstance(reply, bytes):
+                reply = reply.decode("utf8", "replace")
+            self._check_for_server_error(reply)
+        return ret
+
+    def _send_payload(self, endpoint, payload, priority=None):
+        """Sends the payload to the healthiest node and returns the decoded reply.
+            Requests which fail with RPCErrorDoRetry or a connection error are
+            retried on the next node. A RateLimitError slows down the rate limiter.
+        """
+        data = self.codec.dumps(payload)
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug(data)
+
+        cnt = 0
+        tried = []
+        while True:
+            node = self.nodes.get_node(exclude=tried)
+            tried.append(node)
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire(priority)
+            start = timer()
+            try:
+                reply = self.request_send(endpoint, data, url=node.url)
+                ret = self._decode_reply(reply)
+            except RateLimitError as e:
+                self.nodes.increase_error_cnt(node, retry_after=e.retry_after)
+                if self.rate_limiter is not None:
+                    # pause all requests only when no other node can be used
+                    self.rate_limiter.throttle(self.nodes.get_blocked_time() or None)
+                cnt += 1
+                if not self.nodes.sleep_and_check_retries("%s: %s" % (node.url, str(e)), cnt):
+                    raise
+                if len(tried) >= len(self.nodes):
+                    tried = []
+                continue
+            except (RPCErrorDoRetry, ConnectionError, Timeout) as e:
+                self.nodes.increase_error_cnt(node)
+                cnt += 1
+                if not self.nodes.sleep_and_check_retries("%s: %s" % (node.url, str(e)), cnt):
+                    raise
+                if len(tried) >= len(self.nodes):
+                    tried = []
+                continue
+            self.nodes.success(node, timer() - start)
+            if self.rate_limiter is not None:
+                self.rate_limiter.success()
+            self.url = node.url
+            break
+
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug(reply)
+        self._update_head_block(node, payload, ret)
+        return ret
+
+    def _update_head_block(self, node, payload, ret):
+        """Stores the head block of the node from getLatestBlockInfo replies"""
+        if not isinstance(payload, list) or not isinstance(ret, list):
+            return
+        for query, r in zip(payload, ret):
+            if query["method"] != "getLatestBlockInfo" or not isinstance(r, dict):
+                continue
+            result = r.get("result")
+            if isinstance(result, dict) and "blockNumber" in result:
+                self.nodes.set_head_block(node, result["blockNumber"])
+
+    def update_nodes(self):
+        """Requests the latest block from all nodes to measure their
+            latency and head block lag
+        """
+        query = [{"method": "getLatestBlockInfo", "jsonrpc": "2.0", "params": [],
+                  "id": self.get_request_id()}]
+        data = self.codec.dumps(query)
+        for node in self.nodes:
+            start = timer()
+            try:
+                ret = self.codec.loads(self.request_send("blockchain", data, url=node.url))
+            except (RPCError, RPCErrorDoRetry, ValueError, ConnectionError, Timeout) as e:
+                log.warning("%s: %s" % (node.url, str(e)))
+                self.nodes.increase_error_cnt(node)
+                continue
+            self.nodes.success(node, timer() - start)
+            self._update_head_block(node, query, ret)
+
+    def rpcexec(self, endpoint, payload, priority=None):
         """
         Execute a call by sending the payload.
 
         :param json payload: Payload data
+        :param int priority: (optional) priority of the request in the rate limiter
         :raises ValueError: if the server does not respond in proper JSON format
         :raises RPCError: if the server returns an error
         """
-        log.debug(json.dumps(payload))
-
-        reply = self.request_send(endpoint, json.dumps(payload, ensure_ascii=False).encode('utf8'))
-
-        ret = {}
-        try:
-            ret = json.loads(reply, strict=False)
-        except ValueError:
-            self._check_for_server_error(reply)
-
-        log.debug(json.dumps(reply))
+        ret = self._send_payload(endpoint, payload, priority=priority)
+        return self._process_reply(ret)
 
+    def _process_reply(self, ret):
+        """Checks the decoded reply for errors and returns the results"""
         if isinstance(ret, dict) and 'error' in ret:
-            if 'detail' in ret['error']:
-                raise RPCError(ret['error']['detail'])
-            else:
-                raise RPCError(ret['error']['message'])
+            raise RPCError(self._get_error_message(ret['error']))
         else:
             if isinstance(ret, list):
                 ret_list = []
                 for r in ret:
                     if isinstance(r, dict) and 'error' in r:
-                        if 'detail' in r['error']:
-                            raise RPCError(r['error']['detail'])
-                        else:
-                            raise RPCError(r['error']['message'])
+                        raise RPCError(self._get_error_message(r['error']))
                     elif isinstance(r, dict) and "result" in r:
                         ret_list.append(r["result"])
                     else:
                         ret_list.append(r)
                 return ret_list
             elif isinstance(ret, dict) and "result" in ret:
-                self.nodes.reset_error_cnt_call()
                 return ret["result"]
             elif isinstance(ret, int):
                 raise RPCError("Client returned invalid format. Expected JSON! Output: %s" % (str(ret)))
@@ -215,23 +355,192 @@ class RPC(object):
                 return ret
         return ret
 
+    def rpcexec_batch(self, endpoint, calls, priority=None):
+        """
+        Execute several queued calls with a single request.
+
+        The replies are matched to the calls by their request id and
+        stored in the corresponding :class:`RPCBatchResult`.
+
+        :param list calls: list of (query, RPCBatchResult) tuples
+        :param int priority: (optional) priority of the request in the rate limiter
+        :raises RPCError: if the server rejects the whole batch
+        """
+        ret = self._send_payload(endpoint, [query for query, result in calls], priority=priority)
+        self._process_batch_reply(calls, ret)
+
+    def _process_batch_reply(self, calls, ret):
+        """Stores the replies of a batch in the RPCBatchResult of each call"""
+        if isinstance(ret, dict) and 'error' in ret and 'id' not in ret:
+            raise RPCError(self._get_error_message(ret['error']))
+        if not isinstance(ret, list):
+            ret = [ret]
+        replies = {}
+        for r in ret:
+            if isinstance(r, dict) and "id" in r:
+                replies[r["id"]] = r
+        for i, (query, result) in enumerate(calls):
+            r = replies.get(query["id"])
+            if r is None and len(replies) == 0 and len(ret) == len(calls):
+                # the node did not return ids, replies are in request order
+                r = ret[i]
+            if r is None:
+                result.set_exception(RPCError("No reply for request id %d" % query["id"]))
+            elif isinstance(r, dict) and 'error' in r:
+                result.set_exception(RPCError(self._get_error_message(r['error'])))
+            elif isinstance(r, dict) and "result" in r:
+                result.set_result(r["result"])
+            else:
+                result.set_result(r)
+
+    def batch(self, max_batch_size=None, priority=None):
+        """Returns a :class:`RPCBatch` which collects calls and sends them
+            as JSON-RPC batches.
+
+            :param int max_batch_size: maximum number of calls in one request
+                (default is the max_batch_size of the RPC)
+            :param int priority: (optional) priority of the requests in the rate limiter
+        """
+        return RPCBatch(self, max_batch_size=max_batch_size, priority=priority)
+
+    def _build_query(self, name, args):
+        """Builds a JSON-RPC query from the method name and its arguments.
+            The params are copied, as batched queries are sent later and the
+            caller may change its dict in the meantime.
+        """
+        if len(args) > 0:
+            args = copy_result(args[0])
+        else:
+            args = []
+        return {"method": name,
+                "jsonrpc": "2.0",
+                "params": args,
+                "id": self.get_request_id()}
+
     # End of Deprecated methods
     ####################################################################
     def __getattr__(self, name):
         """Map all methods to RPC calls and pass through the arguments."""
         def method(*args, **kwargs):
             endpoint = get_endpoint_name(*args, **kwargs)
-            args = json.loads(json.dumps(args))
-            # let's be able to define the num_retries per query
-            if len(args) > 0:
-                args = args[0]
-            query = {"method": name,
-                     "jsonrpc": "2.0",
-                     "params": args,
-                     "id": self.get_request_id()}
+            query = self._build_query(name, args)
             self.rpc_queue.append(query)
             query = self.rpc_queue
             self.rpc_queue = []
-            r = self.rpcexec(endpoint, query)
+            r = self.rpcexec(endpoint, query, priority=kwargs.get("priority"))
             return r
         return method
+
+
+class RPCBatchResult(object):
+    """Result of a call which was queued in a :class:`RPCBatch`.
+        The value is available after the batch was executed.
+    """
+
+    def __init__(self, request_id, method):
+        self.request_id = request_id
+        self.method = method
+        self._done = False
+        self._result = None
+        self._exception = None
+
+    def done(self):
+        """Returns True, when the batch was executed"""
+        return self._done
+
+    def set_result(self, result):
+        self._result = result
+        self._done = True
+
+    def set_exception(self, exception):
+        self._exception = exception
+        self._done = True
+
+    def exception(self):
+        """Returns the RPCError of the call or None"""
+        return self._exception
+
+    def result(self):
+        """Returns the result of the call
+
+            :raises RPCError: if the call failed or the batch was not executed
+        """
+        if not self._done:
+            raise RPCError("%s (id %d) was not executed yet" % (self.method, self.request_id))
+        if self._exception is not None:
+            raise self._exception
+        return self._result
+
+    def __repr__(self):
+        return "<RPCBatchResult %s id=%d done=%s>" % (self.method, self.request_id, str(self._done))
+
+
+class RPCBatch(object):
+    """
+    Collects RPC calls and sends them as JSON-RPC batches, one request per
+    endpoint and per max_batch_size calls.
+
+    Usage:
+
+        .. code-block:: python
+
+            from hiveengine.rpc import RPC
+            rpc = RPC()
+            with rpc.batch() as b:
+                latest = b.getLatestBlockInfo(endpoint="blockchain")
+                block = b.getBlockInfo({"blockNumber": 1910}, endpoint="blockchain")
+            print(latest.result())
+            print(block.result())
+
+    """
+
+    def __init__(self, rpc, max_batch_size=None, priority=None):
+        self.rpc = rpc
+        self.priority = priority
+        if max_batch_size is None:
+            max_batch_size = rpc.max_batch_size
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.queue = []
+        self.results = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.execute()
+
+    def __len__(self):
+        return len(self.queue)
+
+    def __getattr__(self, name):
+        """Queue all methods as RPC calls and return a RPCBatchResult."""
+        if name.startswith("__"):
+            raise AttributeError(name)
+
+        def method(*args, **kwargs):
+            endpoint = get_endpoint_name(*args, **kwargs)
+            query = self.rpc._build_query(name, args)
+            result = RPCBatchResult(query["id"], name)
+            self.queue.append((endpoint, query, result))
+            return result
+        return method
+
+    def execute(self):
+        """Sends all queued calls and returns their RPCBatchResult in id order"""
+        queue = self.queue
+        self.queue = []
+        endpoints = []
+        calls = {}
+        for endpoint, query, result in queue:
+            if endpoint not in calls:
+                endpoints.append(endpoint)
+                calls[endpoint] = []
+            calls[endpoint].append((query, result))
+        for endpoint in endpoints:
+            endpoint_calls = calls[endpoint]
+            for i in range(0, len(endpoint_calls), self.max_batch_size):
+                self.rpc.rpcexec_batch(endpoint, endpoint_calls[i:i + self.max_batch_size], priority=self.priority)
+        results = sorted([result for endpoint, query, result in queue], key=lambda r: r.request_id)
+        self.results += results
+        return results
@@ -0,0 +1,176 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+import logging
+import re
+import sqlite3
+import threading
+from six import string_types
+from hiveengine.api import Api
+from hiveengine.amount import Amount, HIVE_PRECISION
+from hiveengine.operation import filter_operations
+log = logging.getLogger(__name__)
+
+
+class Subscription(object):
+    """ Filter and callback of a :class:`TransferSubscription`
+
+        :param callback: function which is called with the
+            :class:`hiveengine.operation.Operation` of each matching transfer
+        :param list to: (optional) recipient accounts
+        :param list symbols: (optional) token symbols
+        :param min_quantity: (optional) minimum quantity
+        :param str memo: (optional) regular expression which must match the memo (re.search)
+        :param list senders: (optional) sender accounts
+    """
+    def __init__(self, callback, to=None, symbols=None, min_quantity=None, memo=None, senders=None):
+        self.callback = callback
+        self.to = self._get_set(to)
+        self.symbols = self._get_set(symbols, upper=True)
+        self.senders = self._get_set(senders)
+        self.min_quantity = None
+        if min_quantity is not None:
+            self.min_quantity = Amount(min_quantity, HIVE_PRECISION)
+        self.memo = None
+        if memo is not None:
+            self.memo = re.compile(memo)
+
+    def _get_set(self, values, upper=False):
+        if values is None:
+            return None
+        if not isinstance(values, (list, tuple, set)):
+            values = [values]
+        if upper:
+            return set([value.upper() for value in values])
+        return set(values)
+
+    def match(self, op):
+        """Returns True when the transfer operation matches all filters"""
+        payload = op.payload
+        if self.to is not None and payload.get("to") not in self.to:
+            return False
+        if self.symbols is not None and payload.get("symbol") not in self.symbols:
+            return False
+        if self.senders is not None and op.sender not in self.senders:
+            return False
+        if self.min_quantity is not None:
+            try:
+                if Amount(payload.get("quantity"), HIVE_PRECISION) < self.min_quantity:
+                    return False
+            except ValueError:
+                return False
+        if self.memo is not None:
+            memo = payload.get("memo")
+            if not isinstance(memo, string_types) or self.memo.search(memo) is None:
+                return False
+        return True
+
+
+class TransferSubscription(object):
+    """ Follows the sidechain blocks once and calls the callbacks of all
+        subscriptions for matching tokens/transfer operations
+
+        Failed transfers (with errors in the logs) are skipped. The ids of
+        dispatched transactions and the last processed block are stored in
+        a sqlite database, so that no transfer is dispatched twice and
+        :func:`run` continues after the last processed block.
+
+        :param Api api: (optional) Api instance
+        :param str path: database file for the processed transactions (default is ":memory:")
+
+        .. code-block:: python
+
+            from hiveengine.subscription import TransferSubscription
+
+            def on_transfer(op):
+                print(op.sender, op.payload["quantity"], op.payload["memo"])
+
+            subscription = TransferSubscription(path="transfers.sqlite")
+            subscription.subscribe(on_transfer, to="beembot", symbols="BEE", min_quantity=1, memo=r"^https://")
+            subscription.run()
+
+    """
+    def __init__(self, api=None, path=":memory:"):
+        if api is None:
+            self.api = Api()
+        else:
+            self.api = api
+        self.path = path
+        self.subscriptions = []
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        with self.lock, self.db:
+            self.db.execute("CREATE TABLE IF NOT EXISTS transfers (txid TEXT PRIMARY KEY, block_num INTEGER NOT NULL)")
+            self.db.execute("CREATE TABLE IF NOT EXISTS state (key TEXT PRIMARY KEY, value INTEGER)")
+
+    def close(self):
+        with self.lock:
+            self.db.close()
+
+    def subscribe(self, callback, to=None, symbols=None, min_quantity=None, memo=None, senders=None):
+        """Adds a subscription and returns it (see :class:`Subscription`)"""
+        subscription = Subscription(callback, to=to, symbols=symbols, min_quantity=min_quantity,
+                                    memo=memo, senders=senders)
+        self.subscriptions.append(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        """Removes a subscription"""
+        self.subscriptions.remove(subscription)
+
+    @property
+    def block_num(self):
+        """Returns the last processed block or None"""
+        with self.lock:
+            row = self.db.execute("SELECT value FROM state WHERE key = 'block_num'").fetchone()
+        if row is None:
+            return None
+        return row[0]
+
+    def is_processed(self, txid):
+        """Returns True when the transaction was already dispatched"""
+        with self.lock:
+            row = self.db.execute("SELECT 1 FROM transfers WHERE txid = ?", (txid, )).fetchone()
+        return row is not None
+
+    def process_block(self, block):
+        """Dispatches all matching transfers of a block and returns their number.
+            Exceptions of a callback are logged and do not stop the other callbacks.
+        """
+        cnt = 0
+        for op in filter_operations(block, contracts=["tokens"], actions=["transfer"]):
+            if len(op.errors) > 0 or self.is_processed(op.trx_id):
+                continue
+            matched = False
+            for subscription in list(self.subscriptions):
+                if subscription.match(op):
+                    matched = True
+                    try:
+                        subscription.callback(op)
+                    except Exception as e:
+                        # the transfer is marked as processed, so that it is not retried forever
+                        log.exception("Callback failed for transfer %s: %s" % (op.trx_id, str(e)))
+            if matched:
+                cnt += 1
+                with self.lock, self.db:
+                    self.db.execute("INSERT OR IGNORE INTO transfers (txid, block_num) VALUES (?, ?)",
+                                    (op.trx_id, block["blockNumber"]))
+        with self.lock, self.db:
+            self.db.execute("INSERT OR REPLACE INTO state (key, value) VALUES ('block_num', MAX(?, "
+                            "COALESCE((SELECT value FROM state WHERE key = 'block_num'), 0)))", (block["blockNumber"], ))
+        return cnt
+
+    def run(self, start=None, stop=None, workers=4, batch_size=50):
+        """Follows the blocks and dispatches the transfers
+
+            :param int start: (optional) first block, default is the block after
+                the last processed block or the head block
+            :param int stop: (optional) last block, follows the head block when not set
+        """
+        if start is None and self.block_num is not None:
+            start = self.block_num + 1
+        if start is None:
+            start = self.api.get_latest_block_info()["blockNumber"]
+        for block in self.api.stream_blocks(start, stop=stop, workers=workers, batch_size=batch_size):
+            self.process_block(block)
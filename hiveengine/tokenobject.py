@@ -3,9 +3,13 @@ from __future__ import division
 from __future__ import print_function
 from __future__ import unicode_literals
 from hiveengine.api import Api
+from hiveengine.amount import Amount
 from hiveengine.exceptions import TokenDoesNotExists
 import decimal
 
+# quantize places for all valid token precisions
+PLACES = [decimal.Decimal(10) ** (-precision) for precision in range(0, 19)]
+
 
 class Token(dict):
     """ hive-engine token dict
@@ -33,8 +37,11 @@ class Token(dict):
     def quantize(self, amount):
         """Round down a amount using the token precision and returns a Decimal object"""
         amount = decimal.Decimal(amount)
-        places = decimal.Decimal(10) ** (-self["precision"])
-        return amount.quantize(places, rounding=decimal.ROUND_DOWN)
+        return amount.quantize(PLACES[self["precision"]], rounding=decimal.ROUND_DOWN)
+
+    def amount(self, amount):
+        """Round down a amount using the token precision and returns a Amount object"""
+        return Amount(amount, self["precision"])
 
     def get_info(self):
         """Returns information about the token"""
@@ -13,23 +13,43 @@ class Tokens(list):
         if api is None:
             self.api = Api()
         else:
-            self.api = api        
+            self.api = api
+        self.last_id = None
+        self._index = {}
         self.refresh()
 
-    def refresh(self):
-        super(Tokens, self).__init__(self.get_token_list())
+    def refresh(self, full=False):
+        """Fetches all tokens which were added since the last refresh.
+            All tokens are reloaded, when full is True.
+        """
+        if full or self.last_id is None:
+            super(Tokens, self).__init__(self.get_token_list())
+            self._index = {}
+            new_tokens = self
+        else:
+            new_tokens = self.get_token_list(last_id=self.last_id)
+            self.extend(new_tokens)
+        for t in new_tokens:
+            self._index[t["symbol"].upper()] = t
+            if self.last_id is None or t["_id"] > self.last_id:
+                self.last_id = t["_id"]
+
+    def get_token_list(self, last_id=None):
+        """Returns all available token as list
 
-    def get_token_list(self):
-        """Returns all available token as list"""
-        tokens = self.api.find("tokens", "tokens", query={})
+            :param int last_id: when set, only tokens with a higher _id are returned
+        """
+        query = {}
+        if last_id is not None:
+            query = {"_id": {"$gt": last_id}}
+        tokens = list(self.api.find_iter("tokens", "tokens", query=query, keyset=True))
         return tokens
 
     def get_token(self, symbol):
         """Returns Token from given token symbol. Is None
             when token does not exists.
         """
-        for t in self:
-            if t["symbol"].lower() == symbol.lower():
-                return Token(t, api=self.api)
-        return None
-
+        t = self._index.get(symbol.upper())
+        if t is None:
+            return None
+        return Token(t, api=self.api)
@@ -0,0 +1,198 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+import json
+import sqlite3
+import threading
+from hiveengine.api import Api
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+class TradeStore(object):
+    """ Append only trade history store for tokens and NFTs (sqlite3)
+
+        Trades are read from market/tradesHistory (tokens) and from
+        nftmarket/<SYMBOL>tradesHistory (NFTs). Each sync only requests the
+        trades with an _id above the last stored trade of the symbol, so
+        the store grows beyond the 24 h which are kept by the sidechain.
+
+        For NFT trades, quantity is the number of sold NFTs, price is the
+        price per NFT and volume is the price of the trade (in priceSymbol).
+
+        :param str path: database file (default is ":memory:")
+        :param Api api: (optional) Api instance
+
+        .. code-block:: python
+
+            from hiveengine.trades import TradeStore
+            store = TradeStore("trades.sqlite")
+            store.sync("BEE")
+            for candle in store.ohlcv("BEE", interval=3600):
+                print(candle)
+
+    """
+    def __init__(self, path=":memory:", api=None):
+        if api is None:
+            self.api = Api()
+        else:
+            self.api = api
+        self.path = path
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        with self.lock, self.db:
+            self.db.execute("CREATE TABLE IF NOT EXISTS trades (market TEXT NOT NULL, symbol TEXT NOT NULL, "
+                            "id INTEGER NOT NULL, timestamp INTEGER NOT NULL, price REAL NOT NULL, "
+                            "quantity REAL NOT NULL, volume REAL NOT NULL, price_symbol TEXT NOT NULL, "
+                            "data TEXT NOT NULL, PRIMARY KEY (market, symbol, id))")
+            self.db.execute("CREATE INDEX IF NOT EXISTS trades_timestamp ON trades (market, symbol, timestamp)")
+
+    def close(self):
+        with self.lock:
+            self.db.close()
+
+    def _get_market(self, nft):
+        if nft:
+            return "nftmarket"
+        return "market"
+
+    def __len__(self):
+        with self.lock:
+            return self.db.execute("SELECT COUNT(*) FROM trades").fetchone()[0]
+
+    def get_last_id(self, symbol, nft=False):
+        """Returns the _id of the last stored trade or None"""
+        with self.lock:
+            row = self.db.execute("SELECT MAX(id) FROM trades WHERE market = ? AND symbol = ?",
+                                  (self._get_market(nft), symbol.upper())).fetchone()
+        return row[0]
+
+    def _get_row(self, symbol, trade, nft):
+        if nft:
+            quantity = 0
+            for counterparty in trade.get("counterparties", []):
+                quantity += len(counterparty.get("nftIds", []))
+            volume = float(trade["price"])
+            price = volume / quantity if quantity > 0 else volume
+            price_symbol = trade["priceSymbol"]
+        else:
+            quantity = float(trade["quantity"])
+            price = float(trade["price"])
+            volume = float(trade.get("volume") or quantity * price)
+            price_symbol = "SWAP.HIVE"
+        return (self._get_market(nft), symbol, trade["_id"], int(trade["timestamp"]), price, quantity, volume,
+                price_symbol, json.dumps(trade))
+
+    def sync(self, symbol, nft=False, page_size=1000):
+        """Stores all new trades of a symbol and returns the number of new trades
+
+            :param str symbol: token or NFT symbol
+            :param bool nft: when True, the NFT trades history is used
+        """
+        symbol = symbol.upper()
+        if nft:
+            table_name = "%stradesHistory" % symbol
+            query = {}
+        else:
+            table_name = "tradesHistory"
+            query = {"symbol": symbol}
+        last_id = self.get_last_id(symbol, nft=nft)
+        if last_id is not None:
+            query["_id"] = {"$gt": last_id}
+        cnt = 0
+        rows = []
+        for trade in self.api.find_iter(self._get_market(nft), table_name, query=query, page_size=page_size,
+                                        prefetch=True, keyset=True):
+            rows.append(self._get_row(symbol, trade, nft))
+            if len(rows) >= page_size:
+                cnt += self._put_rows(rows)
+                rows = []
+        cnt += self._put_rows(rows)
+        return cnt
+
+    def _put_rows(self, rows):
+        if len(rows) == 0:
+            return 0
+        with self.lock, self.db:
+            self.db.executemany("INSERT OR IGNORE INTO trades VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+        return len(rows)
+
+    def _select(self, columns, symbol, nft, start, stop, price_symbol, order=True):
+        sql = "SELECT %s FROM trades WHERE market = ? AND symbol = ?" % columns
+        args = [self._get_market(nft), symbol.upper()]
+        if start is not None:
+            sql += " AND timestamp >= ?"
+            args.append(int(start))
+        if stop is not None:
+            sql += " AND timestamp < ?"
+            args.append(int(stop))
+        if price_symbol is not None:
+            sql += " AND price_symbol = ?"
+            args.append(price_symbol.upper())
+        if order:
+            sql += " ORDER BY timestamp, id"
+        with self.lock:
+            return self.db.execute(sql, args).fetchall()
+
+    def get_trades(self, symbol, nft=False, start=None, stop=None, price_symbol=None):
+        """Returns the stored trades (as returned by the api) of a symbol
+
+            :param int start: (optional) first timestamp (unix time, included)
+            :param int stop: (optional) last timestamp (unix time, not included)
+            :param str price_symbol: (optional) only NFT trades paid with this token
+        """
+        rows = self._select("data", symbol, nft, start, stop, price_symbol)
+        return [json.loads(row[0]) for row in rows]
+
+    def ohlcv(self, symbol, interval=3600, nft=False, start=None, stop=None, price_symbol=None):
+        """Returns open, high, low, close, quantity and volume of all intervals
+            with trades as list of dicts. The candles are aggregated with numpy
+            when it is installed.
+
+            :param int interval: candle length in seconds (default is 3600)
+            :param int start: (optional) first timestamp (unix time, included)
+            :param int stop: (optional) last timestamp (unix time, not included)
+            :param str price_symbol: (optional) only NFT trades paid with this token
+        """
+        rows = self._select("timestamp, price, quantity, volume", symbol, nft, start, stop, price_symbol)
+        if len(rows) == 0:
+            return []
+        if np is not None:
+            return self._ohlcv_numpy(rows, interval)
+        candles = []
+        candle = None
+        for timestamp, price, quantity, volume in rows:
+            bucket = timestamp // interval * interval
+            if candle is None or candle["timestamp"] != bucket:
+                candle = {"timestamp": bucket, "open": price, "high": price, "low": price, "close": price,
+                          "quantity": 0., "volume": 0., "trades": 0}
+                candles.append(candle)
+            candle["high"] = max(candle["high"], price)
+            candle["low"] = min(candle["low"], price)
+            candle["close"] = price
+            candle["quantity"] += quantity
+            candle["volume"] += volume
+            candle["trades"] += 1
+        return candles
+
+    def _ohlcv_numpy(self, rows, interval):
+        data = np.array(rows, dtype=np.float64)
+        buckets = data[:, 0].astype(np.int64) // interval * interval
+        starts = np.concatenate(([0], np.flatnonzero(np.diff(buckets)) + 1))
+        ends = np.concatenate((starts[1:], [len(buckets)]))
+        price = data[:, 1]
+        columns = [buckets[starts], price[starts], np.maximum.reduceat(price, starts),
+                   np.minimum.reduceat(price, starts), price[ends - 1], np.add.reduceat(data[:, 2], starts),
+                   np.add.reduceat(data[:, 3], starts), ends - starts]
+        return [{"timestamp": int(t), "open": float(o), "high": float(h), "low": float(l), "close": float(c),
+                 "quantity": float(q), "volume": float(v), "trades": int(n)}
+                for t, o, h, l, c, q, v, n in zip(*columns)]
+
+    def volume(self, symbol, nft=False, start=None, stop=None, price_symbol=None):
+        """Returns (number of trades, quantity, volume) of the stored trades"""
+        rows = self._select("COUNT(*), TOTAL(quantity), TOTAL(volume)", symbol, nft, start, stop, price_symbol,
+                            order=False)
+        return rows[0]
@@ -10,20 +10,23 @@ import json
 import requests
 from timeit import default_timer as timer
 import logging
-import decimal
 from hiveengine.api import Api
+from hiveengine.actionbatch import ActionBatchMixin
 from hiveengine.tokenobject import Token
 from hiveengine.exceptions import (TokenDoesNotExists, TokenNotInWallet, InsufficientTokenAmount, TokenIssueNotPermitted, MaxSupplyReached, InvalidTokenAmount)
 from beem.instance import shared_blockchain_instance
 from beem.account import Account
 
 
-class Wallet(list):
+class Wallet(ActionBatchMixin, list):
     """ Access the hive-engine wallet
 
         :param str account: Name of the account
         :param Hive blockchain_instance: Hive
                instance
+        :param bool check_account: when False, the account is not checked
+               on the Hive blockchain (default is True)
+        :param list balances: (optional) already loaded balances of the account
                
         Wallet example:
 
@@ -34,16 +37,22 @@ class Wallet(list):
                 print(wallet)
 
     """
-    def __init__(self, account, api=None, blockchain_instance=None, steem_instance=None):
+    def __init__(self, account, api=None, blockchain_instance=None, steem_instance=None, check_account=True, balances=None):
         if api is None:
             self.api = Api()
         else:
             self.api = api
         self.ssc_id = "ssc-mainnet-hive"
+        self._batch = None
         self.blockchain = blockchain_instance or steem_instance or shared_blockchain_instance()
-        check_account = Account(account, blockchain_instance=self.blockchain)
-        self.account = check_account["name"]
-        self.refresh()
+        if check_account:
+            self.account = Account(account, blockchain_instance=self.blockchain)["name"]
+        else:
+            self.account = account
+        if balances is None:
+            self.refresh()
+        else:
+            super(Wallet, self).__init__(balances)
 
     def refresh(self):
         super(Wallet, self).__init__(self.get_balances())
@@ -93,19 +102,19 @@ class Wallet(list):
         token_in_wallet = self.get_token(symbol)
         if token_in_wallet is None:
             raise TokenNotInWallet("%s is not in wallet." % symbol)
-        if float(token_in_wallet["balance"]) < float(amount):
-            raise InsufficientTokenAmount("Only %.3f in wallet" % float(token_in_wallet["balance"]))
-        token = Token(symbol, api=self.api)
-        quant_amount = token.quantize(amount)
-        if quant_amount <= decimal.Decimal("0"):
+        token = self._get_token(symbol)
+        quant_amount = token.amount(amount)
+        balance = token.amount(token_in_wallet["balance"]) - self._get_debit(symbol)
+        if balance < quant_amount:
+            raise InsufficientTokenAmount("Only %s in wallet" % str(balance))
+        if quant_amount <= 0:
             raise InvalidTokenAmount("Amount to transfer is below token precision of %d" % token["precision"])
-        check_to = Account(to, blockchain_instance=self.blockchain)
+        check_to = self._check_account(to)
+        self._add_debit(symbol, quant_amount)
         contract_payload = {"symbol":symbol.upper(),"to":to,"quantity":str(quant_amount),"memo":memo}
         json_data = {"contractName":"tokens","contractAction":"transfer",
                      "contractPayload":contract_payload}
-        assert self.blockchain.is_hive
-        tx = self.blockchain.custom_json(self.ssc_id, json_data, required_auths=[self.account])
-        return tx
+        return self._broadcast(json_data)
 
     def stake(self, amount, symbol, receiver=None):
         """Stake a token.
@@ -127,22 +136,22 @@ class Wallet(list):
         token_in_wallet = self.get_token(symbol)
         if token_in_wallet is None:
             raise TokenNotInWallet("%s is not in wallet." % symbol)
-        if float(token_in_wallet["balance"]) < float(amount):
-            raise InsufficientTokenAmount("Only %.3f in wallet" % float(token_in_wallet["balance"]))
-        token = Token(symbol, api=self.api)
-        quant_amount = token.quantize(amount)
-        if quant_amount <= decimal.Decimal("0"):
+        token = self._get_token(symbol)
+        quant_amount = token.amount(amount)
+        balance = token.amount(token_in_wallet["balance"]) - self._get_debit(symbol)
+        if balance < quant_amount:
+            raise InsufficientTokenAmount("Only %s in wallet" % str(balance))
+        if quant_amount <= 0:
             raise InvalidTokenAmount("Amount to stake is below token precision of %d" % token["precision"])
         if receiver is None:
             receiver = self.account
         else:
-            _ = Account(receiver, blockchain_instance=self.blockchain)
+            _ = self._check_account(receiver)
+        self._add_debit(symbol, quant_amount)
         contract_payload = {"symbol":symbol.upper(),"to": receiver, "quantity":str(quant_amount)}
         json_data = {"contractName":"tokens","contractAction":"stake",
                      "contractPayload":contract_payload}
-        assert self.blockchain.is_hive
-        tx = self.blockchain.custom_json(self.ssc_id, json_data, required_auths=[self.account])
-        return tx
+        return self._broadcast(json_data)
 
     def unstake(self, amount, symbol):
         """Unstake a token.
@@ -166,18 +175,18 @@ class Wallet(list):
             raise TokenNotInWallet("%s is not in wallet." % symbol)
         if "stake" not in token_in_wallet:
             raise InsufficientTokenAmount("Token cannot be unstaked")
-        if float(token_in_wallet["stake"]) < float(amount):
-            raise InsufficientTokenAmount("Only %.3f are staked in the wallet" % float(token_in_wallet["stake"]))
-        token = Token(symbol, api=self.api)
-        quant_amount = token.quantize(amount)
-        if quant_amount <= decimal.Decimal("0"):
+        token = self._get_token(symbol)
+        quant_amount = token.amount(amount)
+        stake = token.amount(token_in_wallet["stake"]) - self._get_debit(symbol, "stake")
+        if stake < quant_amount:
+            raise InsufficientTokenAmount("Only %s are staked in the wallet" % str(stake))
+        if quant_amount <= 0:
             raise InvalidTokenAmount("Amount to stake is below token precision of %d" % token["precision"])
+        self._add_debit(symbol, quant_amount, "stake")
         contract_payload = {"symbol":symbol.upper(),"quantity":str(quant_amount)}
         json_data = {"contractName":"tokens","contractAction":"unstake",
                      "contractPayload":contract_payload}
-        assert self.blockchain.is_hive
-        tx = self.blockchain.custom_json(self.ssc_id, json_data, required_auths=[self.account])
-        return tx
+        return self._broadcast(json_data)
 
     def cancel_unstake(self, trx_id):
         """Cancel unstaking a token.
@@ -198,9 +207,7 @@ class Wallet(list):
         contract_payload = {"txID":trx_id}
         json_data = {"contractName":"tokens","contractAction":"cancelUnstake",
                      "contractPayload":contract_payload}
-        assert self.blockchain.is_hive
-        tx = self.blockchain.custom_json(self.ssc_id, json_data, required_auths=[self.account])
-        return tx
+        return self._broadcast(json_data)
 
     def issue(self, to, amount, symbol):
         """Issues a specific token amount.
@@ -221,22 +228,20 @@ class Wallet(list):
                 wallet = Wallet("test", blockchain_instance=stm)
                 wallet.issue(1, "my_token")
         """
-        token = Token(symbol, api=self.api)
+        token = self._get_token(symbol)
         if token["issuer"] != self.account:
             raise TokenIssueNotPermitted("%s is not the issuer of token %s" % (self.account, symbol))
         
         if token["maxSupply"] == token["supply"]:
             raise MaxSupplyReached("%s has reached is maximum supply of %d" % (symbol, token["maxSupply"]))
-        quant_amount = token.quantize(amount)
-        if quant_amount <= decimal.Decimal("0"):
+        quant_amount = token.amount(amount)
+        if quant_amount <= 0:
             raise InvalidTokenAmount("Amount to issue is below token precision of %d" % token["precision"])        
-        check_to = Account(to, blockchain_instance=self.blockchain)
+        check_to = self._check_account(to)
         contract_payload = {"symbol":symbol.upper(),"to":to,"quantity":str(quant_amount)}
         json_data = {"contractName":"tokens","contractAction":"issue",
                      "contractPayload":contract_payload}
-        assert self.blockchain.is_hive
-        tx = self.blockchain.custom_json(self.ssc_id, json_data, required_auths=[self.account])
-        return tx
+        return self._broadcast(json_data)
 
     def get_history(self, symbol, limit=1000, offset=0):
         """Returns the transfer history of a token"""
@@ -261,3 +266,45 @@ class Wallet(list):
         else:
             sell_book = self.api.find("market", "sellBook", query={"symbol": symbol, "account": self.account}, limit=limit, offset=offset)
         return sell_book
+
+
+class Wallets(dict):
+    """ Access the hive-engine wallets of many accounts. The balances are
+        loaded with a few $in queries (see :func:`hiveengine.api.Api.get_balances`)
+
+        :param list accounts: Names of the accounts
+        :param Hive blockchain_instance: Hive
+               instance
+        :param bool check_accounts: when False, the accounts are not checked
+               on the Hive blockchain (default is True)
+        :param int chunk_size: number of accounts in one query
+
+        Wallets example:
+
+            .. code-block:: python
+
+                from hiveengine.wallet import Wallets
+                wallets = Wallets(["test", "test2"], check_accounts=False)
+                print(wallets["test"].get_token("BEE"))
+
+    """
+    def __init__(self, accounts, api=None, blockchain_instance=None, steem_instance=None, check_accounts=True, chunk_size=100):
+        if api is None:
+            self.api = Api()
+        else:
+            self.api = api
+        self.blockchain = blockchain_instance or steem_instance or shared_blockchain_instance()
+        self.check_accounts = check_accounts
+        self.chunk_size = chunk_size
+        if check_accounts:
+            accounts = [Account(account, blockchain_instance=self.blockchain)["name"] for account in accounts]
+        self.accounts = list(accounts)
+        self.refresh()
+
+    def refresh(self):
+        balances = self.api.get_balances(self.accounts, chunk_size=self.chunk_size)
+        wallets = {}
+        for account in self.accounts:
+            wallets[account] = Wallet(account, api=self.api, blockchain_instance=self.blockchain,
+                                      check_account=False, balances=balances[account])
+        super(Wallets, self).__init__(wallets)
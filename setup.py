@@ -26,6 +26,12 @@ requires = [
     "six",
 ]
 
+extras_require = {
+    "async": ["aiohttp"],
+    "orjson": ["orjson"],
+    "numpy": ["numpy"],
+}
+
 
 def write_version_py(filename):
     """Write version."""
@@ -76,6 +82,7 @@ if __name__ == '__main__':
             'Intended Audience :: Developers',
         ],
         install_requires=requires,
+        extras_require=extras_require,
         entry_points={
             'console_scripts': [
                 'hiveengine=hiveengine.cli:cli',
@@ -0,0 +1,120 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+import json
+import unittest
+from hiveengine.actionbatch import ActionBatch
+from hiveengine.api import Api
+from hiveengine.exceptions import InsufficientTokenAmount
+from hiveengine.tokenobject import Token
+from hiveengine.wallet import Wallet
+try:
+    from unittest import mock
+except ImportError:
+    import mock
+
+
+class Blockchain(object):
+    is_hive = True
+
+    def __init__(self):
+        self.broadcasts = []
+
+    def custom_json(self, ssc_id, json_data, required_auths=[], required_posting_auths=[]):
+        if len(self.broadcasts) == 1:
+            self.broadcasts.append(None)
+            raise Exception("failed")
+        self.broadcasts.append((json_data, required_auths, required_posting_auths))
+        return {"trx_id": "trx%d" % len(self.broadcasts)}
+
+
+class Owner(object):
+    _batch = None
+
+
+class Testcases(unittest.TestCase):
+    def get_action(self, to):
+        return {"contractName": "tokens", "contractAction": "transfer",
+                "contractPayload": {"symbol": "BEE", "to": to, "quantity": "1", "memo": ""}}
+
+    def test_actionbatch(self):
+        blockchain = Blockchain()
+        owner = Owner()
+        size = len(json.dumps(self.get_action("a0")))
+        with ActionBatch(blockchain, max_size=3 * size + 6, owner=owner) as batch:
+            self.assertIs(owner._batch, batch)
+            for i in range(7):
+                self.assertEqual(batch.append("a", self.get_action("a%d" % i)), i)
+            batch.append("b", self.get_action("b"), auth="posting")
+            self.assertEqual([len(indices) for account, auth, indices in batch.get_chunks()], [3, 3, 1, 1])
+        self.assertIsNone(owner._batch)
+        self.assertEqual(len(blockchain.broadcasts), 4)
+        self.assertEqual(len(blockchain.broadcasts[0][0]), 3)
+        self.assertEqual(blockchain.broadcasts[0][1], ["a"])
+        self.assertEqual(blockchain.broadcasts[3], (self.get_action("b"), [], ["b"]))
+        results = batch.results
+        self.assertEqual(len(results), 8)
+        self.assertEqual([r["trx_id"] for r in results[:3]], ["trx1"] * 3)
+        self.assertIsNotNone(results[3]["error"])
+        self.assertIsNone(results[6]["error"])
+        self.assertEqual(results[6]["action"], self.get_action("a6"))
+        self.assertEqual(len(batch), 0)
+        self.assertRaises(ValueError, batch.append, "a", {"memo": "x" * 1000})
+
+    def test_actionbatch_exception(self):
+        blockchain = Blockchain()
+        try:
+            with ActionBatch(blockchain) as batch:
+                batch.append("a", self.get_action("a0"))
+                raise KeyError("x")
+        except KeyError:
+            pass
+        self.assertEqual(blockchain.broadcasts, [])
+        self.assertEqual(batch.dropped, [self.get_action("a0")])
+        self.assertEqual(len(batch), 0)
+        try:
+            with ActionBatch(blockchain, flush_on_error=True) as batch:
+                batch.append("a", self.get_action("a0"))
+                raise KeyError("x")
+        except KeyError:
+            pass
+        self.assertEqual(len(blockchain.broadcasts), 1)
+        self.assertEqual(batch.results[0]["trx_id"], "trx1")
+
+    def test_wallet_batch(self):
+        blockchain = Blockchain()
+        wallet = Wallet("test", api=Api(), blockchain_instance=blockchain, check_account=False,
+                        balances=[{"symbol": "BEE", "balance": "10"}])
+        with mock.patch("hiveengine.actionbatch.Token",
+                        side_effect=lambda symbol, api=None: Token({"symbol": symbol, "precision": 8})) as token, \
+                mock.patch("hiveengine.actionbatch.Account", return_value={"name": "x"}) as account:
+            with wallet.batch() as batch:
+                for i in range(5):
+                    self.assertEqual(wallet.transfer("a%d" % (i % 2), 1, "BEE"), i)
+        self.assertEqual(token.call_count, 1)
+        self.assertEqual(account.call_count, 2)
+        self.assertEqual(len(blockchain.broadcasts), 1)
+        self.assertEqual(len(blockchain.broadcasts[0][0]), 5)
+        self.assertEqual(blockchain.broadcasts[0][1], ["test"])
+        self.assertEqual(len(batch.results), 5)
+
+    def test_wallet_batch_overspend(self):
+        blockchain = Blockchain()
+        wallet = Wallet("test", api=Api(), blockchain_instance=blockchain, check_account=False,
+                        balances=[{"symbol": "BEE", "balance": "10", "stake": "1"}])
+        with mock.patch("hiveengine.actionbatch.Token",
+                        side_effect=lambda symbol, api=None: Token({"symbol": symbol, "precision": 8})), \
+                mock.patch("hiveengine.actionbatch.Account", return_value={"name": "x"}):
+            with wallet.batch() as batch:
+                wallet.transfer("a", 6, "BEE")
+                self.assertRaises(InsufficientTokenAmount, wallet.stake, 5, "BEE")
+                wallet.stake("3.5", "BEE")
+                self.assertRaises(InsufficientTokenAmount, wallet.transfer, "a", "0.50000001", "BEE")
+                wallet.transfer("a", "0.5", "BEE")
+                wallet.unstake(1, "BEE")
+                self.assertRaises(InsufficientTokenAmount, wallet.unstake, "0.1", "BEE")
+            self.assertEqual(len(batch.results), 4)
+            # a new batch starts with the wallet balances
+            with wallet.batch():
+                wallet.transfer("a", 10, "BEE")
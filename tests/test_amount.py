@@ -0,0 +1,64 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+import decimal
+import unittest
+from hiveengine.amount import Amount, parse_amount, format_amount
+
+
+class Testcases(unittest.TestCase):
+    def test_parse_amount(self):
+        self.assertEqual(parse_amount("1.23456", 3), 1234)
+        self.assertEqual(parse_amount("-1.23456", 3), -1234)
+        self.assertEqual(parse_amount(".5", 3), 500)
+        self.assertEqual(parse_amount("5.", 0), 5)
+        self.assertEqual(parse_amount(0.1, 8), 10000000)
+        self.assertEqual(parse_amount(1e-05, 8), 1000)
+        self.assertEqual(parse_amount(decimal.Decimal("2.5"), 2), 250)
+        self.assertEqual(parse_amount(7, 3), 7000)
+        self.assertRaises(ValueError, parse_amount, "abc", 3)
+        self.assertRaises(ValueError, parse_amount, "", 3)
+
+    def test_format_amount(self):
+        self.assertEqual(format_amount(1234, 3), "1.234")
+        self.assertEqual(format_amount(-5, 3), "-0.005")
+        self.assertEqual(format_amount(5, 0), "5")
+
+    def test_quantize_compatibility(self):
+        for value in ["1", "0.1", "123.456789", "0.00000001", 0.3, 2]:
+            for precision in [0, 3, 8]:
+                expected = decimal.Decimal(value).quantize(decimal.Decimal(10) ** -precision, rounding=decimal.ROUND_DOWN)
+                if isinstance(value, float):
+                    expected = decimal.Decimal(repr(value)).quantize(decimal.Decimal(10) ** -precision, rounding=decimal.ROUND_DOWN)
+                self.assertEqual(str(Amount(value, precision)), "{:f}".format(expected))
+
+    def test_amount(self):
+        a = Amount("1.5", 3)
+        self.assertEqual(str(a + Amount("0.25", 2)), "1.750")
+        self.assertEqual(str(a - 1), "0.500")
+        self.assertEqual(str(sum([a, a])), "3.000")
+        self.assertTrue(a < "1.5001")
+        self.assertTrue(a > 1.4999)
+        self.assertTrue(a == Amount("1.50", 2))
+        self.assertEqual(hash(a), hash(Amount("1.50", 2)))
+        self.assertFalse(Amount(0, 3))
+        self.assertEqual(float(a), 1.5)
+        self.assertEqual(str(Amount("2", 3).value_at("0.12345678")), "0.24691356")
+        self.assertEqual(str(Amount("1.239", 3).rescale(1)), "1.2")
+
+    def test_amount_float_compare(self):
+        a = Amount("1.1", 8)
+        self.assertTrue(a == 1.1)
+        self.assertFalse(a < 1.1)
+        self.assertFalse(a > 1.1)
+        self.assertTrue(a < 1.10000001)
+        self.assertTrue(Amount("0.3", 8) == 0.3)
+        self.assertTrue(a < float("inf"))
+        self.assertFalse(a == float("nan"))
+
+    def test_token_amount(self):
+        from hiveengine.tokenobject import Token
+        token = Token({"symbol": "BEE", "precision": 8})
+        self.assertEqual(str(token.amount("1.123456789")), "1.12345678")
+        self.assertEqual(str(token.quantize("1.123456789")), "1.12345678")
@@ -4,8 +4,11 @@ from __future__ import print_function
 from __future__ import unicode_literals
 from builtins import range
 from builtins import super
+import itertools
+import json
 import unittest
 from hiveengine.api import Api
+from hiveengine.exceptions import BlockNotAvailable
 
 
 class Testcases(unittest.TestCase):
@@ -31,4 +34,137 @@ class Testcases(unittest.TestCase):
         
         # result = api.get_history("holger80", "FOODIE")
         # self.assertTrue(len(result) > 0)
-     
\ No newline at end of file
+
+    def test_shared_cache(self):
+        api = Api(rpcurl="http://cache-node")
+        sent = []
+
+        def request_send(endpoint, payload, url=None):
+            query = json.loads(payload)[0]
+            sent.append(query["params"]["table"])
+            result = [{"symbol": "BEE", "precision": 8, "metadata": {"url": "a"}}]
+            if query["method"] == "findOne":
+                result = result[0]
+            return json.dumps([{"jsonrpc": "2.0", "id": query["id"], "result": result}])
+
+        api.rpc.request_send = request_send
+        for i in range(2):
+            token = api.find_one("tokens", "tokens", query={"symbol": "BEE"})[0]
+            self.assertEqual(token["metadata"], {"url": "a"})
+            token["metadata"]["url"] = "b"
+            tokens = api.find("tokens", "tokens", query={"symbol": "BEE"})
+            self.assertEqual(tokens[0]["metadata"], {"url": "a"})
+            self.assertEqual(tokens[0]["precision"], 8)
+            tokens[0]["precision"] = 3
+            api.find("tokens", "balances", query={"symbol": "BEE"})
+        self.assertEqual(sent, ["tokens", "tokens", "balances", "balances"])
+        # the cache is shared by all Api objects of the same nodes
+        self.assertTrue(Api(rpcurl="http://cache-node").cache is api.cache)
+        self.assertFalse(Api(rpcurl="http://other-node").cache is api.cache)
+        self.assertEqual(Api(rpcurl="http://cache-node", cache=False).cache, None)
+
+    def test_find_all_parallel(self):
+        api = Api()
+        rows = [{"_id": i} for i in range(2500)]
+        sent = []
+
+        def request_send(endpoint, payload, url=None):
+            queries = json.loads(payload)
+            sent.append(len(queries))
+            replies = []
+            for q in queries:
+                offset = q["params"]["offset"]
+                replies.append({"jsonrpc": "2.0", "id": q["id"], "result": rows[offset:offset + q["params"]["limit"]]})
+            return json.dumps(replies)
+
+        api.rpc.request_send = request_send
+        result = api.find_all("tokens", "balances", parallel=4)
+        self.assertEqual(result, rows)
+        self.assertEqual(sent, [4])
+
+    def test_find_iter(self):
+        api = Api()
+        rows = [{"_id": i} for i in range(250)]
+        offsets = []
+
+        def find(contract_name, table_name, query={}, limit=1000, offset=0, indexes=[]):
+            offsets.append(offset)
+            return rows[offset:offset + limit]
+
+        api.find = find
+        result = api.find_iter("tokens", "balances", page_size=100, prefetch=True)
+        self.assertEqual(next(result), rows[0])
+        self.assertEqual([rows[0]] + list(result), rows)
+        self.assertEqual(offsets, [0, 100, 200])
+
+    def test_find_iter_keyset(self):
+        api = Api()
+        rows = [{"_id": i} for i in range(1, 251)]
+        queries = []
+
+        def find(contract_name, table_name, query={}, limit=1000, offset=0, indexes=[]):
+            queries.append(query)
+            self.assertEqual(offset, 0)
+            self.assertEqual(indexes, [{"index": "_id", "descending": False}])
+            last_id = query.get("_id", {"$gt": 0})["$gt"]
+            return [row for row in rows if row["_id"] > last_id and row["_id"] % 2 == query["x"]][:limit]
+
+        api.find = find
+        result = list(api.find_iter("tokens", "balances", query={"x": 1}, page_size=50, keyset=True))
+        self.assertEqual(result, [row for row in rows if row["_id"] % 2 == 1])
+        self.assertEqual(queries[0], {"x": 1})
+        self.assertEqual(queries[-1], {"x": 1, "_id": {"$gt": 199}})
+
+    def test_stream_blocks(self):
+        api = Api()
+        batches = []
+
+        def request_send(endpoint, payload, url=None):
+            queries = json.loads(payload)
+            if queries[0]["method"] == "getLatestBlockInfo":
+                return json.dumps([{"jsonrpc": "2.0", "id": queries[0]["id"], "result": {"blockNumber": 120}}])
+            batches.append(len(queries))
+            return json.dumps([{"jsonrpc": "2.0", "id": q["id"], "result": {"blockNumber": q["params"]["blockNumber"]}}
+                               for q in queries])
+
+        api.rpc.request_send = request_send
+        blocks = [block["blockNumber"] for block in api.stream_blocks(10, 100, workers=3, batch_size=20)]
+        self.assertEqual(blocks, list(range(10, 101)))
+        self.assertEqual(sorted(batches), [11, 20, 20, 20, 20])
+
+    def test_stream_blocks_beyond_head(self):
+        api = Api()
+        calls = []
+
+        def get_block_range(start, stop, priority=None):
+            calls.append(start)
+            return [{"blockNumber": i} if i <= 12 else None for i in range(start, stop)]
+
+        api.get_latest_block_info = lambda: {"blockNumber": 12}
+        api.get_block_range = get_block_range
+        api.get_block_info = lambda blocknumber: None
+        stream = api.stream_blocks(10, 20, workers=2, batch_size=2, poll_interval=0, max_wait=0.05)
+        self.assertEqual([block["blockNumber"] for block in itertools.islice(stream, 3)], [10, 11, 12])
+        self.assertRaises(BlockNotAvailable, next, stream)
+        self.assertEqual(calls, [10, 12])
+        # a block which the node does not return
+        api.get_latest_block_info = lambda: {"blockNumber": 20}
+        stream = api.stream_blocks(12, 20, workers=2, batch_size=2, poll_interval=0, max_wait=0.05)
+        self.assertEqual(next(stream)["blockNumber"], 12)
+        self.assertRaises(BlockNotAvailable, next, stream)
+        stream.close()
+
+    def test_get_balances(self):
+        api = Api()
+        queries = []
+
+        def find_iter(contract_name, table_name, query={}, **kwargs):
+            queries.append(query)
+            return iter([{"account": account, "symbol": "BEE"} for account in query["account"]["$in"] if account != "c"])
+
+        api.find_iter = find_iter
+        balances = api.get_balances(["a", "b", "c", "a"], symbol="bee", chunk_size=2)
+        self.assertEqual(queries, [{"account": {"$in": ["a", "b"]}, "symbol": "BEE"},
+                                   {"account": {"$in": ["c"]}, "symbol": "BEE"}])
+        self.assertEqual(balances, {"a": [{"account": "a", "symbol": "BEE"}],
+                                    "b": [{"account": "b", "symbol": "BEE"}], "c": []})
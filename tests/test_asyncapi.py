@@ -0,0 +1,62 @@
+import asyncio
+import unittest
+try:
+    from aiohttp import web
+    from hiveengine.asyncapi import AsyncApi
+    AIOHTTP_AVAILABLE = True
+except ImportError:
+    AIOHTTP_AVAILABLE = False
+
+
+def make_app(rows, in_flight):
+    """Local stand-in for a hive-engine node"""
+    async def handle(request):
+        queries = await request.json()
+        in_flight[0] += 1
+        in_flight[1] = max(in_flight[1], in_flight[0])
+        await asyncio.sleep(0.01)
+        in_flight[0] -= 1
+        replies = []
+        for q in queries:
+            params = q["params"]
+            if q["method"] == "find":
+                result = rows[params["offset"]:params["offset"] + params["limit"]]
+            elif q["method"] == "findOne":
+                result = rows[0]
+            elif q["method"] == "getLatestBlockInfo":
+                result = {"blockNumber": 100}
+            else:
+                result = {"blockNumber": params["blockNumber"]}
+            replies.append({"jsonrpc": "2.0", "id": q["id"], "result": result})
+        return web.json_response(replies)
+
+    app = web.Application()
+    app.router.add_post("/rpc/{endpoint}", handle)
+    return app
+
+
+@unittest.skipIf(not AIOHTTP_AVAILABLE, "aiohttp is not installed")
+class Testcases(unittest.TestCase):
+    def test_async_api(self):
+        rows = [{"_id": i} for i in range(2500)]
+        in_flight = [0, 0]
+
+        async def main():
+            runner = web.AppRunner(make_app(rows, in_flight))
+            await runner.setup()
+            site = web.TCPSite(runner, "127.0.0.1", 0)
+            await site.start()
+            port = site._server.sockets[0].getsockname()[1]
+            try:
+                async with AsyncApi(rpcurl="http://127.0.0.1:%d/rpc/" % port, max_concurrency=4) as api:
+                    result = await api.find_all("tokens", "balances")
+                    self.assertEqual(result, rows)
+                    latest = await api.get_latest_block_info()
+                    self.assertEqual(latest["blockNumber"], 100)
+                    blocks = await asyncio.gather(*[api.get_block_info(n) for n in range(1, 21)])
+                    self.assertEqual([b["blockNumber"] for b in blocks], list(range(1, 21)))
+            finally:
+                await runner.cleanup()
+
+        asyncio.run(main())
+        self.assertTrue(1 < in_flight[1] <= 4)
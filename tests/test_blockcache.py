@@ -0,0 +1,51 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from hiveengine.api import Api
+from hiveengine.blockcache import BlockCache
+
+
+class Testcases(unittest.TestCase):
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+
+    def test_block_cache(self):
+        db = os.path.join(self.path, "blocks.sqlite")
+        api = Api(block_cache=db)
+        requested = []
+
+        def request_send(endpoint, payload, url=None):
+            queries = json.loads(payload)
+            replies = []
+            for q in queries:
+                n = q["params"]["blockNumber"]
+                requested.append(n)
+                block = {"blockNumber": n, "transactions": [{"transactionId": "trx%d" % n, "contract": "tokens"}]}
+                replies.append({"jsonrpc": "2.0", "id": q["id"], "result": block if n < 20 else None})
+            return json.dumps(replies)
+
+        api.rpc.request_send = request_send
+        self.assertEqual(api.get_block_info(5)["blockNumber"], 5)
+        blocks = api.get_block_range(3, 8)
+        self.assertEqual([b["blockNumber"] for b in blocks], [3, 4, 5, 6, 7])
+        self.assertEqual(api.get_block_range(19, 21)[1], None)
+        self.assertEqual(requested, [5, 3, 4, 6, 7, 19, 20])
+        api.block_cache.close()
+
+        cache = BlockCache(db)
+        self.assertEqual(len(cache), 6)
+        self.assertEqual(cache.get_block_num("trx6"), 6)
+        trx = cache.get_transaction("trx6")
+        self.assertEqual(trx["blockNumber"], 6)
+        self.assertEqual(trx["contract"], "tokens")
+        self.assertEqual(cache.get_transaction("trx20"), None)
+        cache.close()
@@ -0,0 +1,49 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+import unittest
+from hiveengine.cache import ResponseCache
+
+
+class Testcases(unittest.TestCase):
+    def test_ttl(self):
+        cache = ResponseCache(ttl={"market/metrics": -1})
+        self.assertEqual(cache.get_ttl("tokens", "tokens"), 3600)
+        self.assertEqual(cache.get_ttl("nftmarket", "STARsellBook"), 2)
+        self.assertEqual(cache.get_ttl("tokens", "balances"), 0)
+        key = cache.get_key("find", "market", "metrics", {})
+        cache.set(key, [{"symbol": "BEE"}])
+        self.assertEqual(cache.get(key), (False, None))
+        key = cache.get_key("find", "tokens", "balances", {"account": "test"})
+        cache.set(key, [{"symbol": "BEE"}])
+        self.assertEqual(cache.get(key), (False, None))
+
+    def test_lru(self):
+        cache = ResponseCache(max_rows=3)
+        keys = [cache.get_key("find", "tokens", "tokens", {"symbol": s}) for s in ["A", "B", "C"]]
+        cache.set(keys[0], [1])
+        cache.set(keys[1], [2, 3])
+        self.assertEqual(cache.get(keys[0]), (True, [1]))
+        cache.set(keys[2], [4])
+        self.assertEqual(cache.get(keys[1]), (False, None))
+        self.assertEqual(cache.get(keys[0]), (True, [1]))
+        self.assertEqual(cache.rows, 2)
+        cache.invalidate("tokens", "tokens")
+        self.assertEqual(len(cache), 0)
+        self.assertEqual(cache.rows, 0)
+
+    def test_copy(self):
+        cache = ResponseCache()
+        key = cache.get_key("find", "nftmarket", "STARsellBook", {})
+        rows = [{"price": "1", "nfts": ["1"]}]
+        cache.set(key, rows)
+        rows[0]["price"] = "2"
+        found, result = cache.get(key)
+        result[0]["hive_price"] = 1
+        result[0]["nfts"].append("2")
+        self.assertEqual(cache.get(key), (True, [{"price": "1", "nfts": ["1"]}]))
+        key = cache.get_key("findOne", "tokens", "tokens", {"symbol": "BEE"})
+        cache.set(key, {"symbol": "BEE"})
+        cache.get(key)[1]["symbol"] = "X"
+        self.assertEqual(cache.get(key), (True, {"symbol": "BEE"}))
@@ -0,0 +1,77 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+import json
+import unittest
+from hiveengine.api import Api
+from hiveengine.collection import Collection
+from hiveengine.nfts import Nfts, set_shared_nfts_instance
+try:
+    from unittest import mock
+except ImportError:
+    import mock
+
+
+class Testcases(unittest.TestCase):
+    def setUp(self):
+        self.api = Api()
+        self.api.find_iter = lambda contract_name, table_name, query={}, **kwargs: iter(
+            [{"_id": i, "symbol": symbol} for i, symbol in enumerate(["STAR", "CITY", "DMT", "NFTM", "EMPTY"])])
+        set_shared_nfts_instance(Nfts(api=self.api))
+
+    def tearDown(self):
+        set_shared_nfts_instance(None)
+
+    def get_collection(self, request_send, **kwargs):
+        self.api.rpc.request_send = request_send
+        with mock.patch("hiveengine.collection.Account", return_value={"name": "test"}):
+            return Collection("test", api=self.api, blockchain_instance=object(), **kwargs)
+
+    def test_get_collection(self):
+        sent = []
+
+        def request_send(endpoint, payload, url=None):
+            queries = json.loads(payload)
+            sent.append([q["params"]["table"] for q in queries])
+            replies = []
+            for q in queries:
+                self.assertEqual(q["params"]["query"], {"account": "test"})
+                table = q["params"]["table"]
+                if table == "EMPTYinstances":
+                    result = []
+                elif table == "DMTinstances":
+                    result = None
+                else:
+                    result = [{"_id": 1, "account": "test", "table": table}]
+                replies.append({"jsonrpc": "2.0", "id": q["id"], "result": result})
+            return json.dumps(replies[::-1])
+
+        collection = self.get_collection(request_send)
+        self.assertEqual(len(sent), 1)
+        self.assertEqual(sorted(collection.keys()), ["CITY", "NFTM", "STAR"])
+        del sent[:]
+        collection = collection.get_collection(batch_size=2, workers=2)
+        self.assertEqual(sorted(sent), [["DMTinstances", "NFTMinstances"], ["EMPTYinstances"],
+                                        ["STARinstances", "CITYinstances"]])
+        self.assertEqual(sorted(collection.keys()), ["CITY", "NFTM", "STAR"])
+        for symbol in collection:
+            self.assertEqual(collection[symbol][0]["table"], "%sinstances" % symbol)
+
+    def test_get_collection_missing_reply(self):
+        find_all = []
+
+        def request_send(endpoint, payload, url=None):
+            queries = json.loads(payload)
+            return json.dumps([{"jsonrpc": "2.0", "id": q["id"], "result": [{"_id": 1}]}
+                               for q in queries if q["params"]["table"] != "CITYinstances"])
+
+        def fallback(contract_name, table_name, query={}, **kwargs):
+            find_all.append(table_name)
+            return [{"_id": 2}]
+
+        self.api.find_all = fallback
+        collection = self.get_collection(request_send, symbols=["STAR", "CITY"])
+        self.assertEqual(find_all, ["CITYinstances"])
+        self.assertEqual(collection["STAR"], [{"_id": 1}])
+        self.assertEqual(collection["CITY"], [{"_id": 2}])
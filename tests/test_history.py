@@ -0,0 +1,53 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+import unittest
+from hiveengine.api import Api
+from hiveengine.history import AccountHistory
+
+
+class Testcases(unittest.TestCase):
+    def test_account_history(self):
+        api = Api()
+        entries = {("a", "BEE"): [{"_id": "id%d" % i, "timestamp": i} for i in range(5)],
+                   ("b", "BEE"): [{"_id": "id%d" % i, "timestamp": i} for i in range(2)]}
+        calls = []
+
+        def get_history(account, symbol, limit=1000, offset=0):
+            calls.append((account, offset))
+            return entries[(account, symbol)][::-1][offset:offset + limit]
+
+        api.get_history = get_history
+        history = AccountHistory(api=api, page_size=2)
+        self.assertEqual([e["_id"] for e in history.iter_new("a", "BEE")], ["id0", "id1", "id2", "id3", "id4"])
+        self.assertEqual(calls, [("a", 0), ("a", 2), ("a", 4)])
+        self.assertEqual(list(history.iter_new("a", "BEE")), [])
+        entries[("a", "BEE")].append({"_id": "id5", "timestamp": 5})
+        result = [(account, e["_id"]) for account, symbol, e in history.poll([("a", "BEE"), ("b", "BEE")])]
+        self.assertEqual(result, [("a", "id5"), ("b", "id0"), ("b", "id1")])
+        self.assertEqual(history.cursors.get("b", "BEE"), ("id1", 1))
+        self.assertEqual(len(list(history.iter_all("a", "BEE"))), 6)
+
+    def test_get_history_retry(self):
+        api = Api(backoff=0)
+
+        class Response(object):
+            def __init__(self, status_code):
+                self.status_code = status_code
+
+            def json(self):
+                return [{"_id": "id0"}]
+
+        responses = [Response(503), Response(200)]
+        requests = []
+
+        class Session(object):
+            def get(self, url, params=None, timeout=None):
+                requests.append(params)
+                return responses.pop(0)
+
+        api.rpc.session = Session()
+        self.assertEqual(api.get_history("a", "BEE", limit=10), [{"_id": "id0"}])
+        self.assertEqual(len(requests), 2)
+        self.assertEqual(requests[0], {"account": "a", "limit": 10, "offset": 0, "symbol": "BEE"})
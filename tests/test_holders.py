@@ -0,0 +1,67 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+import unittest
+from hiveengine.api import Api
+from hiveengine import holders as holders_module
+from hiveengine.holders import Holders
+try:
+    from unittest import mock
+except ImportError:
+    import mock
+
+
+class Testcases(unittest.TestCase):
+    def test_holders(self):
+        self._test_holders()
+
+    def test_holders_without_numpy(self):
+        with mock.patch.object(holders_module, "np", None):
+            self._test_holders()
+
+    def test_holders_precision(self):
+        with mock.patch.object(holders_module, "np", None):
+            self._test_holders_precision()
+        self._test_holders_precision()
+
+    def _test_holders_precision(self):
+        api = Api()
+        rows = [{"account": "a", "balance": "0.1"}, {"account": "b", "balance": "0.2"},
+                {"account": "c", "balance": "92233720368.5"}, {"account": "d", "balance": "92233720368.5"}]
+        api.find_iter = lambda contract_name, table_name, query={}, **kwargs: iter(rows)
+        api.find_one = lambda contract_name, table_name, query={}: [{"symbol": "BEE", "precision": 8}]
+        holders = Holders("BEE", api=api)
+        self.assertEqual(holders.precision, 8)
+        self.assertEqual(list(holders["balance"][:2]), [10000000, 20000000])
+        # exact, the sum does not fit into int64
+        self.assertEqual(str(holders.total("balance")), "184467440737.30000000")
+        self.assertEqual(holders.top(1, "balance")[0][1], 92233720368.5)
+        self.assertAlmostEqual(holders.percentiles((0, 100), "balance")[0], 0.1)
+        self.assertEqual(str(holders.hive_value("balance", last_price="0.5")), "92233720368.65000000")
+
+    def _test_holders(self):
+        api = Api()
+        rows = [{"account": "a", "balance": "10", "stake": "5", "delegationsOut": "5"},
+                {"account": "b", "balance": "30", "stake": "0"},
+                {"account": "c", "balance": "0", "stake": "0"},
+                {"account": "d", "balance": "40", "stake": "0"}]
+
+        def find_iter(contract_name, table_name, query={}, **kwargs):
+            self.assertEqual(query, {"symbol": "BEE"})
+            return iter(rows)
+
+        api.find_iter = find_iter
+        holders = Holders("bee", api=api, precision=8)
+        self.assertEqual(len(holders), 4)
+        self.assertEqual(holders.total("balance"), 80)
+        self.assertEqual(holders.total(), 90)
+        self.assertEqual(holders.top(2, "balance"), [("d", 40), ("b", 30)])
+        self.assertEqual(holders.top(1), [("d", 40)])
+        self.assertEqual(holders.percentiles((0, 50, 100), "balance"), {0: 0, 50: 20, 100: 40})
+        self.assertAlmostEqual(holders.gini("balance"), 0.4375)
+        self.assertAlmostEqual(holders.concentration(2, "balance"), 70 / 80.)
+        self.assertEqual(holders.hive_value("balance", last_price=0.5), 40)
+        self.assertEqual(holders.top(10, "stake"), [("a", 5), ("b", 0), ("c", 0), ("d", 0)])
+        self.assertEqual(holders.top(0), [])
+        self.assertAlmostEqual(holders.concentration(10), 1.)
@@ -0,0 +1,36 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+import unittest
+from hiveengine import jsoncodec
+from hiveengine.jsoncodec import JsonCodec, get_codec
+from hiveengine.rpc import RPC
+
+
+class Testcases(unittest.TestCase):
+    def test_codecs(self):
+        names = ["json"]
+        if jsoncodec.orjson is not None:
+            names.append("orjson")
+        if jsoncodec.ujson is not None:
+            names.append("ujson")
+        data = [{"method": "find", "params": {"query": {"symbol": "BEE"}, "memo": "ä"}, "id": 1}]
+        for name in names:
+            codec = get_codec(name)
+            self.assertEqual(codec.name, name)
+            encoded = codec.dumps(data)
+            self.assertTrue(isinstance(encoded, bytes))
+            self.assertEqual(codec.loads(encoded), data)
+            self.assertEqual(codec.loads(encoded.decode("utf8")), data)
+            self.assertEqual(codec.loads(b'{"memo": "a\tb"}'), {"memo": "a\tb"})
+            self.assertRaises(ValueError, codec.loads, b"Bad Gateway")
+
+    def test_get_codec(self):
+        codec = JsonCodec()
+        self.assertIs(get_codec(codec), codec)
+        self.assertRaises(ValueError, get_codec, "unknown")
+        rpc = RPC(json_codec="json")
+        self.assertEqual(rpc.codec.name, "json")
+        self.assertEqual(rpc._build_query("find", ({"limit": 1}, ))["params"], {"limit": 1})
+        self.assertEqual(rpc._build_query("getStatus", ())["params"], [])
@@ -0,0 +1,59 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+import unittest
+from hiveengine.amount import Amount
+from hiveengine.api import Api
+from hiveengine.market import Market
+try:
+    from unittest import mock
+except ImportError:
+    import mock
+
+
+class Blockchain(object):
+    is_hive = True
+
+    def __init__(self):
+        self.broadcasts = []
+
+    def custom_json(self, ssc_id, json_data, required_auths=[], required_posting_auths=[]):
+        self.broadcasts.append(json_data)
+        return {"trx_id": "trx%d" % len(self.broadcasts)}
+
+
+class Testcases(unittest.TestCase):
+    def get_market(self):
+        api = Api()
+        tokens = {"BEE": {"_id": 1, "symbol": "BEE", "precision": 8},
+                  "SWAP.HIVE": {"_id": 2, "symbol": "SWAP.HIVE", "precision": 8}}
+        api.find_iter = lambda contract_name, table_name, query={}, **kwargs: iter(list(tokens.values()))
+        api.find_one = lambda contract_name, table_name, query={}: [tokens[query["symbol"]]]
+
+        def find(contract_name, table_name, query={}, **kwargs):
+            if table_name == "balances":
+                return [{"symbol": "BEE", "balance": "10.00000000"},
+                        {"symbol": "SWAP.HIVE", "balance": "1.00000000"}]
+            return []
+
+        api.find = find
+        return Market(api=api, blockchain_instance=Blockchain())
+
+    def test_buy_sell_payload(self):
+        market = self.get_market()
+        with mock.patch("hiveengine.wallet.Account", return_value={"name": "test"}):
+            market.sell("test", 1.1, "BEE", 0.3)
+            market.buy("test", "2", "bee", "0.1234567891")
+        # amounts and prices are sent with their fixed precision
+        self.assertEqual(market.blockchain.broadcasts[0]["contractPayload"],
+                         {"symbol": "BEE", "quantity": "1.10000000", "price": "0.30000000"})
+        self.assertEqual(market.blockchain.broadcasts[1]["contractPayload"],
+                         {"symbol": "BEE", "quantity": "2.00000000", "price": "0.12345678"})
+
+    def test_get_sell_price(self):
+        from hiveengine.cli import get_sell_price
+        self.assertEqual(str(get_sell_price({"highestBid": "0", "lastPrice": "0.1"})), "0.10000000")
+        price = get_sell_price({"highestBid": "0.3", "lastPrice": "0.1"})
+        self.assertEqual(str(price), "0.30000000")
+        self.assertEqual(str(Amount("3", 8).value_at(price)), "0.90000000")
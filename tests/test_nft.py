@@ -0,0 +1,53 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+import json
+import unittest
+from hiveengine.api import Api
+from hiveengine.nft import Nft
+
+
+class Testcases(unittest.TestCase):
+    def get_nft(self):
+        api = Api()
+        self.instances = [{"_id": 1, "account": "a", "properties": {"type": "Car", "rarity": "Rare"}},
+                          {"_id": 2, "account": "b", "properties": {"type": "car", "rarity": "rare"}},
+                          {"_id": 3, "account": "null", "properties": {"type": "car", "rarity": "rare"}},
+                          {"_id": 4, "account": "c", "properties": {"type": "bike"}}]
+        return Nft({"symbol": "TEST", "groupBy": ["type", "rarity"]}, api=api, blockchain_instance=object())
+
+    def test_census(self):
+        nft = self.get_nft()
+        queries = []
+
+        def find_iter(contract_name, table_name, query={}, **kwargs):
+            self.assertEqual(table_name, "TESTinstances")
+            queries.append(query)
+            return iter([i for i in self.instances if "account" not in query or i["account"] != "null"])
+
+        nft.api.find_iter = find_iter
+        census = nft.census()
+        self.assertEqual(dict(census), {("car", "rare"): 2, ("bike", None): 1})
+        self.assertEqual(queries, [{"account": {"$ne": "null"}}])
+        census = nft.census(group_by=["type"], include_burned=True)
+        self.assertEqual(dict(census), {("car", ): 3, ("bike", ): 1})
+
+    def test_get_ids(self):
+        nft = self.get_nft()
+        sent = []
+
+        def request_send(endpoint, payload, url=None):
+            queries = json.loads(payload)
+            sent.append(len(queries))
+            replies = []
+            for q in queries:
+                ids = q["params"]["query"]["_id"]["$in"]
+                replies.append({"jsonrpc": "2.0", "id": q["id"],
+                                "result": [i for i in self.instances if i["_id"] in ids]})
+            return json.dumps(replies)
+
+        nft.api.rpc.request_send = request_send
+        tokens = nft.get_ids(["4", 2, 5, 1], chunk_size=2)
+        self.assertEqual([t["_id"] for t in tokens], [4, 2, 1])
+        self.assertEqual(sent, [2])
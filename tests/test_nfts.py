@@ -0,0 +1,62 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+import json
+import unittest
+from click.testing import CliRunner
+from hiveengine.api import Api
+from hiveengine.cli import cli
+from hiveengine.collection import Collection
+from hiveengine.nfts import Nfts, shared_nfts_instance, set_shared_nfts_instance
+try:
+    from unittest import mock
+except ImportError:
+    import mock
+
+
+class Testcases(unittest.TestCase):
+    def tearDown(self):
+        set_shared_nfts_instance(None)
+
+    def test_shared_nfts_instance(self):
+        api = Api()
+        calls = []
+
+        def find_iter(contract_name, table_name, query={}, **kwargs):
+            calls.append(table_name)
+            return iter([{"_id": 1, "symbol": "STAR"}, {"_id": 2, "symbol": "CITY"}])
+
+        api.find_iter = find_iter
+        nfts = shared_nfts_instance(api=api)
+        self.assertEqual(nfts.get_symbol_list(), ["STAR", "CITY"])
+        self.assertTrue(shared_nfts_instance() is nfts)
+        self.assertTrue(shared_nfts_instance(api=api) is nfts)
+        self.assertEqual(calls, ["nfts"])
+        self.assertEqual(nfts.get_nft("missing"), None)
+
+    def test_collection_reuses_shared_nfts(self):
+        api = Api()
+        calls = []
+
+        def find_iter(contract_name, table_name, query={}, **kwargs):
+            calls.append(table_name)
+            return iter([{"_id": 1, "symbol": "STAR"}, {"_id": 2, "symbol": "CITY"}])
+
+        def request_send(endpoint, payload, url=None):
+            queries = json.loads(payload)
+            return json.dumps([{"jsonrpc": "2.0", "id": q["id"], "result": []} for q in queries])
+
+        api.find_iter = find_iter
+        api.rpc.request_send = request_send
+        set_shared_nfts_instance(Nfts(api=api))
+        with mock.patch("hiveengine.collection.Account", return_value={"name": "test"}), \
+                mock.patch("hiveengine.collection.shared_blockchain_instance"), \
+                mock.patch("hiveengine.cli.Hive"):
+            collection = Collection("test")
+            self.assertTrue(collection.api is api)
+            result = CliRunner().invoke(cli, ["collection", "test"])
+        self.assertEqual(result.exit_code, 0)
+        self.assertEqual(calls, ["nfts"])
+        # another Api object for the same nodes uses the shared instance
+        self.assertTrue(shared_nfts_instance(api=Api()).api is api)
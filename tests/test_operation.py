@@ -0,0 +1,32 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+import json
+import unittest
+from hiveengine.operation import Operation, filter_operations
+
+
+class Testcases(unittest.TestCase):
+    def test_filter_operations(self):
+        block = {"blockNumber": 5, "refHiveBlockNumber": 45000000, "timestamp": "2020-07-01T00:00:00", "transactions": [
+            {"transactionId": "a", "sender": "alice", "contract": "market", "action": "buy",
+             "payload": json.dumps({"symbol": "BEE", "quantity": "1", "price": "0.5"}),
+             "logs": json.dumps({"events": [{"event": "transferToContract"}]})},
+            {"transactionId": "b", "sender": "bob", "contract": "market", "action": "sell",
+             "payload": json.dumps({"symbol": "LEO", "quantity": "1", "price": "0.5"}), "logs": "{}"},
+            {"transactionId": "c", "sender": "bob", "contract": "tokens", "action": "transfer",
+             "payload": json.dumps({"symbol": "BEE", "to": "alice", "quantity": "1"}), "logs": "{}"},
+            {"transactionId": "d", "sender": "bob", "contract": "market", "action": "cancel",
+             "payload": "no json", "logs": ""}]}
+        ops = list(filter_operations(block, contracts=set(["market"]), symbols=["bee"]))
+        self.assertEqual([op.trx_id for op in ops], ["a"])
+        self.assertTrue(isinstance(ops[0], Operation))
+        self.assertEqual(ops[0].block_num, 5)
+        self.assertEqual(ops[0].ref_block_num, 45000000)
+        self.assertEqual(Operation(block["transactions"][0], {"blockNumber": 1, "refSteemBlockNumber": 7}).ref_block_num, 7)
+        self.assertEqual(ops[0].payload["price"], "0.5")
+        self.assertEqual(ops[0].events[0]["event"], "transferToContract")
+        ops = list(filter_operations(block, contracts=set(["market"]), actions=set(["cancel"])))
+        self.assertEqual(ops[0].payload, {})
+        self.assertEqual(ops[0].errors, [])
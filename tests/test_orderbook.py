@@ -0,0 +1,109 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+import json
+import unittest
+from hiveengine.api import Api
+from hiveengine.orderbook import OrderBook
+
+
+class Testcases(unittest.TestCase):
+    def get_book(self):
+        api = Api()
+        books = {"buyBook": [{"txId": "b1", "account": "a", "quantity": "10", "price": "0.5"},
+                             {"txId": "b2", "account": "b", "quantity": "5", "price": "0.6"},
+                             {"txId": "b3", "account": "c", "quantity": "5", "price": "0.5"}],
+                 "sellBook": [{"txId": "s1", "account": "d", "quantity": "4", "price": "0.7"},
+                              {"txId": "s2", "account": "e", "quantity": "6", "price": "0.8"}]}
+
+        def find_iter(contract_name, table_name, query={}, **kwargs):
+            self.assertEqual(query, {"symbol": "BEE"})
+            return iter(books[table_name])
+
+        api.find_iter = find_iter
+        api.get_latest_block_info = lambda: {"blockNumber": 100}
+        return OrderBook("bee", api=api, precision=3)
+
+    def test_refresh_new_block(self):
+        book = self.get_book()
+        heads = [100, 101, 101, 101]
+        book.api.get_latest_block_info = lambda: {"blockNumber": heads.pop(0)}
+        book.refresh()
+        # a block was produced during the first load, the book was loaded again
+        self.assertEqual(heads, [])
+        self.assertEqual(book.block_num, 101)
+        self.assertEqual(len(book), 5)
+
+    def test_stream_without_refresh(self):
+        api = Api()
+        book = OrderBook("bee", api=api, precision=3, refresh=False)
+        self.assertRaises(ValueError, next, book.stream())
+
+    def get_block(self, action, payload, events=[], errors=None, sender="x"):
+        logs = {"events": events}
+        if errors is not None:
+            logs["errors"] = errors
+        trx = {"transactionId": "t%d" % len(payload), "sender": sender, "contract": "market", "action": action,
+               "payload": json.dumps(payload), "logs": json.dumps(logs)}
+        return {"blockNumber": 101, "timestamp": "2020-01-01T00:00:00", "transactions": [trx]}
+
+    def test_orderbook(self):
+        book = self.get_book()
+        self.assertEqual(len(book), 5)
+        self.assertEqual(book.block_num, 100)
+        self.assertEqual(str(book.best_bid()), "0.60000000")
+        self.assertEqual(str(book.best_ask()), "0.70000000")
+        self.assertEqual(str(book.spread()), "0.10000000")
+        self.assertEqual([(str(p), str(q)) for p, q in book.bids()],
+                         [("0.60000000", "5.000"), ("0.50000000", "15.000")])
+        self.assertEqual([o["txId"] for o in book.get_orders("buy")], ["b2", "b1", "b3"])
+
+    def test_apply_operation(self):
+        book = self.get_book()
+        # sell 12 at 0.5: fills b2 (5) and 7 of b1
+        block = self.get_block("sell", {"symbol": "BEE", "quantity": "12", "price": "0.5"},
+                               events=[{"contract": "market", "event": "orderClosed", "data": {"txId": "b2"}}])
+        self.assertEqual(len(book.apply_block(block)), 1)
+        self.assertEqual(book.block_num, 101)
+        self.assertNotIn("b2", book)
+        self.assertEqual(str(book.get_order("b1")["quantity"]), "3.000")
+        # buy at 0.75 rests after filling s1
+        block = self.get_block("buy", {"symbol": "BEE", "quantity": "5", "price": "0.75"})
+        book.apply_block(block)
+        self.assertNotIn("s1", book)
+        self.assertEqual(str(book.best_bid()), "0.75000000")
+        self.assertEqual(str(book.get_order(block["transactions"][0]["transactionId"])["quantity"]), "1.000")
+        # market buy for 2.4 SWAP.HIVE buys 3 at 0.8
+        book.apply_block(self.get_block("marketBuy", {"symbol": "BEE", "quantity": "2.4"}))
+        self.assertEqual(str(book.get_order("s2")["quantity"]), "3.000")
+        # cancel and skipped operations
+        book.apply_block(self.get_block("cancel", {"type": "buy", "id": "b3"}))
+        self.assertNotIn("b3", book)
+        block = self.get_block("marketSell", {"symbol": "BEE", "quantity": "100"}, errors=["error"])
+        self.assertEqual(book.apply_block(block), [])
+        block = self.get_block("marketSell", {"symbol": "OTHER", "quantity": "100"})
+        self.assertEqual(book.apply_block(block), [])
+        book.apply_block(self.get_block("marketSell", {"symbol": "BEE", "quantity": "100"}))
+        self.assertEqual(book.bids(), [])
+        # market orders without a matching order and orders below the precision do not change the book
+        self.assertEqual(book.apply_block(self.get_block("marketSell", {"symbol": "BEE", "quantity": "1"})), [])
+        self.assertEqual(book.apply_block(self.get_block("marketBuy", {"symbol": "BEE", "quantity": "0.0001"})), [])
+        block = self.get_block("sell", {"symbol": "BEE", "quantity": "0.0001", "price": "0.5"})
+        self.assertEqual(book.apply_block(block), [])
+        self.assertEqual(len(book.apply_block(self.get_block("marketBuy", {"symbol": "BEE", "quantity": "1"}))), 1)
+
+    def test_quote(self):
+        book = self.get_book()
+        quote = book.quote("sell", 12)
+        self.assertEqual(str(quote["filled"]), "12.000")
+        self.assertEqual(str(quote["cost"]), "6.50000000")
+        self.assertEqual(str(quote["avg_price"]), "0.54166666")
+        self.assertEqual(str(quote["worst_price"]), "0.50000000")
+        self.assertEqual(quote["levels"], 2)
+        self.assertAlmostEqual(quote["slippage"], 1 - 0.54166666 / 0.6)
+        quote = book.quote("buy", 20, price="0.7")
+        self.assertEqual(str(quote["filled"]), "4.000")
+        self.assertEqual(str(quote["remaining"]), "16.000")
+        self.assertEqual(quote["slippage"], 0)
+        self.assertEqual(len(book), 5)
@@ -0,0 +1,141 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+import asyncio
+import json
+import threading
+import time
+import unittest
+from email.utils import formatdate
+from hiveengine.rpc import RPC, RateLimitError
+from hiveengine.ratelimit import RateLimiter, parse_retry_after, PRIORITY_HIGH, PRIORITY_LOW
+try:
+    from hiveengine.asyncrpc import AsyncRPC, AIOHTTP_AVAILABLE
+except ImportError:
+    AIOHTTP_AVAILABLE = False
+
+
+class Testcases(unittest.TestCase):
+    def test_parse_retry_after(self):
+        self.assertEqual(parse_retry_after(None), None)
+        self.assertEqual(parse_retry_after("3"), 3)
+        self.assertEqual(parse_retry_after("-1"), 0)
+        self.assertEqual(parse_retry_after("soon"), None)
+        seconds = parse_retry_after(formatdate(time.time() + 60, usegmt=True))
+        self.assertTrue(55 < seconds <= 60)
+
+    def test_token_bucket(self):
+        limiter = RateLimiter(rate=20, burst=2)
+        start = time.time()
+        for i in range(4):
+            self.assertTrue(limiter.acquire())
+        # two tokens of the burst, two refilled tokens
+        self.assertTrue(time.time() - start >= 0.09)
+        self.assertFalse(limiter.acquire(timeout=0.01))
+        self.assertEqual(len(limiter), 0)
+
+    def test_priority(self):
+        limiter = RateLimiter(rate=20, burst=1)
+        limiter.acquire()
+        order = []
+
+        def request(name, priority):
+            limiter.acquire(priority)
+            order.append(name)
+
+        threads = [threading.Thread(target=request, args=("low", PRIORITY_LOW))]
+        threads[0].start()
+        while len(limiter) < 1:
+            time.sleep(0.001)
+        threads.append(threading.Thread(target=request, args=("high", PRIORITY_HIGH)))
+        threads[1].start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(order, ["high", "low"])
+
+    def test_aimd(self):
+        limiter = RateLimiter(rate=10, min_rate=2, increase=1, decrease=0.5)
+        limiter.throttle()
+        self.assertEqual(limiter.rate, 5)
+        self.assertTrue(limiter.tokens <= 0)
+        limiter.throttle()
+        limiter.throttle()
+        self.assertEqual(limiter.rate, 2)
+        for i in range(20):
+            limiter.success()
+        self.assertEqual(limiter.rate, 10)
+        limiter.throttle(retry_after=0.05)
+        start = time.time()
+        limiter.acquire()
+        self.assertTrue(time.time() - start >= 0.04)
+
+    def test_rpc_rate_limit(self):
+        limiter = RateLimiter(rate=100)
+        rpc = RPC(["http://node1", "http://node2/"], backoff=0, rate_limiter=limiter)
+        sent = []
+
+        def request_send(endpoint, payload, url=None):
+            sent.append(url)
+            if url == "http://node1/":
+                raise RateLimitError("Too Many Requests", 30)
+            query = json.loads(payload)[0]
+            return json.dumps([{"jsonrpc": "2.0", "id": query["id"], "result": {"blockNumber": 10}}])
+
+        rpc.request_send = request_send
+        result = rpc.getLatestBlockInfo(endpoint="blockchain", priority=PRIORITY_HIGH)
+        self.assertEqual(result, [{"blockNumber": 10}])
+        self.assertEqual(sent, ["http://node1/", "http://node2/"])
+        self.assertTrue(rpc.nodes[0].blocked_until > time.time() + 25)
+        self.assertEqual(limiter.blocked_until, 0)
+        self.assertEqual(rpc.nodes.get_blocked_time(), 0)
+        self.assertAlmostEqual(limiter.rate, 50.1)
+
+    def test_rpc_rate_limit_single_node(self):
+        limiter = RateLimiter(rate=100)
+        rpc = RPC("http://node1", backoff=0, num_retries_call=0, rate_limiter=limiter)
+
+        def request_send(endpoint, payload, url=None):
+            raise RateLimitError("Too Many Requests", 30)
+
+        rpc.request_send = request_send
+        self.assertRaises(RateLimitError, rpc.getLatestBlockInfo, endpoint="blockchain")
+        self.assertTrue(limiter.blocked_until > time.time() + 25)
+        self.assertEqual(limiter.rate, 50)
+
+    def test_acquire_async(self):
+        limiter = RateLimiter(rate=20, burst=1)
+        limiter.acquire()
+        order = []
+
+        async def request(name, priority):
+            await limiter.acquire_async(priority)
+            order.append(name)
+
+        async def main():
+            low = asyncio.ensure_future(request("low", PRIORITY_LOW))
+            await asyncio.sleep(0)
+            await asyncio.gather(low, request("high", PRIORITY_HIGH))
+
+        asyncio.run(main())
+        self.assertEqual(order, ["high", "low"])
+        self.assertEqual(len(limiter), 0)
+
+    @unittest.skipIf(not AIOHTTP_AVAILABLE, "aiohttp is not installed")
+    def test_async_rpc_rate_limit(self):
+        limiter = RateLimiter(rate=100)
+        rpc = AsyncRPC(["http://node1", "http://node2/"], backoff=0, rate_limiter=limiter)
+        sent = []
+
+        async def request_send(endpoint, payload, url=None):
+            sent.append(url)
+            if url == "http://node1/":
+                raise RateLimitError("Too Many Requests", 30)
+            query = json.loads(payload)[0]
+            return json.dumps([{"jsonrpc": "2.0", "id": query["id"], "result": {"blockNumber": 10}}])
+
+        rpc.request_send = request_send
+        result = asyncio.run(rpc.getLatestBlockInfo(endpoint="blockchain", priority=PRIORITY_HIGH))
+        self.assertEqual(result, [{"blockNumber": 10}])
+        self.assertEqual(sent, ["http://node1/", "http://node2/"])
+        self.assertAlmostEqual(limiter.rate, 50.1)
@@ -4,8 +4,9 @@ from __future__ import print_function
 from __future__ import unicode_literals
 from builtins import range
 from builtins import super
+import json
 import unittest
-from hiveengine.rpc import RPC
+from hiveengine.rpc import RPC, RPCErrorDoRetry
 
 
 class Testcases(unittest.TestCase):
@@ -18,3 +19,66 @@ class Testcases(unittest.TestCase):
         rpc = RPC()
         result = rpc.getContract({"name": "token"}, endpoint="contracts")
         self.assertTrue(len(result) > 0)
+
+    def test_rpc_batch(self):
+        rpc = RPC(max_batch_size=2)
+        sent = []
+
+        def request_send(endpoint, payload, url=None):
+            queries = json.loads(payload)
+            sent.append((endpoint, len(queries)))
+            replies = [{"jsonrpc": "2.0", "id": q["id"], "result": q["params"]} for q in queries]
+            return json.dumps(replies[::-1])
+
+        rpc.request_send = request_send
+        with rpc.batch() as b:
+            results = [b.find({"offset": i}, endpoint="contracts") for i in range(3)]
+            block = b.getBlockInfo({"blockNumber": 1}, endpoint="blockchain")
+        self.assertEqual(sent, [("contracts", 2), ("contracts", 1), ("blockchain", 1)])
+        self.assertEqual([r.result()["offset"] for r in results], [0, 1, 2])
+        self.assertEqual(block.result(), {"blockNumber": 1})
+        self.assertEqual(b.results[-1], block)
+
+    def test_rpc_batch_copies_params(self):
+        rpc = RPC()
+        sent = []
+
+        def request_send(endpoint, payload, url=None):
+            queries = json.loads(payload)
+            sent.extend([q["params"] for q in queries])
+            return json.dumps([{"jsonrpc": "2.0", "id": q["id"], "result": []} for q in queries])
+
+        rpc.request_send = request_send
+        params = {"contract": "tokens", "table": "balances", "query": {"symbol": "BEE"}, "offset": 0}
+        with rpc.batch() as b:
+            for offset in range(2):
+                params["offset"] = offset
+                params["query"]["symbol"] = "BEE%d" % offset
+                b.find(params, endpoint="contracts")
+            params["offset"] = 5
+            params["query"]["symbol"] = "X"
+        self.assertEqual([(p["offset"], p["query"]["symbol"]) for p in sent], [(0, "BEE0"), (1, "BEE1")])
+
+    def test_retry_backoff(self):
+        nodes = RPC("http://node1").nodes
+        sleeptimes = [nodes.get_retry_sleeptime(cnt) for cnt in range(1, 7)]
+        self.assertEqual(sleeptimes, [1, 2, 4, 4, 4, None])
+
+    def test_rpc_failover(self):
+        rpc = RPC(["http://node1", "http://node2/"], backoff=0)
+        sent = []
+
+        def request_send(endpoint, payload, url=None):
+            sent.append(url)
+            if url == "http://node1/":
+                raise RPCErrorDoRetry("Too Many Requests")
+            query = json.loads(payload)[0]
+            return json.dumps([{"jsonrpc": "2.0", "id": query["id"], "result": {"blockNumber": 10}}])
+
+        rpc.request_send = request_send
+        result = rpc.getLatestBlockInfo(endpoint="blockchain")
+        self.assertEqual(result, [{"blockNumber": 10}])
+        self.assertEqual(sent, ["http://node1/", "http://node2/"])
+        self.assertEqual(rpc.nodes.get_node().url, "http://node2/")
+        self.assertEqual(rpc.nodes[1].head_block, 10)
+        self.assertEqual(rpc.nodes[0].error_cnt, 1)
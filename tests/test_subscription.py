@@ -0,0 +1,69 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+import json
+import unittest
+from hiveengine.api import Api
+from hiveengine.subscription import TransferSubscription
+
+
+class Testcases(unittest.TestCase):
+    def get_block(self, block_num, transfers):
+        transactions = []
+        for i, (sender, to, symbol, quantity, memo, errors) in enumerate(transfers):
+            payload = {"symbol": symbol, "to": to, "quantity": quantity, "memo": memo}
+            logs = {"errors": ["error"]} if errors else {}
+            transactions.append({"transactionId": "%d-%d" % (block_num, i), "sender": sender, "contract": "tokens",
+                                 "action": "transfer", "payload": json.dumps(payload), "logs": json.dumps(logs)})
+        return {"blockNumber": block_num, "transactions": transactions}
+
+    def test_subscription(self):
+        api = Api()
+        blocks = [self.get_block(10, [("a", "bot", "BEE", "1", "https://x", False),
+                                      ("a", "bot", "BEE", "0.5", "https://x", False),
+                                      ("a", "bot", "BEE", "2", "nothing", False),
+                                      ("a", "bot", "BEE", "2", "https://x", True),
+                                      ("a", "other", "BEE", "2", "https://x", False)]),
+                  self.get_block(11, [("b", "bot", "bee", "1", "https://y", False)])]
+        starts = []
+
+        def stream_blocks(start, stop=None, **kwargs):
+            starts.append(start)
+            return iter([block for block in blocks if block["blockNumber"] >= start])
+
+        api.stream_blocks = stream_blocks
+        api.get_latest_block_info = lambda: {"blockNumber": 10}
+        subscription = TransferSubscription(api=api)
+        received = []
+        all_transfers = []
+        subscription.subscribe(lambda op: received.append(op.trx_id), to="bot", symbols="bee",
+                               min_quantity="1", memo=r"^https://")
+        subscription.subscribe(lambda op: all_transfers.append(op.trx_id), senders=["a"])
+        subscription.run(stop=11)
+        self.assertEqual(received, ["10-0"])
+        self.assertEqual(all_transfers, ["10-0", "10-1", "10-2", "10-4"])
+        self.assertEqual(subscription.block_num, 11)
+        self.assertTrue(subscription.is_processed("10-1"))
+        self.assertFalse(subscription.is_processed("10-3"))
+        subscription.process_block(blocks[0])
+        self.assertEqual(received, ["10-0"])
+        subscription.run(stop=11)
+        self.assertEqual(starts, [10, 12])
+
+    def test_callback_error(self):
+        subscription = TransferSubscription(api=Api())
+        received = []
+
+        def callback(op):
+            raise ValueError("failed")
+
+        subscription.subscribe(callback, to="bot")
+        subscription.subscribe(lambda op: received.append(op.trx_id), to="bot")
+        block = self.get_block(10, [("a", "bot", "BEE", "1", "@a/b", False),
+                                    ("a", "bot", "BEE", "1", "@a/c", False)])
+        with self.assertLogs("hiveengine.subscription", level="ERROR"):
+            self.assertEqual(subscription.process_block(block), 2)
+        self.assertEqual(received, ["10-0", "10-1"])
+        self.assertTrue(subscription.is_processed("10-1"))
+        self.assertEqual(subscription.block_num, 10)
@@ -3,6 +3,7 @@ from __future__ import division
 from __future__ import print_function
 from __future__ import unicode_literals
 import unittest
+from hiveengine.api import Api
 from hiveengine.tokens import Tokens
 
 
@@ -11,3 +12,27 @@ class Testcases(unittest.TestCase):
         tokens = Tokens()
         self.assertTrue(tokens is not None)
         self.assertTrue(len(tokens) > 0)
+
+    def test_tokens_refresh(self):
+        api = Api()
+        rows = [{"_id": i, "symbol": "TOKEN%d" % i} for i in range(1, 1201)]
+        queries = []
+
+        def find_iter(contract_name, table_name, query={}, keyset=False, **kwargs):
+            queries.append(query)
+            last_id = query.get("_id", {"$gt": 0})["$gt"]
+            return iter([row for row in rows if row["_id"] > last_id])
+
+        api.find_iter = find_iter
+        tokens = Tokens(api=api)
+        self.assertEqual(len(tokens), 1200)
+        self.assertEqual(tokens.get_token("token1100")["_id"], 1100)
+        self.assertEqual(tokens.get_token("MISSING"), None)
+        rows.append({"_id": 1201, "symbol": "NEW"})
+        tokens.refresh()
+        self.assertEqual(queries[-1], {"_id": {"$gt": 1200}})
+        self.assertEqual(len(tokens), 1201)
+        self.assertEqual(tokens.get_token("new").symbol, "NEW")
+        tokens.refresh(full=True)
+        self.assertEqual(queries[-1], {})
+        self.assertEqual(len(tokens), 1201)
@@ -0,0 +1,56 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+import unittest
+from hiveengine.api import Api
+from hiveengine import trades
+from hiveengine.trades import TradeStore
+
+
+class Testcases(unittest.TestCase):
+    def get_store(self):
+        api = Api()
+        self.rows = [{"_id": 1, "symbol": "BEE", "quantity": "10", "price": "0.5", "timestamp": 3600},
+                     {"_id": 2, "symbol": "BEE", "quantity": "5", "price": "0.7", "timestamp": 3700},
+                     {"_id": 3, "symbol": "BEE", "quantity": "1", "price": "0.4", "timestamp": 5000},
+                     {"_id": 4, "symbol": "BEE", "quantity": "2", "price": "0.6", "timestamp": 7300}]
+        self.queries = []
+
+        def find_iter(contract_name, table_name, query={}, **kwargs):
+            self.assertEqual((contract_name, table_name), ("market", "tradesHistory"))
+            self.queries.append(query)
+            last_id = query.get("_id", {}).get("$gt", 0)
+            return iter([row for row in self.rows if row["_id"] > last_id])
+
+        api.find_iter = find_iter
+        return TradeStore(api=api)
+
+    def test_sync(self):
+        store = self.get_store()
+        self.assertEqual(store.sync("bee"), 4)
+        self.assertEqual(store.sync("bee"), 0)
+        self.assertEqual(self.queries, [{"symbol": "BEE"}, {"symbol": "BEE", "_id": {"$gt": 4}}])
+        self.assertEqual(len(store), 4)
+        self.assertEqual([t["_id"] for t in store.get_trades("BEE", start=3700, stop=7300)], [2, 3])
+        count, quantity, volume = store.volume("BEE")
+        self.assertEqual((count, quantity), (4, 18))
+        self.assertAlmostEqual(volume, 10.1)
+
+    def test_ohlcv(self):
+        store = self.get_store()
+        store.sync("BEE")
+        expected = [{"timestamp": 3600, "open": 0.5, "high": 0.7, "low": 0.4, "close": 0.4,
+                     "quantity": 16, "volume": 8.9, "trades": 3},
+                    {"timestamp": 7200, "open": 0.6, "high": 0.6, "low": 0.6, "close": 0.6,
+                     "quantity": 2, "volume": 1.2, "trades": 1}]
+        np = trades.np
+        try:
+            for trades.np in set([np, None]):
+                candles = store.ohlcv("BEE", interval=3600)
+                self.assertEqual(len(candles), 2)
+                for candle, expected_candle in zip(candles, expected):
+                    for key in expected_candle:
+                        self.assertAlmostEqual(candle[key], expected_candle[key])
+        finally:
+            trades.np = np